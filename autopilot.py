@@ -0,0 +1,65 @@
+"""
+Neon Space Defender - автопилот
+Бот для долгих прогонов (benchmarks/soak.py) и стресс-тестов: смотрит на
+состояние Simulation, уходит в сторону от врага, который вот-вот врежется
+в корабль, а в остальное время встаёт под ближайшего врага и стреляет.
+Заполняет тот же Inputs, что и касания, поэтому игра идёт обычным путём.
+"""
+
+# Высота, на которой бот держит корабль
+PLAYER_Y = 700
+
+
+class Autopilot:
+    """drive(sim, inputs) раз за кадр — перед шагами симуляции.
+
+    careless=True — бот не уклоняется и не стреляет (игра быстро заканчивается).
+    """
+    def __init__(self, fire_every=6, lookahead=0.4, margin=10):
+        self.fire_every = fire_every  # выстрел раз в N тиков
+        self.lookahead = lookahead    # с — насколько вперёд смотреть на врагов
+        self.margin = margin          # px запаса по бокам корабля
+        self.careless = False
+
+    def enemies(self, sim):
+        """(x, y, ширина, высота, скорость) всех врагов — объекты или массивы"""
+        if sim.arrays is not None:
+            store = sim.arrays.enemies
+            return zip(store.x.tolist(), store.y.tolist(), store.w.tolist(),
+                       store.h.tolist(), store.vy.tolist())
+        return ((e.x, e.y, e.width, e.height, e.speed) for e in sim.enemies)
+
+    def drive(self, sim, inputs):
+        player = sim.player
+        left = player.x - self.margin
+        right = player.x + player.width + self.margin
+        threat = None
+        target = None
+        for x, y, w, h, speed in self.enemies(sim):
+            if y + h >= player.y:
+                continue  # уже выше корабля
+            # Враги летят вверх: ближайший к кораблю — с наибольшим y
+            if target is None or y > target[1]:
+                target = (x, y, w)
+            if (x < right and x + w > left and not self.careless and
+                    y + h + speed * self.lookahead >= player.y):
+                if threat is None or y > threat[1]:
+                    threat = (x, y, w)
+
+        if threat is not None:
+            # В ту сторону, где больше места
+            x, _, w = threat
+            if x + w / 2 > 300:
+                goal = x - player.width - self.margin
+            else:
+                goal = x + w + self.margin
+        elif target is not None:
+            x, _, w = target
+            goal = x + w / 2 - player.width / 2
+        else:
+            goal = 300 - player.width / 2
+
+        inputs.touch_x = min(max(goal, 0), 600 - player.width)
+        inputs.touch_y = PLAYER_Y
+        if not self.careless and sim.ticks % self.fire_every == 0:
+            inputs.shots = max(inputs.shots, 1)
@@ -0,0 +1,157 @@
+"""
+Neon Space Defender - пакетная отрисовка
+Звёзды и частицы упаковываются в Mesh с цветом в каждой вершине:
+один draw call на весь слой вместо Ellipse + Color на каждый объект
+"""
+
+from kivy.graphics import Mesh, RenderContext
+
+# Позиция + RGBA в каждой вершине
+VERTEX_FORMAT = [(b'vPosition', 2, 'float'), (b'vColor', 4, 'float')]
+FLOATS_PER_VERTEX = 6
+FLOATS_PER_QUAD = 4 * FLOATS_PER_VERTEX
+
+# Индексы GLES2 — unsigned short, больше 65535 вершин в один Mesh не влезет
+MAX_QUADS = 65536 // 4 - 1
+
+VERTEX_SHADER = '''
+$HEADER$
+attribute vec4 vColor;
+
+void main(void) {
+    frag_color = vColor * vec4(1.0, 1.0, 1.0, opacity);
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+'''
+
+FRAGMENT_SHADER = '''
+$HEADER$
+
+void main(void) {
+    gl_FragColor = frag_color;
+}
+'''
+
+
+def write_quad(buf, offset, x, y, size, r, g, b, a):
+    """Запись квадрата (4 вершины) в буфер начиная с offset"""
+    x2 = x + size
+    y2 = y + size
+    buf[offset:offset + FLOATS_PER_QUAD] = (
+        x, y, r, g, b, a,
+        x2, y, r, g, b, a,
+        x2, y2, r, g, b, a,
+        x, y2, r, g, b, a,
+    )
+
+
+class QuadBatch:
+    """Один Mesh из квадратов с цветом в вершинах.
+
+    Первые static_quads квадратов записываются один раз (build_static),
+    остальная часть буфера перезаписывается на месте каждый кадр.
+    """
+    def __init__(self, layer):
+        self.context = RenderContext(use_parent_projection=True,
+                                     use_parent_modelview=True,
+                                     use_parent_frag_modelview=True)
+        # Сначала fs: стандартный vs пишет все varying, которые ему нужны
+        self.context.shader.fs = FRAGMENT_SHADER
+        self.context.shader.vs = VERTEX_SHADER
+        self.mesh = Mesh(fmt=VERTEX_FORMAT, mode='triangles')
+        self.context.add(self.mesh)
+        layer.add(self.context)
+
+        self.vertices = []
+        self.indices = []
+        self.static_quads = 0
+        self.quad_count = -1
+
+    def build_static(self, quads):
+        """Статичная часть: список (x, y, size, (r, g, b, a)), строится один раз"""
+        self.static_quads = len(quads)
+        self.vertices = [0.0] * (self.static_quads * FLOATS_PER_QUAD)
+        for i, (x, y, size, color) in enumerate(quads):
+            write_quad(self.vertices, i * FLOATS_PER_QUAD, x, y, size, *color)
+
+    def reserve(self, dynamic_quads):
+        """Подгоняет буфер под static + dynamic квадратов (без лишних аллокаций)"""
+        total = min(self.static_quads + dynamic_quads, MAX_QUADS)
+        size = total * FLOATS_PER_QUAD
+        if len(self.vertices) < size:
+            self.vertices.extend([0.0] * (size - len(self.vertices)))
+        elif len(self.vertices) > size:
+            del self.vertices[size:]
+        return total - self.static_quads
+
+    def dynamic_offset(self, index):
+        return (self.static_quads + index) * FLOATS_PER_QUAD
+
+    def flush(self):
+        """Отправка буфера в Mesh; индексы пересчитываются только при росте"""
+        count = len(self.vertices) // FLOATS_PER_QUAD
+        if len(self.indices) < count * 6:
+            for q in range(len(self.indices) // 6, count):
+                i = q * 4
+                self.indices.extend((i, i + 1, i + 2, i + 2, i + 3, i))
+        self.mesh.vertices = self.vertices
+        if count != self.quad_count:
+            self.mesh.indices = self.indices[:count * 6]
+        self.quad_count = count
+
+    def set_vertices(self, vertices):
+        """Готовый буфер вершин (например, собранный NumPy) целиком"""
+        self.vertices = vertices
+        self.flush()
+
+    def clear_dynamic(self):
+        self.reserve(0)
+        self.flush()
+
+
+class StarfieldBatch(QuadBatch):
+    """Звёздное небо: дальний слой статичен, ближний смещается каждый кадр"""
+    def __init__(self, layer, far_stars, far_size=0.5, far_color=(0.5, 0.5, 0.6, 0.5),
+                 near_size=1, near_color=(0.8, 0.8, 0.9, 1)):
+        super().__init__(layer)
+        self.near_size = near_size
+        self.near_color = near_color
+        self.build_static([(x, y, far_size, far_color) for x, y in far_stars])
+
+    def update(self, stars):
+        count = self.reserve(len(stars))
+        size = self.near_size
+        r, g, b, a = self.near_color
+        buf = self.vertices
+        for i in range(count):
+            x, y = stars[i]
+            write_quad(buf, self.dynamic_offset(i), x, y, size, r, g, b, a)
+        self.flush()
+
+
+class ParticleBatch(QuadBatch):
+    """Все частицы пула одним Mesh, альфа затухания — в цвете вершин"""
+    def update(self, pool, lag=0.0):
+        """lag (<= 0) — сдвиг по времени для интерполяции между шагами"""
+        if pool.numpy:
+            self.set_vertices(pool.quad_vertices(lag))
+            return
+
+        count = self.reserve(len(pool))
+        buf = self.vertices
+        colors = pool.colors
+        x, y, size, color = pool.x, pool.y, pool.size, pool.color
+        vx, vy = pool.vx, pool.vy
+        life, max_life = pool.life, pool.max_life
+        n = 0
+        for i in pool.alive():
+            if n == count:
+                break
+            r, g, b = colors[color[i]]
+            half = size[i] / 2
+            write_quad(buf, self.dynamic_offset(n),
+                       x[i] + vx[i] * lag - half, y[i] + vy[i] * lag - half, size[i],
+                       r, g, b, life[i] / max_life[i])
+            n += 1
+        self.reserve(n)
+        self.flush()
@@ -0,0 +1,200 @@
+"""
+Холодный старт: от запуска main.py до первого кадра меню.
+
+Каждый прогон — новый процесс `python -X importtime`, который импортирует
+main.py и запускает настоящее приложение в offscreen-окне до первого
+кадра меню. Из вывода -X importtime собирается стоимость импорта по
+модулям (собственное время, как в столбце self), только то, что
+импортировано до первого кадра меню; время первого кадра считается от
+начала импорта main.py (main.STARTED). Прогрев (--warmup) записывает
+.pyc, поэтому замер — импорт готового байткода, как в собранном APK.
+
+Бюджет (код возврата 1 при нарушении):
+  - до первого кадра меню не импортируется ничего из DEFERRED — экран
+    игры, симуляция, NumPy, cProfile, tracemalloc грузятся позже;
+  - модули проекта и то, что импортируют они сами (всё под main.py,
+    кроме Kivy), укладываются в --budget-ms.
+Бюджет в миллисекундах зависит от машины: на слабом телефоне то же
+дерево импорта идёт в разы дольше, поэтому список DEFERRED — главная
+проверка.
+
+Запуск:
+    python benchmarks/bench_coldstart.py
+    python benchmarks/bench_coldstart.py --runs 5 --top 30 --out coldstart.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модули, которых не должно быть в импорте до первого кадра меню
+DEFERRED = (
+    'game', 'simulation', 'particles', 'soa', 'spatial', 'pools', 'containers',
+    'batching', 'textcache', 'debughud', 'capture', 'stats', 'autopilot', 'replay',
+    'numpy', 'cProfile', 'pstats', 'tracemalloc', 'argparse',
+)
+
+# Импорт модулей проекта до первого кадра меню, мс (без Kivy)
+BUDGET_MS = 30.0
+
+# Строка в stderr дочернего процесса: дальше — импорты после первого кадра меню
+MARKER = 'FIRST-MENU-FRAME'
+
+# Дочерний процесс: до main.py ничего, кроме sys и time (уже загружены)
+CHILD = '''
+import sys, time
+sys.path.insert(0, {root!r})
+import main
+from kivy.core.window import Window
+
+result = {{'import_ms': main.IMPORT_MS}}
+
+def first_frame(window):
+    Window.unbind(on_flip=first_frame)
+    result['menu_frame_ms'] = (time.perf_counter() - main.STARTED) * 1000
+    sys.stderr.write({marker!r} + '\\n')
+    sys.stderr.flush()
+    app.stop()
+
+Window.bind(on_flip=first_frame)
+app = main.NeonSpaceDefenderApp()
+app.run()
+import json
+print(json.dumps(result))
+'''
+
+
+def parse_importtime(text):
+    """Строки -X importtime до MARKER: [(имя, self мкс, глубина)] в порядке вывода"""
+    modules = []
+    for line in text.splitlines():
+        if line.strip() == MARKER:
+            break
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        fields = line.split('|')
+        self_us = int(fields[0].rsplit(':', 1)[1])
+        name = fields[2]
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules.append((name.strip(), self_us, depth))
+    return modules
+
+
+def under_main(modules):
+    """Модули из дерева импорта main.py с флагом «импортирован Kivy».
+
+    -X importtime печатает модуль после всех его зависимостей, поэтому
+    дерево восстанавливается с конца: родитель — ближайшая предыдущая
+    (в обратном обходе) строка с меньшей глубиной.
+    """
+    result = []
+    stack = []  # (глубина, имя) предков при обратном обходе
+    for name, self_us, depth in reversed(modules):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        ancestors = [n for _, n in stack]
+        if name == 'main' or 'main' in ancestors:
+            chain = ancestors[ancestors.index('main') + 1:] if 'main' in ancestors else []
+            by_kivy = any(n.split('.')[0] == 'kivy' for n in chain + [name])
+            result.append((name, self_us, by_kivy))
+        stack.append((depth, name))
+    return result
+
+
+def measure():
+    """Один прогон в новом процессе: время старта и импорты до первого кадра меню"""
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get('SDL_VIDEODRIVER', 'offscreen'),
+               KIVY_NO_ARGS='1', KIVY_NO_CONSOLELOG='1')
+    # Байткод кэшируется, как в сборке APK: иначе импорт мерит компиляцию .py
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    code = CHILD.format(root=ROOT, marker=MARKER)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, env=env, cwd=ROOT)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        tail = [l for l in proc.stderr.strip().splitlines() if not l.startswith('import time:')]
+        return {'error': (tail or ['нет вывода'])[-1]}
+    result = json.loads(lines[-1])
+    modules = under_main(parse_importtime(proc.stderr))
+    result['modules'] = {name: self_us for name, self_us, _ in modules}
+    result['own_ms'] = sum(us for _, us, by_kivy in modules if not by_kivy) / 1000
+    result['kivy_ms'] = sum(us for _, us, by_kivy in modules if by_kivy) / 1000
+    return result
+
+
+def median_modules(runs):
+    """Медиана собственного времени модуля по прогонам, мс"""
+    names = set().union(*(r['modules'] for r in runs))
+    return {name: statistics.median(r['modules'].get(name, 0) for r in runs) / 1000
+            for name in names}
+
+
+def by_package(modules):
+    totals = {}
+    for name, ms in modules.items():
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0.0) + ms
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=3, help='прогонов (каждый — новый процесс)')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='прогонов до замера (пишут .pyc, в отчёт не входят)')
+    parser.add_argument('--top', type=int, default=15, help='самых дорогих модулей в отчёте')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS,
+                        help='импорт модулей проекта до первого кадра меню, мс')
+    parser.add_argument('--out', help='куда записать результат (JSON)')
+    args = parser.parse_args(argv)
+
+    for _ in range(args.warmup):
+        measure()
+    runs = [measure() for _ in range(args.runs)]
+    errors = [r['error'] for r in runs if 'error' in r]
+    runs = [r for r in runs if 'error' not in r]
+    if not runs:
+        print(f"ошибка: {errors[-1]}")
+        return 1
+
+    def med(key):
+        return statistics.median(r[key] for r in runs)
+
+    modules = median_modules(runs)
+    print(f"Холодный старт: {len(runs)} прогон(а), медианы")
+    print(f"  импорт main.py          {med('import_ms'):8.1f} мс")
+    print(f"    Kivy (и что он тянет) {med('kivy_ms'):8.1f} мс")
+    print(f"    модули проекта        {med('own_ms'):8.1f} мс")
+    print(f"  первый кадр меню        {med('menu_frame_ms'):8.1f} мс от начала импорта main.py")
+
+    print("\nсамые дорогие модули до первого кадра меню (собственное время):")
+    for name, ms in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40} {ms:8.1f} мс")
+    print("по пакетам: " + ', '.join(f"{p} {ms:.0f}" for p, ms in by_package(modules)[:8]) + " (мс)")
+
+    loaded = sorted(name for name in modules if name.split('.')[0] in DEFERRED)
+    over = med('own_ms') > args.budget_ms
+    print("\nбюджет:")
+    print(f"  модули проекта {med('own_ms'):.1f} мс (бюджет {args.budget_ms:g} мс)"
+          f"  {'ПРЕВЫШЕН' if over else 'ok'}")
+    print(f"  отложенные модули до меню: {', '.join(loaded) if loaded else 'нет'}"
+          f"  {'НАРУШЕНИЕ' if loaded else 'ok'}")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'budget_ms': args.budget_ms, 'deferred_loaded': loaded,
+                       'modules_ms': {n: round(ms, 3) for n, ms in modules.items()},
+                       'runs': [{k: v for k, v in r.items() if k != 'modules'} for r in runs]},
+                      f, indent=2)
+    return 1 if over or loaded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Бенчмарк broadphase коллизий: полный перебор лазеров x врагов
+против сетки SpatialHash при росте числа объектов.
+
+Запуск:  python benchmarks/bench_collisions.py
+Время на объект для сетки должно оставаться примерно постоянным
+(линейный рост), а у перебора расти пропорционально N.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatial import SpatialHash
+
+
+def check_collision(x1, y1, w1, h1, x2, y2, w2, h2):
+    return (x1 < x2 + w2 and x1 + w1 > x2 and
+            y1 < y2 + h2 and y1 + h1 > y2)
+
+
+def make_scene(n, rng):
+    """n врагов и n лазеров, равномерно по полю 600x800"""
+    enemies = [(rng.uniform(0, 570), rng.uniform(-50, 800), 35, 30) for _ in range(n)]
+    lasers = [(rng.uniform(0, 600), rng.uniform(0, 800), 4, 15) for _ in range(n)]
+    return enemies, lasers
+
+
+def brute_force(enemies, lasers):
+    hits = 0
+    for ex, ey, ew, eh in enemies:
+        for lx, ly, lw, lh in lasers:
+            if check_collision(lx, ly, lw, lh, ex, ey, ew, eh):
+                hits += 1
+    return hits
+
+
+def grid(enemies, lasers, laser_grid):
+    laser_grid.clear()
+    for laser in lasers:
+        laser_grid.insert(laser, *laser)
+    hits = 0
+    for ex, ey, ew, eh in enemies:
+        for lx, ly, lw, lh in laser_grid.query(ex, ey, ew, eh):
+            if check_collision(lx, ly, lw, lh, ex, ey, ew, eh):
+                hits += 1
+    return hits
+
+
+def timeit(fn, *args, repeat=5):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    rng = random.Random(42)
+    laser_grid = SpatialHash()
+    print(f"{'N':>6} {'brute ms':>10} {'grid ms':>9} {'grid us/obj':>12} {'speedup':>8}")
+    for n in (25, 50, 100, 200, 400, 800, 1600):
+        enemies, lasers = make_scene(n, rng)
+        t_brute, hits_brute = timeit(brute_force, enemies, lasers, repeat=1 if n > 400 else 5)
+        t_grid, hits_grid = timeit(grid, enemies, lasers, laser_grid)
+        assert hits_brute == hits_grid, (hits_brute, hits_grid)
+        print(f"{n:>6} {t_brute * 1000:>10.2f} {t_grid * 1000:>9.2f} "
+              f"{t_grid * 1e6 / (2 * n):>12.2f} {t_brute / t_grid:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Бенчмарк отрисовки без GPU: фиксированная сцена (seed) из N врагов,
+M лазеров и K частиц, кадры рисуются через настоящий код фронтенда.
+
+  kivy    — GameWidget.draw_game в offscreen-окне SDL2 (Mesa / software GL):
+            фазы sync (обновление инструкций), draw (отрисовка canvas +
+            glFinish) и flip
+  pygame  — survivor.draw_frame под SDL dummy (тот же кадр, что в
+            play_game): фазы draw (сцена), hud и flip (частиц в survivor нет)
+
+Каждый фронтенд запускается в отдельном процессе (оба используют SDL2).
+
+Запуск:
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --frontend kivy --enemies 100 --lasers 400 --particles 2000
+    python benchmarks/bench_render.py --out render.json
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SEED = 4321
+FRONTENDS = ('kivy', 'pygame')
+
+
+class PhaseTimer:
+    """Суммарное время по фазам кадра (нс)"""
+    def __init__(self):
+        self.totals = {}
+        self.clock = time.perf_counter_ns
+        self.last = 0
+
+    def start(self):
+        self.last = self.clock()
+
+    def mark(self, phase):
+        now = self.clock()
+        self.totals[phase] = self.totals.get(phase, 0) + now - self.last
+        self.last = now
+
+    def report(self, frames, elapsed_ns):
+        return {
+            'frames': frames,
+            'fps': round(frames / (elapsed_ns / 1e9), 1),
+            'frame_ms': round(elapsed_ns / frames / 1e6, 3),
+            'phases_ms': {k: round(v / frames / 1e6, 3) for k, v in self.totals.items()},
+        }
+
+
+# --- Kivy (main.py, game.py) ---
+
+def bench_kivy(args):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    import main  # окно 600x800 (Config), как в игре
+    from game import GameWidget
+    from simulation import EnemyType
+    from kivy.base import EventLoop
+    from kivy.core.window import Window
+    from kivy.graphics.opengl import glFinish
+
+    EventLoop.ensure_window()
+    # Без App.run(): Clock не тикает, симуляция стоит — меняем сцену сами
+    game = GameWidget(app_ref=None)
+    Window.add_widget(game)
+    sim = game.sim
+    sim.reset(seed=SEED)
+    rng = random.Random(SEED)
+
+    types = [t for t in EnemyType if t != EnemyType.BOSS]
+    for _ in range(args.enemies):
+        enemy = sim.spawn_enemy(rng.choice(types))
+        enemy.y = enemy.py = rng.uniform(0, 750)
+    for _ in range(args.lasers):
+        sim.player.fire(rng.uniform(0, 600), rng.uniform(0, 800), 0, -600)
+        sim.on_spawn(sim.lasers[-1])
+    for _ in range(args.particles):
+        # Долгая жизнь: число частиц не меняется за время замера
+        sim.particles.emit(rng.uniform(0, 600), rng.uniform(0, 800),
+                           rng.uniform(-30, 30), rng.uniform(-30, 30),
+                           rng.randrange(len(sim.particles.colors)), rng.randint(2, 6), 1e9)
+
+    def advance():
+        # Движение сцены без правил игры (число объектов постоянно)
+        for enemy in sim.enemies:
+            enemy.py = enemy.y
+            enemy.y = (enemy.y + 2) % 800
+        for laser in sim.lasers:
+            laser.py = laser.y
+            laser.y = (laser.y - 10) % 800
+        sim.particles.update(1 / 60)
+        for star in sim.stars:
+            star[1] = (star[1] + 0.5) % 800
+
+    def frame(timer):
+        advance()
+        timer.start()
+        game.draw_game(0.5)
+        timer.mark('sync')
+        Window.dispatch('on_draw')
+        glFinish()
+        timer.mark('draw')
+        Window.dispatch('on_flip')
+        timer.mark('flip')
+
+    for _ in range(args.warmup):
+        frame(PhaseTimer())
+    timer = PhaseTimer()
+    start = time.perf_counter_ns()
+    for _ in range(args.frames):
+        frame(timer)
+    result = timer.report(args.frames, time.perf_counter_ns() - start)
+    result['entities'] = {'enemies': len(sim.enemies), 'lasers': len(sim.lasers),
+                          'particles': len(sim.particles)}
+    return result
+
+
+# --- pygame (survivor.py) ---
+
+def bench_pygame(args):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import pygame
+    import survivor
+    from containers import EntityList
+
+    random.seed(SEED)  # Enemy() в survivor берёт модуль random
+    rng = random.Random(SEED)
+    screen = survivor.screen
+    player = survivor.Player()
+    enemies = [survivor.Enemy(wave=rng.randint(1, 9)) for _ in range(args.enemies)]
+    for enemy in enemies:
+        enemy.rect.y = enemy.prev_y = rng.randint(0, 750)
+    lasers = player.lasers = EntityList(
+        pygame.Rect(rng.randint(0, 596), rng.randint(0, 800), 4, 15) for _ in range(args.lasers))
+    bonuses = [survivor.Bonus(rng.randint(0, 580), rng.randint(0, 780),
+                              rng.choice(['health', 'firerate'])) for _ in range(5)]
+    stars = [[rng.randint(0, survivor.WIDTH), rng.randint(0, survivor.HEIGHT)] for _ in range(50)]
+
+    def advance():
+        for enemy in enemies:
+            enemy.prev_y = enemy.rect.y
+            enemy.rect.y = (enemy.rect.y + 3) % survivor.HEIGHT
+        for laser in lasers:
+            laser.y = (laser.y - survivor.LASER_SPEED) % survivor.HEIGHT
+        for star in stars:
+            star[1] = (star[1] + survivor.STAR_SPEED) % survivor.HEIGHT
+
+    def frame(timer, alpha=0.5):
+        advance()
+        timer.start()
+        survivor.draw_frame(screen, stars, player, enemies, bonuses, 12345, 7, alpha, timer)
+        pygame.display.flip()
+        timer.mark('flip')
+
+    for _ in range(args.warmup):
+        frame(PhaseTimer())
+    timer = PhaseTimer()
+    start = time.perf_counter_ns()
+    for _ in range(args.frames):
+        frame(timer)
+    result = timer.report(args.frames, time.perf_counter_ns() - start)
+    result['entities'] = {'enemies': len(enemies), 'lasers': len(lasers), 'particles': 0}
+    return result
+
+
+BENCHES = {'kivy': bench_kivy, 'pygame': bench_pygame}
+
+
+def run_isolated(frontend, args):
+    """Фронтенд в отдельном процессе; результат — JSON последней строкой"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--frontend', frontend, '--json',
+           '--enemies', str(args.enemies), '--lasers', str(args.lasers),
+           '--particles', str(args.particles), '--frames', str(args.frames),
+           '--warmup', str(args.warmup)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {'error': (proc.stderr.strip().splitlines() or ['нет вывода'])[-1]}
+    return json.loads(lines[-1])
+
+
+def print_result(frontend, result):
+    if 'error' in result:
+        print(f"{frontend:<7} ошибка: {result['error']}")
+        return
+    phases = '  '.join(f"{k} {v:.2f}" for k, v in result['phases_ms'].items())
+    print(f"{frontend:<7} {result['fps']:>7.1f} FPS  {result['frame_ms']:>7.2f} мс/кадр  "
+          f"[{phases}] мс")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--frontend', choices=FRONTENDS + ('all',), default='all')
+    parser.add_argument('--enemies', type=int, default=50)
+    parser.add_argument('--lasers', type=int, default=200)
+    parser.add_argument('--particles', type=int, default=1000)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=30)
+    parser.add_argument('--out', help='куда записать результат (JSON)')
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.json:
+        # Дочерний процесс: только один фронтенд, JSON в stdout
+        print(json.dumps(BENCHES[args.frontend](args)))
+        return 0
+
+    frontends = FRONTENDS if args.frontend == 'all' else (args.frontend,)
+    print(f"сцена: {args.enemies} врагов, {args.lasers} лазеров, "
+          f"{args.particles} частиц, {args.frames} кадров")
+    results = {}
+    for frontend in frontends:
+        results[frontend] = run_isolated(frontend, args)
+        print_result(frontend, results[frontend])
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'scene': {'enemies': args.enemies, 'lasers': args.lasers,
+                                 'particles': args.particles, 'seed': SEED},
+                       'results': results}, f, indent=2)
+    return 1 if any('error' in r for r in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Время от START до первого кадра игры: настоящий NeonSpaceDefenderApp в
+offscreen-окне, меню показывается --menu-time секунд, затем вызывается
+то же, что кнопка START (app.start_game), и замеряется время до первого
+кадра (on_flip), на котором симуляция игры уже сделала шаг.
+
+  warm  — сцена игры готовится, пока открыто меню (как в игре)
+  cold  — подготовка выключена: виджет игры строится по START
+
+Каждый прогон — отдельный процесс (холодные кэши шрифтов и текстур).
+
+Запуск:
+    python benchmarks/bench_start.py
+    python benchmarks/bench_start.py --runs 5 --menu-time 3 --out start.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ('warm', 'cold')
+
+
+def measure(args):
+    """Дочерний процесс: один запуск приложения, результат — JSON в stdout"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    import main
+    from kivy.clock import Clock
+
+    app = main.NeonSpaceDefenderApp()
+    app.prewarm_enabled = args.mode == 'warm'
+    result = {}
+
+    def press_start(dt):
+        app.start_game()
+        Clock.schedule_interval(wait_frame, 0)
+
+    def wait_frame(dt):
+        if app.first_frame_ms is None:
+            return
+        result.update(first_frame_ms=round(app.first_frame_ms, 2),
+                      warm=app.first_frame_warm,
+                      prewarm_ms=round(app.prewarm_time * 1000, 2) if app.prewarm_enabled else 0.0)
+        app.stop()
+        return False
+
+    Clock.schedule_once(press_start, args.menu_time)
+    app.run()
+    return result
+
+
+def run_isolated(mode, args):
+    cmd = [sys.executable, os.path.abspath(__file__), '--json', '--mode', mode,
+           '--menu-time', str(args.menu_time)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=args.cwd)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {'error': (proc.stderr.strip().splitlines() or ['нет вывода'])[-1]}
+    return json.loads(lines[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=3, help='запусков на режим')
+    parser.add_argument('--menu-time', type=float, default=2.0,
+                        help='сколько секунд меню на экране до START')
+    parser.add_argument('--cwd', default=None, help='рабочий каталог игры (highscore.json)')
+    parser.add_argument('--out', help='куда записать результат (JSON)')
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', choices=MODES, default='warm', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.json:
+        print(json.dumps(measure(args)))
+        return 0
+
+    print(f"START -> первый кадр игры: {args.runs} запуск(а) на режим, меню {args.menu_time:g} с")
+    results = {}
+    for mode in MODES:
+        runs = [run_isolated(mode, args) for _ in range(args.runs)]
+        errors = [r['error'] for r in runs if 'error' in r]
+        times = [r['first_frame_ms'] for r in runs if 'error' not in r]
+        results[mode] = {'runs': runs}
+        if errors:
+            print(f"{mode:<5} ошибка: {errors[-1]}")
+        if times:
+            results[mode]['median_ms'] = round(statistics.median(times), 2)
+            line = f"{mode:<5} медиана {results[mode]['median_ms']:>8.1f} мс  [{', '.join(f'{t:.1f}' for t in times)}]"
+            if mode == 'warm':
+                prewarm = [r['prewarm_ms'] for r in runs if 'error' not in r]
+                line += f"  подготовка в меню {statistics.median(prewarm):.0f} мс"
+            print(line)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 1 if any('median_ms' not in r for r in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,358 @@
+"""
+Кривая масштабирования: стресс-режим (stress.py) с растущим множителем
+спавна, на каждом уровне — среднее число живых сущностей, время тика
+симуляции и время кадра. По кривой ищется число сущностей, при котором
+фронтенд опускается ниже 60 и 30 FPS на этой машине.
+
+  kivy    — GameWidget в offscreen-окне SDL2: шаг Simulation, draw_game,
+            отрисовка canvas + glFinish и flip (как bench_render.py)
+  pygame  — survivor.play_game под SDL dummy, часы без ожидания: ровно
+            один шаг симуляции за кадр (частиц в survivor нет)
+  sim     — только Simulation, кадр = тик (потолок для любого фронтенда)
+
+Корабль бессмертен, автопилот ведёт его и стреляет; лазеры и частицы
+ограничены --lasers / --particles, режим стрельбы закреплён (--fire).
+FPS здесь — без ограничения 60 Гц: сколько кадров в секунду успел бы
+выдать фронтенд. Порог ищется линейной интерполяцией времени кадра между
+соседними уровнями. Каждый фронтенд — в отдельном процессе (оба на SDL2);
+свип останавливается на первом уровне ниже --stop-fps.
+
+Запуск:
+    python benchmarks/bench_stress.py
+    python benchmarks/bench_stress.py --frontend pygame --levels 1,4,16,64 --frames 300
+    python benchmarks/bench_stress.py --out stress.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from autopilot import Autopilot
+from stress import StressConfig, FIRE_MODES
+
+SEED = 4321
+FRONTENDS = ('kivy', 'pygame', 'sim')
+TARGETS = (60, 30)
+
+# Строка результата уровня в stdout дочернего процесса
+LEVEL_PREFIX = 'LEVEL '
+
+
+def stress_config(args, spawn):
+    return StressConfig(spawn=spawn, max_lasers=args.lasers, max_particles=args.particles,
+                        fire_mode=args.fire, immortal=True)
+
+
+def level_result(spawn, counts, tick_ns, frame_ns):
+    """Средние по кадрам уровня; counts — [(враги, лазеры, бонусы, частицы)]"""
+    n = len(counts)
+    mean = [sum(c[i] for c in counts) / n for i in range(4)]
+    frame_ms = sum(frame_ns) / n / 1e6
+    return {
+        'spawn': spawn,
+        'entities': round(sum(mean), 1),
+        'enemies': round(mean[0], 1), 'lasers': round(mean[1], 1),
+        'bonuses': round(mean[2], 1), 'particles': round(mean[3], 1),
+        'tick_ms': round(sum(tick_ns) / n / 1e6, 3),
+        'frame_ms': round(frame_ms, 3),
+        'fps': round(1000 / frame_ms, 1) if frame_ms else float('inf'),
+    }
+
+
+def sim_counts(sim):
+    stats = sim.stats()
+    return (sum(stats['enemies'].values()), stats['lasers'], stats['bonuses'], stats['particles'])
+
+
+# --- Уровни по фронтендам ---
+
+def level_sim(args, spawn):
+    from simulation import Simulation, Inputs, SIM_DT
+    sim = Simulation(seed=SEED, stress=stress_config(args, spawn))
+    pilot = Autopilot(fire_every=args.fire_every)
+    inputs = Inputs()
+    clock = time.perf_counter_ns
+    counts, ticks = [], []
+    for i in range(args.warmup + args.frames):
+        pilot.drive(sim, inputs)
+        start = clock()
+        sim.step(SIM_DT, inputs)
+        elapsed = clock() - start
+        inputs.shots = 0
+        if i >= args.warmup:
+            ticks.append(elapsed)
+            counts.append(sim_counts(sim))
+    return level_result(spawn, counts, ticks, ticks)
+
+
+class KivyLevels:
+    """Окно создаётся один раз, на каждый уровень — новый GameWidget"""
+    def __init__(self):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+        os.environ.setdefault('KIVY_NO_ARGS', '1')
+        os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+        import main  # окно 600x800 (Config), как в игре
+        import game
+        from kivy.base import EventLoop
+        from kivy.core.window import Window
+        from kivy.graphics.opengl import glFinish
+        EventLoop.ensure_window()
+        self.game_module = game
+        self.window = Window
+        self.finish = glFinish
+        self.game = None
+
+    def __call__(self, args, spawn):
+        from simulation import SIM_DT
+        Window = self.window
+        if self.game is not None:
+            Window.remove_widget(self.game)
+        # Тот же путь, что NEON_STRESS: GameWidget берёт конфиг из game.STRESS
+        self.game_module.STRESS = stress_config(args, spawn)
+        # Без App.run(): Clock не тикает, кадры ведём сами
+        game = self.game = self.game_module.GameWidget(app_ref=None)
+        Window.add_widget(game)
+        sim = game.sim
+        sim.reset(seed=SEED)
+        pilot = Autopilot(fire_every=args.fire_every)
+        inputs = game.inputs
+        clock = time.perf_counter_ns
+        counts, ticks, frames = [], [], []
+        for i in range(args.warmup + args.frames):
+            pilot.drive(sim, inputs)
+            start = clock()
+            sim.step(SIM_DT, inputs)
+            inputs.shots = 0
+            stepped = clock()
+            game.draw_game(1.0)
+            Window.dispatch('on_draw')
+            self.finish()
+            Window.dispatch('on_flip')
+            if i >= args.warmup:
+                ticks.append(stepped - start)
+                frames.append(clock() - start)
+                counts.append(sim_counts(sim))
+        return level_result(spawn, counts, ticks, frames)
+
+
+class ScriptTape:
+    """Лента для survivor.play_game: кадры по SIM_STEP_MS, клавиши автопилота.
+
+    Корабль ходит от края к краю и стреляет без перерыва; после
+    warmup + frames кадров лента кончается, и игра завершается.
+    """
+    enabled = True
+    seed = SEED
+
+    def __init__(self, survivor, stress, warmup, frames):
+        import pygame
+        self.stress = stress
+        self.warmup = warmup
+        self.total = warmup + frames
+        self.step_ms = survivor.SIM_STEP_MS
+        self.fire = survivor.KEY_BITS[pygame.K_SPACE]
+        self.left = survivor.KEY_BITS[pygame.K_LEFT] | self.fire
+        self.right = survivor.KEY_BITS[pygame.K_RIGHT] | self.fire
+        self.frames = 0
+        self.steps = 0
+        self.counts = []
+
+    def frame(self, dt, events=0):
+        if self.frames > self.warmup:
+            # Сущности после шагов прошлого кадра
+            self.counts.append(self.stress.entities)
+        if self.frames == self.total:
+            return None
+        self.frames += 1
+        return self.step_ms, 0
+
+    def step(self, inputs=None, keys=0):
+        self.steps += 1
+        return self.left if self.steps // 90 % 2 else self.right
+
+    def finish(self, ticks, score):
+        return True
+
+    def close(self):
+        pass
+
+
+class UncappedClock:
+    """Вместо pygame.time.Clock: без ожидания, кадр = один шаг симуляции"""
+    def __init__(self, step_ms):
+        self.step_ms = step_ms
+
+    def tick(self, fps=0):
+        return self.step_ms
+
+
+def level_pygame(args, spawn):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import survivor
+    from profiler import FrameProfiler
+
+    survivor.clock = UncappedClock(survivor.SIM_STEP_MS)
+    stress = stress_config(args, spawn)
+    tape = ScriptTape(survivor, stress, args.warmup, args.frames)
+    profiler = FrameProfiler(capacity=args.frames + 1)
+    survivor.play_game(profiler=profiler, tape=tape, stress=stress)
+
+    # Кадр, на котором лента кончилась, не закрыт и в строки не попал
+    rows = list(profiler.rows(last=len(tape.counts)))
+    sim_columns = [profiler.index[p] for p in ('input', 'spawn', 'lasers', 'enemies', 'bonuses')]
+    ticks = [sum(row[i] for i in sim_columns) * 1e6 for row in rows]
+    frames = [row[0] * 1e6 for row in rows]
+    counts = [(n, 0, 0, 0) for n in tape.counts]  # survivor отдаёт только сумму
+    result = level_result(spawn, counts, ticks, frames)
+    for key in ('enemies', 'lasers', 'bonuses', 'particles'):
+        del result[key]
+    return result
+
+
+def make_level(frontend):
+    if frontend == 'kivy':
+        return KivyLevels()
+    return {'pygame': level_pygame, 'sim': level_sim}[frontend]
+
+
+# --- Кривая и пороги ---
+
+def crossing(levels, target_fps):
+    """Число сущностей, при котором FPS опускается ниже target_fps.
+
+    (число, точно) — точно=False, если ниже уже первый уровень;
+    None — не опустился ни на одном уровне.
+    """
+    limit_ms = 1000 / target_fps
+    points = sorted((lv['entities'], lv['frame_ms']) for lv in levels)
+    for i, (entities, frame_ms) in enumerate(points):
+        if frame_ms <= limit_ms:
+            continue
+        if i == 0:
+            return entities, False
+        e0, f0 = points[i - 1]
+        if frame_ms == f0:
+            return entities, True
+        return round(e0 + (limit_ms - f0) * (entities - e0) / (frame_ms - f0)), True
+    return None
+
+
+def thresholds(levels):
+    result = {}
+    for fps in TARGETS:
+        found = crossing(levels, fps)
+        result[str(fps)] = None if found is None else {'entities': found[0], 'exact': found[1]}
+    return result
+
+
+def run_isolated(frontend, args):
+    """Свип в отдельном процессе; уровни приходят строками LEVEL <json>"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--frontend', frontend, '--json',
+           '--levels', ','.join(str(s) for s in args.levels), '--frames', str(args.frames),
+           '--warmup', str(args.warmup), '--lasers', str(args.lasers),
+           '--particles', str(args.particles), '--fire', args.fire,
+           '--fire-every', str(args.fire_every), '--stop-fps', str(args.stop_fps)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    levels = []
+    for line in proc.stdout:
+        if line.startswith(LEVEL_PREFIX):
+            level = json.loads(line[len(LEVEL_PREFIX):])
+            levels.append(level)
+            print_level(level)
+    stderr = proc.stderr.read()
+    if proc.wait() != 0:
+        return {'levels': levels, 'error': (stderr.strip().splitlines() or ['нет вывода'])[-1]}
+    return {'levels': levels}
+
+
+def print_level(level):
+    print(f"  x{level['spawn']:<6g} {level['entities']:>8.1f} сущностей  "
+          f"тик {level['tick_ms']:>7.3f} мс  кадр {level['frame_ms']:>8.3f} мс  "
+          f"{level['fps']:>8.1f} FPS", flush=True)
+
+
+def print_thresholds(frontend, found, levels):
+    parts = []
+    for fps in TARGETS:
+        value = found[str(fps)]
+        if value is None:
+            top = max((lv['entities'] for lv in levels), default=0)
+            parts.append(f"<{fps} FPS: не опустился (до {top:.0f})")
+        elif value['exact']:
+            parts.append(f"<{fps} FPS: ~{value['entities']:.0f}")
+        else:
+            parts.append(f"<{fps} FPS: уже при {value['entities']:.0f}")
+    print(f"{frontend:<7} " + '  '.join(parts))
+
+
+def levels_arg(text):
+    levels = [float(s) for s in text.split(',') if s.strip()]
+    if not levels or any(s <= 0 for s in levels):
+        raise argparse.ArgumentTypeError("множители спавна — положительные числа через запятую")
+    return sorted(levels)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--frontend', choices=FRONTENDS + ('all',), default='all',
+                        help='all — kivy и pygame')
+    parser.add_argument('--levels', type=levels_arg, default=levels_arg('1,2,4,8,16,32,64,128'),
+                        help='множители спавна по возрастанию')
+    parser.add_argument('--frames', type=int, default=240, help='кадров замера на уровень')
+    parser.add_argument('--warmup', type=int, default=240,
+                        help='кадров до замера (число сущностей выходит на плато)')
+    parser.add_argument('--lasers', type=int, default=400, help='потолок лазеров')
+    parser.add_argument('--particles', type=int, default=2048, help='потолок частиц (ёмкость пула)')
+    parser.add_argument('--fire', choices=FIRE_MODES, default='SPREAD', help='режим стрельбы')
+    parser.add_argument('--fire-every', type=int, default=3, help='выстрел автопилота раз в N тиков')
+    parser.add_argument('--stop-fps', type=float, default=30,
+                        help='свип заканчивается на первом уровне ниже этого FPS')
+    parser.add_argument('--out', help='куда записать кривые и пороги (JSON)')
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.json:
+        # Дочерний процесс: один фронтенд, по строке на уровень
+        level = make_level(args.frontend)
+        for spawn in args.levels:
+            result = level(args, spawn)
+            print(LEVEL_PREFIX + json.dumps(result), flush=True)
+            if result['fps'] < args.stop_fps:
+                break
+        return 0
+
+    frontends = ('kivy', 'pygame') if args.frontend == 'all' else (args.frontend,)
+    print(f"стресс: спавн x{', x'.join(f'{s:g}' for s in args.levels)}; лазеров <= {args.lasers}, "
+          f"частиц <= {args.particles}, {args.fire}; {args.warmup}+{args.frames} кадров на уровень")
+    results = {}
+    for frontend in frontends:
+        print(f"{frontend}:")
+        results[frontend] = run_isolated(frontend, args)
+        if 'error' in results[frontend]:
+            print(f"  ошибка: {results[frontend]['error']}")
+        results[frontend]['thresholds'] = thresholds(results[frontend]['levels'])
+
+    print()
+    for frontend in frontends:
+        print_thresholds(frontend, results[frontend]['thresholds'], results[frontend]['levels'])
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'config': {'levels': args.levels, 'frames': args.frames, 'warmup': args.warmup,
+                                  'lasers': args.lasers, 'particles': args.particles,
+                                  'fire': args.fire, 'fire_every': args.fire_every, 'seed': SEED},
+                       'machine': {'python': sys.version.split()[0], 'platform': sys.platform,
+                                   'cpus': os.cpu_count()},
+                       'results': results}, f, indent=2)
+    return 1 if any('error' in r for r in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
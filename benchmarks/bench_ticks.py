@@ -0,0 +1,286 @@
+"""
+Бенчмарк тика симуляции: детерминированные сценарии без окна.
+
+Каждый сценарий гонит Simulation с фиксированным seed и заранее заданным
+вводом, замеряет время каждого step() и выдаёт mean / p50 / p99 / max
+(мкс) и число сущностей. Плюс микробенчмарки горячих функций
+(check_collision, create_explosion, draw_star — последний только если
+доступен Kivy).
+
+Запуск:
+    python benchmarks/bench_ticks.py                    # сравнение с baseline
+    python benchmarks/bench_ticks.py --update-baseline  # записать новый baseline
+    python benchmarks/bench_ticks.py --threshold 0.10 --out result.json
+
+Результат пишется в JSON (--out), baseline — benchmarks/baseline_ticks.json.
+Тик считается регрессией, если mean или p50 выросли больше чем на
+threshold (по умолчанию 15%); тогда код возврата 1. Baseline зависит от
+машины: обновляйте его на той же машине, где идёт сравнение. Из --repeat
+прогонов берётся лучший — на шумной машине увеличьте --repeat.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from simulation import Simulation, Inputs, FireMode, SIM_DT
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline_ticks.json')
+SEED = 1234
+
+
+# --- Сценарии: (настройка, ввод на тик) ---
+
+def _bot_input(inputs, rng, tick, fire_every):
+    """Простой бот: раз в 50 тиков новая точка касания, выстрел раз в fire_every"""
+    if tick % 50 == 0:
+        inputs.touch_x, inputs.touch_y = rng.uniform(0, 600), rng.uniform(600, 760)
+    inputs.shots = 1 if tick % fire_every == 0 else 0
+
+
+def early_waves(sim, rng):
+    """Волны 1-4: обычный темп спавна и стрельбы"""
+    def tick(n, inputs):
+        _bot_input(inputs, rng, n, 6)
+    return tick
+
+
+def wave10_boss(sim, rng):
+    """Волна 10: быстрый спавн, усиленные враги и босс"""
+    sim.wave = 10
+    sim.spawn_delay = 0.35
+
+    def tick(n, inputs):
+        _bot_input(inputs, rng, n, 4)
+        sim.wave = max(sim.wave, 10)
+    return tick
+
+
+def spread_spam(sim, rng):
+    """SPREAD: пять лазеров на каждый тик"""
+    def tick(n, inputs):
+        _bot_input(inputs, rng, n, 1)
+        sim.player.fire_mode = FireMode.SPREAD
+    return tick
+
+
+def explosion_storm(sim, rng):
+    """Десять взрывов за тик поверх обычной игры (переполнение пула частиц)"""
+    def tick(n, inputs):
+        _bot_input(inputs, rng, n, 6)
+        for _ in range(10):
+            sim.create_explosion(rng.uniform(0, 600), rng.uniform(0, 800))
+    return tick
+
+
+SCENARIOS = {
+    'early_waves': (early_waves, 3000),
+    'wave10_boss': (wave10_boss, 3000),
+    'spread_spam': (spread_spam, 2000),
+    'explosion_storm': (explosion_storm, 2000),
+}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(name, arrays=False):
+    """Один прогон сценария: времена тиков (нс), счётчики сущностей, итог"""
+    setup, ticks = SCENARIOS[name]
+    sim = Simulation(seed=SEED, arrays=arrays)
+    rng = random.Random(SEED)
+    drive = setup(sim, rng)
+    inputs = Inputs()
+    times = []
+    counts = {'enemies': 0, 'lasers': 0, 'bonuses': 0, 'particles': 0}
+    peaks = dict(counts)
+    clock = time.perf_counter_ns
+
+    for n in range(ticks):
+        sim.player.health = sim.player.max_health  # бот не умирает
+        drive(n, inputs)
+        start = clock()
+        sim.step(SIM_DT, inputs)
+        times.append(clock() - start)
+
+        if sim.arrays is not None:
+            sizes = (len(sim.arrays.enemies), len(sim.arrays.lasers))
+        else:
+            sizes = (len(sim.enemies), len(sim.lasers))
+        for key, value in zip(('enemies', 'lasers', 'bonuses', 'particles'),
+                              sizes + (len(sim.bonuses), len(sim.particles))):
+            counts[key] += value
+            peaks[key] = max(peaks[key], value)
+
+    return times, {
+        'mean': {k: round(v / ticks, 1) for k, v in counts.items()},
+        'max': peaks,
+    }, [sim.score, sim.wave, sim.rng.random()]
+
+
+def summarize(times):
+    us = sorted(t / 1000 for t in times)
+    return {
+        'ticks': len(us),
+        'mean_us': round(sum(us) / len(us), 2),
+        'p50_us': round(percentile(us, 50), 2),
+        'p99_us': round(percentile(us, 99), 2),
+        'max_us': round(us[-1], 2),
+    }
+
+
+def bench_scenarios(repeat, arrays):
+    """Лучший (по mean) из repeat прогонов каждого сценария"""
+    results = {}
+    for name in SCENARIOS:
+        best = None
+        for _ in range(repeat):
+            times, entities, checksum = run_scenario(name, arrays)
+            stats = summarize(times)
+            if best is None or stats['mean_us'] < best['mean_us']:
+                best = dict(stats, entities=entities, checksum=checksum)
+        results[name] = best
+    return results
+
+
+# --- Микробенчмарки ---
+
+def _per_call_ns(fn, number, repeat):
+    return round(min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e9, 1)
+
+
+def bench_micro(repeat):
+    sim = Simulation(seed=SEED)
+    check = sim.check_collision
+    results = {
+        'check_collision': _per_call_ns(
+            lambda: check(10, 10, 4, 15, 12, 20, 35, 30), 200000, repeat),
+        'create_explosion': _per_call_ns(
+            lambda: sim.create_explosion(300, 400), 20000, repeat),
+    }
+
+    # draw_star строит инструкции Kivy; Line шире 1 px требует GL-контекста,
+    # поэтому нужно окно (раньше его создавал импорт main.py)
+    try:
+        os.environ.setdefault('KIVY_NO_ARGS', '1')
+        os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+        from kivy.core.window import Window
+        from kivy.graphics import InstructionGroup
+        from game import GameWidget
+    except Exception as exc:
+        print(f"draw_star: пропущен ({exc.__class__.__name__}: {exc})")
+    else:
+        group = InstructionGroup()
+
+        def draw_star():
+            GameWidget.draw_star(None, group, 0, 0, 8, 0)
+            if group.length() > 1000:
+                group.clear()
+        results['draw_star'] = _per_call_ns(draw_star, 5000, repeat)
+    return results
+
+
+# --- Сравнение с baseline ---
+
+def compare(result, baseline, threshold):
+    """Список строк отчёта и флаг успеха"""
+    lines = []
+    ok = True
+    for name, stats in result['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            lines.append(f"  {name:<16} нет в baseline")
+            continue
+        for key in ('mean_us', 'p50_us'):
+            change = stats[key] / base[key] - 1 if base[key] else 0.0
+            bad = change > threshold
+            ok = ok and not bad
+            lines.append(f"  {name:<16} {key:<8} {base[key]:>9.1f} -> {stats[key]:>9.1f} "
+                         f"{change:>+7.1%} {'FAIL' if bad else 'ok'}")
+        if stats['checksum'] != base.get('checksum'):
+            lines.append(f"  {name:<16} итог игры изменился (другая логика или seed): "
+                         f"{base.get('checksum')} -> {stats['checksum']}")
+    for name, ns in result['micro'].items():
+        base = baseline.get('micro', {}).get(name)
+        if not base:
+            continue
+        change = ns / base - 1
+        bad = change > threshold
+        ok = ok and not bad
+        lines.append(f"  {name:<16} {'ns/call':<8} {base:>9.1f} -> {ns:>9.1f} "
+                     f"{change:>+7.1%} {'FAIL' if bad else 'ok'}")
+    return lines, ok
+
+
+def print_table(result):
+    print(f"{'scenario':<16} {'mean':>8} {'p50':>8} {'p99':>8} {'max':>9}  "
+          f"{'enemies':>8} {'lasers':>7} {'particles':>9}   (мкс, средн./пик)")
+    for name, s in result['scenarios'].items():
+        mean, peak = s['entities']['mean'], s['entities']['max']
+        print(f"{name:<16} {s['mean_us']:>8.1f} {s['p50_us']:>8.1f} {s['p99_us']:>8.1f} "
+              f"{s['max_us']:>9.1f}  {mean['enemies']:>4.0f}/{peak['enemies']:<3} "
+              f"{mean['lasers']:>3.0f}/{peak['lasers']:<3} {mean['particles']:>4.0f}/{peak['particles']:<4}")
+    for name, ns in result['micro'].items():
+        print(f"{name:<16} {ns:>8.1f} нс/вызов")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=5, help='прогонов на сценарий (берётся лучший)')
+    parser.add_argument('--threshold', type=float, default=0.15, help='допустимый рост времени (доля)')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--out', help='куда записать результат (JSON)')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--arrays', action='store_true', help='стресс-режим NumPy (ArrayWorld)')
+    args = parser.parse_args(argv)
+
+    result = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': SEED,
+        'arrays': args.arrays,
+        'scenarios': bench_scenarios(args.repeat, args.arrays),
+        'micro': bench_micro(args.repeat),
+    }
+    print_table(result)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"baseline записан: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"baseline не найден ({args.baseline}); запустите с --update-baseline")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('arrays', False) != args.arrays:
+        print("baseline снят в другом режиме (--arrays) — сравнение пропущено")
+        return 0
+
+    lines, ok = compare(result, baseline, args.threshold)
+    print(f"\nсравнение с baseline (порог +{args.threshold:.0%}):")
+    print('\n'.join(lines))
+    print('PASS' if ok else 'FAIL')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Долгий прогон (soak): автопилот играет игру за игрой часами, а раз в
+--interval секунд снимаются метрики:
+
+  rss_kb        резидентная память процесса
+  traced_kb     память под объектами Python (tracemalloc) и топ мест
+                выделения по приросту с начала прогона
+  objects       число живых объектов по классам (gc.get_objects)
+  sim_ms        время симуляции за кадр (фазы FrameProfiler / step)
+  render_ms     время отрисовки и HUD за кадр (только kivy)
+  clock_events  запланированные вызовы Clock (только kivy)
+
+  kivy  — настоящий NeonSpaceDefenderApp в offscreen-окне, в реальном
+          времени: игры перезапускаются кнопками экрана Game Over
+          («Заново», а каждая --menu-every игра — «Выйти» и START из меню)
+  sim   — только Simulation, без окна, на максимальной скорости
+
+Метрика, которая после прогрева (--warmup, снимки помечены *) ни разу не
+уменьшилась и выросла больше чем на --min-growth, помечается как
+монотонный рост; тогда код возврата 1.
+tracemalloc замедляет игру в разы — для замеров времени кадра его можно
+отключить (--no-tracemalloc).
+
+Запуск:
+    python benchmarks/soak.py --duration 14400            # 4 часа, kivy
+    python benchmarks/soak.py --frontend sim --duration 600 --interval 10
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from autopilot import Autopilot
+
+SIM_PHASES = ('input', 'spawn', 'lasers', 'enemies', 'bonuses', 'particles')
+RENDER_PHASES = ('draw', 'hud')
+
+# Поля снимка, которые растут по определению
+COUNTERS = ('t', 'games')
+
+# Кнопки экрана Game Over (GameWidget.on_touch_down)
+RESTART_TAP = (165, 185)
+EXIT_TAP = (435, 185)
+
+
+def rss_kb():
+    """Текущий RSS (Linux/Android); иначе — пиковый из getrusage"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return 0
+
+
+def growing(values, noise=0.02, min_growth=0.05, min_samples=5):
+    """Ряд ни разу не уменьшился (с допуском noise) и вырос больше min_growth"""
+    if len(values) < min_samples or values[0] < 0:
+        return False
+    for a, b in zip(values, values[1:]):
+        if b < a * (1 - noise):
+            return False
+    return values[-1] > values[0] * (1 + min_growth) + 1
+
+
+class Sampler:
+    """Снимки метрик; ряды копятся для поиска монотонного роста"""
+    def __init__(self, top=10, trace=True, min_objects=5, warmup=60):
+        self.top = top
+        self.trace = trace
+        self.warmup = warmup  # с: импорты, пулы и кэши ещё растут — в ряды не идёт
+        self.min_objects = min_objects
+        self.series = {}
+        self.class_series = {}
+        self.samples = 0
+        self.baseline = None
+        if trace:
+            tracemalloc.start()
+            self.baseline = self.snapshot()
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    def sample(self, elapsed, metrics):
+        record = {'t': round(elapsed, 1), 'rss_kb': rss_kb()}
+        warming = elapsed < self.warmup
+        if self.trace and not warming and self.samples == 0:
+            self.baseline = self.snapshot()  # прирост считается от конца прогрева
+        if self.trace:
+            record['traced_kb'] = tracemalloc.get_traced_memory()[0] // 1024
+            stats = self.snapshot().compare_to(self.baseline, 'lineno')
+            record['top_alloc'] = [
+                {'where': str(stat.traceback[0]), 'size_kb': round(stat.size_diff / 1024, 1),
+                 'count': stat.count_diff}
+                for stat in stats[:self.top]]
+        record.update(metrics)
+
+        # Живые объекты по классам (без принудительной сборки: циклы,
+        # которые ждут gc, — тоже часть реального потребления)
+        counts = Counter(type(obj).__qualname__ for obj in gc.get_objects())
+        # Ряды самого Sampler — тоже array под gc: в подсчёт не идут
+        counts['array'] -= len(self.series) + len(self.class_series)
+        if counts['array'] <= 0:
+            del counts['array']
+        record['objects'] = dict(counts.most_common(self.top))
+        if warming:
+            record['warmup'] = True
+            return record
+        for name in set(self.class_series) | set(counts):
+            series = self.class_series.get(name)
+            if series is None:
+                series = self.class_series[name] = array('q', bytes(8 * self.samples))
+            series.append(counts.get(name, 0))
+
+        for key, value in record.items():
+            if isinstance(value, (int, float)) and key not in COUNTERS:
+                series = self.series.get(key)
+                if series is None:
+                    series = self.series[key] = array('d', [float('nan')] * self.samples)
+                series.append(value)
+        self.samples += 1
+        return record
+
+    def flagged(self, min_growth):
+        """[(метрика, первое, последнее)] с монотонным ростом"""
+        result = []
+        for name, values in self.series.items():
+            values = [v for v in values if v == v]  # без nan (метрики ещё не было)
+            if growing(values, min_growth=min_growth):
+                result.append((name, values[0], values[-1]))
+        for name, values in self.class_series.items():
+            if values[-1] >= self.min_objects and growing(values, min_growth=min_growth):
+                result.append((f'objects[{name}]', values[0], values[-1]))
+        return result
+
+
+def print_sample(record):
+    extra = '  '.join(f"{k} {record[k]}" for k in ('games', 'sim_ms', 'render_ms', 'clock_events')
+                      if k in record)
+    line = f"[{record['t']:>8.0f} с{'*' if record.get('warmup') else ' '}] rss {record['rss_kb']} КБ"
+    if 'traced_kb' in record:
+        line += f"  traced {record['traced_kb']} КБ"
+    print(f"{line}  {extra}", flush=True)
+
+
+# --- Фронтенды ---
+
+class Touch:
+    """Минимальное касание для GameWidget.on_touch_down"""
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+        self.ud = {}
+
+
+class KivySoak:
+    """Настоящее приложение: автопилот ведёт игру через GameWidget.inputs"""
+    def __init__(self, args, sampler, log):
+        self.args = args
+        self.sampler = sampler
+        self.log = log
+        self.pilot = Autopilot()
+        self.games = 0
+        self.max_ticks = int(args.max_game * 60)
+
+    def run(self):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+        os.environ.setdefault('KIVY_NO_ARGS', '1')
+        os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+        import main
+        from kivy.clock import Clock
+        self.clock = Clock
+        self.app = main.NeonSpaceDefenderApp()
+        self.start = time.perf_counter()
+        self.next_sample = self.start + self.args.interval
+        Clock.schedule_interval(self.tick, 0)
+        self.app.run()
+
+    def tick(self, dt):
+        now = time.perf_counter()
+        if now - self.start >= self.args.duration:
+            self.app.stop()
+            return False
+        game = self.app.game
+        if now >= self.next_sample:
+            self.next_sample = now + self.args.interval
+            self.log(self.sampler.sample(now - self.start, self.metrics(game)))
+
+        if game is None or game.parent is None:
+            self.app.start_game()  # то же, что кнопка START в меню
+            return
+        sim = game.sim
+        if sim.game_over:
+            self.games += 1
+            exit_to_menu = self.games % self.args.menu_every == 0
+            game.on_touch_down(Touch(*(EXIT_TAP if exit_to_menu else RESTART_TAP)))
+            return
+        self.pilot.careless = sim.ticks > self.max_ticks
+        self.pilot.drive(sim, game.inputs)
+
+    def metrics(self, game):
+        result = {'games': self.games, 'clock_events': len(self.clock.get_events())}
+        if game is not None:
+            avg = game.profiler.averages(last=600)
+            result['sim_ms'] = round(sum(avg[p] for p in SIM_PHASES), 3)
+            result['render_ms'] = round(sum(avg[p] for p in RENDER_PHASES), 3)
+            result['frame_ms'] = round(avg['frame_ms'], 3)
+        return result
+
+
+class SimSoak:
+    """Только правила игры: игры одна за другой на максимальной скорости"""
+    def __init__(self, args, sampler, log):
+        self.args = args
+        self.sampler = sampler
+        self.log = log
+
+    def run(self):
+        from simulation import Simulation, Inputs, SIM_DT
+        sim = Simulation(seed=1)
+        pilot = Autopilot()
+        inputs = Inputs()
+        max_ticks = int(self.args.max_game * 60)
+        clock = time.perf_counter
+        start = clock()
+        next_sample = start + self.args.interval
+        games = 0
+        step_time = 0.0
+        steps = 0
+        while True:
+            now = clock()
+            if now - start >= self.args.duration:
+                break
+            if now >= next_sample:
+                next_sample = now + self.args.interval
+                metrics = {'games': games, 'sim_ms': round(step_time / steps * 1000, 4) if steps else 0.0}
+                self.log(self.sampler.sample(now - start, metrics))
+                step_time, steps = 0.0, 0
+            if sim.game_over:
+                games += 1
+                sim.reset()
+            pilot.careless = sim.ticks > max_ticks
+            pilot.drive(sim, inputs)
+            t = clock()
+            sim.step(SIM_DT, inputs)
+            step_time += clock() - t
+            steps += 1
+            inputs.shots = 0
+
+
+FRONTENDS = {'kivy': KivySoak, 'sim': SimSoak}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--frontend', choices=tuple(FRONTENDS), default='kivy')
+    parser.add_argument('--duration', type=float, default=3600, help='длительность прогона, с')
+    parser.add_argument('--interval', type=float, default=30, help='период снятия метрик, с')
+    parser.add_argument('--max-game', type=float, default=120,
+                        help='после стольких секунд игры автопилот перестаёт уклоняться')
+    parser.add_argument('--menu-every', type=int, default=5,
+                        help='каждая N-я игра выходит в меню кнопкой «Выйти»')
+    parser.add_argument('--warmup', type=float, default=60,
+                        help='первые секунды не участвуют в поиске роста')
+    parser.add_argument('--top', type=int, default=10, help='строк в топах выделений и классов')
+    parser.add_argument('--min-growth', type=float, default=0.05,
+                        help='рост (доля), начиная с которого монотонный ряд — утечка')
+    parser.add_argument('--no-tracemalloc', action='store_true')
+    parser.add_argument('--out', help='JSON Lines с метриками (по умолчанию soak-<время>.jsonl)')
+    args = parser.parse_args(argv)
+
+    out_path = args.out or time.strftime('soak-%Y%m%d-%H%M%S.jsonl')
+    sampler = Sampler(top=args.top, trace=not args.no_tracemalloc, warmup=args.warmup)
+    with open(out_path, 'w', encoding='utf-8') as out:
+        def log(record):
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            print_sample(record)
+
+        print(f"soak: {args.frontend}, {args.duration:.0f} с, метрики раз в {args.interval:.0f} с -> {out_path}")
+        FRONTENDS[args.frontend](args, sampler, log).run()
+
+    flagged = sampler.flagged(args.min_growth)
+    print(f"\nснимков: {sampler.samples}")
+    if sampler.samples < 5:
+        print("мало снимков для поиска роста (нужно хотя бы 5)")
+        return 0
+    if not flagged:
+        print("монотонного роста не найдено")
+        return 0
+    print("монотонный рост:")
+    for name, first, last in flagged:
+        print(f"  {name:<40} {first:>12g} -> {last:<12g} ({last / first - 1 if first else float('inf'):+.0%})")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
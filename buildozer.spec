@@ -4,6 +4,7 @@ package.name = neonspacedefender
 package.domain = com.spacegames
 source.dir = .
 source.include_exts = py,png,jpg,kv,atlas,json
+source.exclude_dirs = benchmarks
 version = 1.0.0
 requirements = python3,kivy,android
 presplash.filename = %(source.dir)s/data/presplash.png
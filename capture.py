@@ -0,0 +1,126 @@
+"""
+Neon Space Defender - профиль cProfile ровно на N тиков
+Захват включается по запросу (клавиша, долгое нажатие или переменная
+окружения NEON_PROFILE_TICKS=N) и работает только внутри следующих N
+тиков update: профайлер включается в начале тика и выключается в конце,
+поэтому меню, пауза и обработка ввода между кадрами в профиль не попадают.
+После N-го тика захват выключается сам, а в фоновом потоке пишутся
+profile-<время>.pstats и profile-<время>-collapsed.txt (формат collapsed
+stacks для flamegraph.pl / speedscope) рядом с highscore.json.
+"""
+
+import cProfile
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+
+DEFAULT_TICKS = 300
+ENV_TICKS = 'NEON_PROFILE_TICKS'
+
+# Глубина разворачивания стеков в collapsed-файле
+MAX_DEPTH = 64
+
+
+def env_ticks():
+    """N из NEON_PROFILE_TICKS (0 — переменная не задана или некорректна)"""
+    try:
+        return max(0, int(os.environ.get(ENV_TICKS, '0')))
+    except ValueError:
+        return 0
+
+
+class ProfileCapture:
+    """cProfile на ограниченное окно тиков: arm() -> begin_tick()/end_tick() x N"""
+    def __init__(self, directory='.', on_saved=None):
+        self.directory = directory
+        self.on_saved = on_saved  # вызывается из фонового потока: (pstats, collapsed)
+        self.profile = None
+        self.remaining = 0
+        self.running = False
+
+    @property
+    def armed(self):
+        return self.remaining > 0
+
+    def arm(self, ticks=None):
+        """Захват следующих ticks тиков; False, если захват уже идёт"""
+        if self.armed:
+            return False
+        self.remaining = ticks or env_ticks() or DEFAULT_TICKS
+        self.profile = cProfile.Profile()
+        return True
+
+    def begin_tick(self):
+        if self.remaining > 0:
+            self.profile.enable()
+            self.running = True
+
+    def end_tick(self):
+        if not self.running:
+            return
+        self.profile.disable()
+        self.running = False
+        self.remaining -= 1
+        if self.remaining == 0:
+            profile, self.profile = self.profile, None
+            threading.Thread(target=self.save, args=(profile,), daemon=True).start()
+
+    def save(self, profile):
+        """Запись .pstats и collapsed stacks (вне игрового потока)"""
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.directory, f'profile-{stamp}')
+        stats = pstats.Stats(profile)
+        stats.dump_stats(base + '.pstats')
+        with open(base + '-collapsed.txt', 'w', encoding='utf-8') as f:
+            for stack, micros in sorted(collapsed_stacks(stats).items()):
+                if micros >= 1:
+                    f.write(f"{';'.join(stack)} {int(micros)}\n")
+        if self.on_saved is not None:
+            self.on_saved(base + '.pstats', base + '-collapsed.txt')
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name.replace(';', ',')  # встроенные функции: <built-in method ...>
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(';', ',')
+
+
+def collapsed_stacks(stats):
+    """Стеки из графа вызовов pstats: {(корень, ..., функция): мкс собственного времени}.
+
+    cProfile хранит только рёбра вызывающий -> вызываемый, поэтому время
+    функции делится между путями пропорционально времени рёбер (как во
+    flameprof/gprof2dot) — это приближение, а не точная выборка стеков.
+    """
+    entries = stats.stats
+    callees = defaultdict(dict)
+    for func, (cc, nc, tt, ct, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge
+
+    result = defaultdict(float)
+    labels = {func: _label(func) for func in entries}
+
+    def walk(func, stack, on_path, share):
+        tt, ct = entries[func][2], entries[func][3]
+        path = stack + (labels[func],)
+        result[path] += tt * share * 1e6
+        if len(path) >= MAX_DEPTH:
+            return
+        on_path.add(func)
+        for child, edge in callees.get(func, {}).items():
+            child_ct = entries[child][3]
+            if child in on_path or child_ct <= 0:
+                continue  # рекурсия сворачивается в первый вход
+            child_share = share * edge[3] / child_ct
+            if child_share * child_ct * 1e6 >= 1:
+                walk(child, path, on_path, child_share)
+        on_path.discard(func)
+
+    for func, entry in entries.items():
+        if not entry[4]:  # нет вызывающих — корень
+            walk(func, (), set(), 1.0)
+    return result
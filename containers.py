@@ -0,0 +1,50 @@
+"""
+Neon Space Defender - контейнеры сущностей
+Во время тика объекты только помечаются как удалённые, а список
+сжимается один раз в конце кадра: O(n) на кадр вместо копии списка
+и линейного list.remove() на каждое удаление.
+"""
+
+
+class EntityList(list):
+    """Список сущностей кадра с отложенным удалением.
+
+    kill() помечает объект за O(1); compact() одним проходом убирает
+    помеченные, сохраняя порядок живых, и вызывает on_remove для каждого.
+    Пометка идёт по id(), поэтому подходят и нехэшируемые объекты (Rect).
+    """
+    def __init__(self, iterable=(), on_remove=None):
+        super().__init__(iterable)
+        self.on_remove = on_remove
+        self.dead = {}
+
+    def kill(self, obj):
+        # Храним сам объект, чтобы его id не достался новому до compact()
+        self.dead[id(obj)] = obj
+
+    def is_alive(self, obj):
+        return id(obj) not in self.dead
+
+    def alive(self):
+        """Живые объекты (без помеченных в этом тике)"""
+        dead = self.dead
+        if not dead:
+            return iter(self)
+        return (obj for obj in self if id(obj) not in dead)
+
+    def compact(self):
+        """Сжатие в конце тика; возвращает число удалённых объектов"""
+        dead = self.dead
+        if not dead:
+            return 0
+        self[:] = [obj for obj in self if id(obj) not in dead]
+        removed = len(dead)
+        if self.on_remove is not None:
+            for obj in dead.values():
+                self.on_remove(obj)
+        dead.clear()
+        return removed
+
+    def clear(self):
+        super().clear()
+        self.dead.clear()
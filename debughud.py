@@ -0,0 +1,112 @@
+"""
+Neon Space Defender - отладочный оверлей (Kivy)
+График времени кадра, разбивка по фазам из FrameProfiler и строки
+статистики (сущности, инструкции canvas, память). Пока оверлей
+скрыт, он ничего не делает; открытый — обновляется 4 раза в секунду,
+текст рисуется из атласа глифов (без растеризации шрифта).
+"""
+
+import string
+
+from kivy.graphics import Color, InstructionGroup, Line, Rectangle
+
+from profiler import PHASES
+from textcache import AtlasText, get_atlas
+
+# Панель справа под HUD
+PANEL_X, PANEL_Y, PANEL_W, PANEL_H = 380, 370, 215, 375
+GRAPH_Y, GRAPH_H = 630, 90
+GRAPH_FRAMES = 120
+GRAPH_MAX_MS = 45.0
+REFRESH = 0.25
+
+DEBUG_CHARSET = "0123456789 .:/+-_" + string.ascii_lowercase
+
+# Строк статистики под фазами (RuntimeStats через GameWidget.stats_lines)
+STATS_LINES = 4
+
+
+def count_instructions(group):
+    """Число инструкций в группе вместе с вложенными группами"""
+    n = 0
+    for child in group.children:
+        n += 1
+        if isinstance(child, InstructionGroup):
+            n += count_instructions(child)
+    return n
+
+
+class DebugOverlay:
+    """Оверлей в отдельном слое; toggle() показывает/скрывает.
+
+    stats — функция, возвращающая строки статистики (вызывается только
+    при обновлении открытого оверлея).
+    """
+    def __init__(self, layer, profiler, stats=None):
+        self.layer = layer
+        self.profiler = profiler
+        self.stats = stats
+        self.visible = False
+        self.next_refresh = 0.0
+        self.graph = None
+        self.lines = []
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.layer.clear()
+        self.lines = []
+        if self.visible:
+            self.build()
+            self.next_refresh = 0.0
+        return self.visible
+
+    def header_contains(self, x, y):
+        """Верхняя полоса панели (над графиком) — зона тапа «выгрузить CSV»"""
+        return (self.visible and PANEL_X <= x <= PANEL_X + PANEL_W and
+                GRAPH_Y + GRAPH_H <= y <= PANEL_Y + PANEL_H)
+
+    def build(self):
+        g = self.layer
+        g.add(Color(0, 0, 0, 0.65))
+        g.add(Rectangle(pos=(PANEL_X, PANEL_Y), size=(PANEL_W, PANEL_H)))
+
+        # Ориентиры 60 и 30 FPS
+        scale = GRAPH_H / GRAPH_MAX_MS
+        for ms, color in ((1000 / 60, (0.2, 1, 0.2, 0.5)), (1000 / 30, (1, 0.3, 0.2, 0.5))):
+            y = GRAPH_Y + ms * scale
+            g.add(Color(*color))
+            g.add(Line(points=[PANEL_X + 5, y, PANEL_X + PANEL_W - 5, y], width=1))
+
+        g.add(Color(1, 1, 0.3))
+        self.graph = Line(points=[], width=1)
+        g.add(self.graph)
+
+        g.add(Color(1, 1, 1))
+        atlas = get_atlas(10, (1, 1, 1, 1), charset=DEBUG_CHARSET)
+        top = GRAPH_Y - 18
+        rows = len(PHASES) + 1 + (STATS_LINES if self.stats is not None else 0)
+        self.lines = [AtlasText(g, (PANEL_X + 8, top - i * 18), atlas) for i in range(rows)]
+
+    def update(self, now):
+        """Обновление графика и цифр (не чаще REFRESH)"""
+        if not self.visible or now < self.next_refresh:
+            return
+        self.next_refresh = now + REFRESH
+        profiler = self.profiler
+
+        scale = GRAPH_H / GRAPH_MAX_MS
+        step = (PANEL_W - 10) / GRAPH_FRAMES
+        points = []
+        for i, row in enumerate(profiler.rows(GRAPH_FRAMES)):
+            points.extend((PANEL_X + 5 + i * step, GRAPH_Y + min(row[0], GRAPH_MAX_MS) * scale))
+        self.graph.points = points
+
+        avg = profiler.averages()
+        frame = avg['frame_ms']
+        fps = 1000 / frame if frame else 0
+        self.lines[0].set_text(f"frame {frame:5.1f} ms {fps:3.0f} fps")
+        for line, phase in zip(self.lines[1:], PHASES):
+            line.set_text(f"{phase:<9} {avg[phase]:6.2f} ms")
+        if self.stats is not None:
+            for line, text in zip(self.lines[len(PHASES) + 1:], self.stats()):
+                line.set_text(text)
@@ -0,0 +1,851 @@
+"""
+Neon Space Defender - экран игры
+GameWidget: сцена в retained mode поверх Simulation, HUD, пауза и Game
+Over, отладочные инструменты (оверлей таймингов, cProfile, трассировка,
+статистика памяти). Меню этот модуль не нужен: main.py импортирует его
+при первом построении экрана игры, так что симуляция, NumPy и
+профилировщики не входят в холодный старт до первого кадра меню.
+"""
+
+import os
+import random
+import sys
+from math import cos, sin, pi
+
+from kivy.uix.widget import Widget
+from kivy.clock import Clock
+from kivy.logger import Logger
+from kivy.graphics import (
+    Line, Ellipse, Triangle, Color, Rectangle, InstructionGroup,
+    PushMatrix, PopMatrix, Rotate, Translate
+)
+
+from batching import QuadBatch, StarfieldBatch, ParticleBatch
+from capture import ProfileCapture, env_ticks
+from debughud import DebugOverlay, count_instructions
+from profiler import FrameProfiler, dump_name
+from replay import NULL_TAPE, open_tape
+from scores import ScoreStore
+from screens import ScreenHooks
+from simulation import (
+    Simulation, Inputs, Laser, Enemy, Bonus, EnemyType, SIM_DT
+)
+from soa import AVAILABLE as ARRAYS_AVAILABLE
+from stats import RuntimeStats
+from stress import stress_from_env
+from textcache import AtlasText, CachedLabel, get_atlas, label_cache
+from tracing import NULL_TRACER, TracingProfiler
+
+# Стресс-режим: лазеры и враги в массивах NumPy (NEON_ARRAYS=1)
+USE_ARRAYS = ARRAYS_AVAILABLE and os.environ.get('NEON_ARRAYS') == '1'
+
+# Нагрузка: частый спавн, потолки лазеров и частиц, режим стрельбы (NEON_STRESS)
+STRESS = stress_from_env()
+
+# После подвисания симуляция не догоняет больше 15 шагов (SIM_DT)
+MAX_FRAME_TIME = 0.25
+
+# Долгое нажатие на сердечки (с) — захват cProfile
+LONG_PRESS = 1.0
+
+# Графика, заранее создаваемая в пулах, пока открыто меню (на каждый ключ пула)
+WARM_ENEMIES = 6
+WARM_LASERS = {4: 40, 12: 8}  # по ширине лазера
+WARM_BONUSES = 2
+
+# Цвета врагов по EnemyType.value для отрисовки из массивов
+ARRAY_PALETTE = [
+    (1, 1, 1, 1), (1, 0.2, 0.2, 1), (1, 0.4, 0.4, 1), (0.6, 0, 0, 1), (1, 0.6, 0, 1), (0.9, 0, 0, 1)
+]
+
+class EntityGraphics:
+    """Постоянная группа инструкций сущности (retained mode).
+
+    Создаётся один раз при спавне, каждый кадр меняется только смещение
+    (и при необходимости Color.a), при деспавне группа убирается из слоя.
+    Фигуры строятся в локальных координатах относительно (0, 0).
+    """
+    def __init__(self, layer):
+        self.layer = layer
+        self.group = InstructionGroup()
+        self.translate = Translate(0, 0)
+        self.body = InstructionGroup()
+        self.group.add(PushMatrix())
+        self.group.add(self.translate)
+        self.group.add(self.body)
+        self.group.add(PopMatrix())
+        self.attached = False
+        self.attach()
+
+    def move_to(self, x, y):
+        self.translate.xy = (x, y)
+
+    def attach(self):
+        """Возврат в слой (объект из пула сохраняет свою группу)"""
+        if not self.attached:
+            self.layer.add(self.group)
+            self.attached = True
+
+    def remove(self):
+        if self.attached:
+            self.layer.remove(self.group)
+            self.attached = False
+
+
+class GameWidget(ScreenHooks, Widget):
+    def __init__(self, app_ref=None, **kwargs):
+        super().__init__(**kwargs)
+        self.app = app_ref  # Ссылка на приложение для навигации
+        self.sim = Simulation(arrays=USE_ARRAYS, stress=STRESS)
+        self.sim.on_spawn = self.attach_gfx
+        self.sim.on_despawn = self.detach_gfx
+        # Трассировка (NEON_TRACE) — одна на приложение, фазы идут через профайлер
+        self.tracer = app_ref.tracer if app_ref is not None else NULL_TRACER
+        self.profiler = TracingProfiler(self.tracer) if self.tracer.enabled else FrameProfiler()
+        self.sim.profiler = self.profiler
+        self.sim.tracer = self.tracer
+        self.tape = NULL_TAPE  # запись/повтор ввода (NEON_RECORD / NEON_REPLAY)
+        # Рекорд в памяти, запись на диск в фоне (одно хранилище с меню)
+        self.scores = app_ref.scores if app_ref is not None else ScoreStore()
+        # Память: блоки за кадр, отчёт на границе волн (NEON_TRACEMALLOC=1 — с tracemalloc)
+        self.stats = RuntimeStats()
+        self.sim.on_wave = self.on_wave
+        self.wave_changed = False
+        self.last_debug_tap = 0.0
+        # cProfile на N тиков: F5, долгое нажатие на сердечки или NEON_PROFILE_TICKS
+        self.capture = ProfileCapture(on_saved=self.on_profile_saved)
+        if env_ticks():
+            self.capture.arm()
+        self.warmed = False  # пулы графики уже наполнены (warm_steps)
+        self.build_scene()
+        self.reset_game()
+        # Цикл кадра идёт, только пока экран игры показан (on_enter / on_leave)
+        # и пока на нём что-то движется (см. sleep / wake); интервал —
+        # ограничение FPS с экрана настроек
+        fps = app_ref.settings['fps_cap'] if app_ref is not None else 60
+        self.update_event = Clock.create_trigger(self.update, 1.0 / fps, interval=True)
+        self.sleeping = False
+        self.bind(size=self.on_size)
+
+    def on_enter(self):
+        self.profiler.idle()  # время в меню — не интервал кадра
+        self.sleeping = True
+        self.wake()
+
+    def on_leave(self):
+        self.update_event.cancel()
+        self.sleeping = False
+
+    def set_frame_rate(self, fps):
+        """Ограничение FPS: интервал цикла кадра (со следующего вызова)"""
+        self.update_event.timeout = 1.0 / fps
+
+    def sleep(self):
+        """Простой (пауза, Game Over): статичный кадр уже нарисован.
+
+        Цикл кадра останавливается, главный цикл Kivy лишь опрашивает ввод;
+        canvas не меняется — перерисовок нет.
+        """
+        if self.sleeping:
+            return
+        self.sleeping = True
+        self.update_event.cancel()
+
+    def wake(self):
+        """Ввод во время простоя: цикл кадра снова идёт"""
+        if not self.sleeping:
+            return
+        self.sleeping = False
+        self.update_event()
+
+    def build_scene(self):
+        """Создание слоёв сцены и статичных инструкций (один раз)"""
+        with self.canvas:
+            # Красивый фон (глубокий космос)
+            Color(0.02, 0.02, 0.05)
+            self.bg_rect = Rectangle(size=self.size)
+
+            # Линия горизонта (полосканов)
+            Color(0.1, 0.15, 0.3, 0.3)
+            Line(points=[0, 100, 600, 100], width=2)
+
+        # Слои в порядке отрисовки
+        self.layer_stars = InstructionGroup()
+        self.layer_lasers = InstructionGroup()
+        self.layer_enemies = InstructionGroup()
+        self.layer_enemies_arrays = InstructionGroup()
+        self.layer_bonuses = InstructionGroup()
+        self.layer_particles = InstructionGroup()
+        self.layer_player = InstructionGroup()
+        self.layer_hud = InstructionGroup()
+        self.layer_overlay = InstructionGroup()
+        self.layer_debug = InstructionGroup()
+        self.layers = {
+            'stars': self.layer_stars, 'lasers': self.layer_lasers,
+            'enemies': self.layer_enemies, 'enemies_arrays': self.layer_enemies_arrays,
+            'bonuses': self.layer_bonuses, 'particles': self.layer_particles,
+            'player': self.layer_player, 'hud': self.layer_hud,
+            'overlay': self.layer_overlay, 'debug': self.layer_debug,
+        }
+        for layer in self.layers.values():
+            self.canvas.add(layer)
+        self.debug_overlay = DebugOverlay(self.layer_debug, self.profiler, self.stats_lines)
+
+        # Стресс-режим: враги и лазеры из массивов — одним Mesh
+        self.array_batch = QuadBatch(self.layer_enemies_arrays) if USE_ARRAYS else None
+
+        # Звёзды и частицы — по одному Mesh (два draw call на все объекты)
+        far_stars = [(i, j) for i in range(0, 600, 60) for j in range(0, 800, 80)]
+        self.star_batch = StarfieldBatch(self.layer_stars, far_stars)
+        self.particle_batch = ParticleBatch(self.layer_particles)
+
+        self.build_hud()
+
+    def reset_game(self, tape=NULL_TAPE):
+        """Инициализация/перезагрузка игры (tape — запись или повтор ввода)"""
+        self.tape.close()
+        self.tape = tape
+        self.sim.reset(seed=tape.seed)
+        for layer in (self.layer_player, self.layer_overlay):
+            layer.clear()
+        self.player_gfx = self.build_player_gfx()
+
+        self.accumulator = 0.0
+        self.inputs = Inputs()
+        self.paused = False
+        self.overlay_state = None
+
+        self.high_score = self.scores.get()
+        self.hud_health = None
+
+    def new_game(self):
+        """START и «Заново»: каждая игра — отдельная запись; seed берётся из неё.
+
+        Сцена, подготовленная в меню (warm_steps), ещё не игралась — её не
+        нужно сбрасывать, если запись не задаёт seed.
+        """
+        tape = open_tape('kivy', SIM_DT, USE_ARRAYS, STRESS)
+        if self.sim.ticks == 0 and not self.sim.game_over and tape.seed is None:
+            self.tape.close()
+            self.tape = tape
+            return
+        self.reset_game(tape)
+
+    def warm_steps(self):
+        """Подготовка сцены по шагам (генератор, шаг — кадр меню).
+
+        Растеризует надписи HUD и оверлеев, создаёт графику врагов, лазеров
+        и бонусов прямо в пулах и один раз обновляет сцену, чтобы первый
+        кадр игры не создавал ни текстур, ни инструкций.
+        """
+        if not self.warmed:
+            # Те же параметры, что в draw_game_over / draw_pause_menu
+            for text, size, color in (('GAME OVER', 48, (1, 1, 1, 1)),
+                                      ('⏸ PAUSED', 32, (1, 1, 1, 1)),
+                                      ('▶ Заново', 20, (0, 1, 1, 1)),
+                                      ('✕ Меню', 20, (1, 0.3, 0.3, 1))):
+                label_cache.get(text, size, color, True)
+            yield
+            if self.sim.arrays is None:
+                rng = random.Random(0)  # генератор симуляции не трогаем
+                sim = self.sim
+                for enemy_type in EnemyType:
+                    for _ in range(1 if enemy_type == EnemyType.BOSS else WARM_ENEMIES):
+                        enemy = Enemy(enemy_type, 1, rng)
+                        enemy.gfx = self.build_enemy_gfx(enemy)
+                        enemy.gfx.remove()
+                        sim.enemy_pool.release(enemy_type, enemy)
+                    yield
+                for width, count in WARM_LASERS.items():
+                    for _ in range(count):
+                        laser = Laser(0, 0, width=width)
+                        laser.gfx = self.build_laser_gfx(laser)
+                        laser.gfx.remove()
+                        sim.laser_pool.release(width, laser)
+                yield
+                for bonus_type in ('health', 'shield', 'fire_mode'):
+                    for _ in range(WARM_BONUSES):
+                        bonus = Bonus(0, 0, bonus_type)
+                        bonus.gfx = self.build_bonus_gfx(bonus)
+                        bonus.gfx.remove()
+                        sim.bonus_pool.release(bonus_type, bonus)
+                yield
+            self.warmed = True
+        # HUD (рекорд, счёт), звёзды и частицы — как на первом кадре игры
+        self.high_score = self.scores.get()
+        self.hud_health = None
+        self.draw_game(1.0)
+
+    def on_size(self, instance, value):
+        self.bg_rect.size = value
+
+    def on_touch_down(self, touch):
+        # Отладка: двойной тап по сердечкам — оверлей таймингов,
+        # тап по верхней полосе открытого оверлея — выгрузка буфера в CSV,
+        # долгое нажатие на сердечки — захват cProfile (см. on_touch_up)
+        if touch.x < 100 and touch.y > 750:
+            now = Clock.get_boottime()
+            touch.ud['debug_press'] = now
+            if now - self.last_debug_tap < 0.4:
+                self.toggle_debug_overlay()
+                self.last_debug_tap = 0.0
+                return True
+            self.last_debug_tap = now
+        elif self.debug_overlay.header_contains(touch.x, touch.y):
+            self.dump_frame_times()
+            return True
+
+        self.wake()
+        self.inputs.touch_x = touch.x
+        self.inputs.touch_y = touch.y
+
+        # Если Game Over — проверяем нажатие на кнопки
+        if self.sim.game_over:
+            # Кнопка "Заново" (левая, снизу)
+            if 50 < touch.x < 280 and 150 < touch.y < 220:
+                self.app.start_game()
+                return True
+
+            # Кнопка "Выйти" (правая, снизу)
+            if 320 < touch.x < 550 and 150 < touch.y < 220:
+                self.app.show_menu()
+                return True
+
+        # Кнопка паузы (правый верхний угол): пауза и продолжение
+        if not self.sim.game_over and touch.x > 550 - 40 and touch.y > 750:
+            self.paused = not self.paused
+            return True
+
+        # Обычная игра: выстрел уходит в симуляцию на ближайшем шаге
+        if not self.sim.game_over and not self.paused:
+            self.inputs.shots += 1
+        return True
+
+    def on_touch_move(self, touch):
+        self.inputs.touch_x = touch.x
+        self.inputs.touch_y = touch.y
+        return True
+
+    def on_touch_up(self, touch):
+        pressed = touch.ud.get('debug_press')
+        if pressed is not None and Clock.get_boottime() - pressed >= LONG_PRESS:
+            self.start_profile_capture()
+        self.inputs.touch_x = None
+        self.inputs.touch_y = None
+        return True
+
+    def toggle_debug_overlay(self):
+        return self.debug_overlay.toggle()
+
+    def dump_frame_times(self):
+        """Буфер таймингов фаз — в CSV рядом с highscore.json"""
+        path = dump_name('frames')
+        try:
+            rows = self.profiler.dump_csv(path)
+            Logger.info(f"Profiler: {rows} кадров записано в {path}")
+        except OSError as e:
+            Logger.warning(f"Profiler: не удалось записать {path}: {e}")
+
+    def start_profile_capture(self, ticks=None):
+        if self.capture.arm(ticks):
+            Logger.info(f"Profiler: cProfile на {self.capture.remaining} тиков")
+
+    def on_profile_saved(self, stats_path, collapsed_path):
+        # Вызывается из потока записи
+        Logger.info(f"Profiler: профиль записан в {stats_path} и {collapsed_path}")
+
+    # --- Статистика времени выполнения ---
+
+    def runtime_stats(self):
+        """Сущности симуляции, инструкции canvas по слоям и память"""
+        result = self.sim.stats()
+        result['canvas'] = {name: count_instructions(layer) for name, layer in self.layers.items()}
+        result['alloc_blocks'] = sys.getallocatedblocks()
+        result['alloc_per_frame'] = round(self.stats.alloc_average(), 1)
+        result['traced_kb'] = self.stats.traced_kb()
+        return result
+
+    def stats_lines(self):
+        """Строки для отладочного оверлея"""
+        s = self.runtime_stats()
+        enemies = s['enemies']
+        lines = [
+            f"enemy {sum(enemies.values())}: " + '/'.join(str(n) for n in enemies.values()),
+            f"laser {s['lasers']} bonus {s['bonuses']} part {s['particles']}",
+            f"canvas {sum(s['canvas'].values())} instr",
+            f"alloc {s['alloc_per_frame']:+.0f} blk/f {s['alloc_blocks'] // 1000}k",
+        ]
+        if s['traced_kb'] is not None:
+            lines[-1] += f" {s['traced_kb']}kb"
+        return lines
+
+    def on_wave(self, wave):
+        # Из sim.step: отчёт снимается после кадра, вне шага симуляции
+        self.wave_changed = True
+
+    def log_wave_stats(self):
+        self.wave_changed = False
+        s = self.runtime_stats()
+        report = self.stats.wave_report()
+        enemies = ', '.join(f"{name} {n}" for name, n in s['enemies'].items() if n)
+        Logger.info(f"Stats: волна {self.sim.wave}: враги [{enemies}], лазеры {s['lasers']}, "
+                    f"бонусы {s['bonuses']}, частицы {s['particles']}, "
+                    f"инструкций canvas {sum(s['canvas'].values())}, "
+                    f"блоков {report['alloc_blocks']} ({report['alloc_blocks_delta']:+d})")
+        if 'growth_kb' in report:
+            growth = ', '.join(f"{name} {kb:+.1f}" for name, kb in report['growth_kb'].items())
+            Logger.info(f"Stats: tracemalloc {report['traced_kb']} КБ; прирост по файлам, КБ: [{growth}]")
+        elif 'traced_kb' in report:
+            Logger.info(f"Stats: tracemalloc {report['traced_kb']} КБ")
+
+    def finish_tape(self):
+        if not self.tape.enabled:
+            return
+        if not self.tape.finish(self.sim.ticks, self.sim.score):
+            Logger.warning(f"Replay: итог не совпал с записью {self.tape.expected}")
+        self.tape.close()
+
+    def update(self, dt):
+        sim = self.sim
+        if sim.game_over or self.paused:
+            # Сцена не меняется — оверлей строится один раз при переходе,
+            # дальше цикл кадра спит до ввода
+            self.draw_overlay()
+            self.profiler.idle()
+            self.sleep()
+            return
+        frame = self.tape.frame(dt)
+        if frame is None:
+            # Не через sim.end_game(): в бессмертном стресс-режиме она лишь
+            # лечит корабль, и повтор не закончился бы никогда
+            Logger.info("Replay: запись кончилась")
+            sim.game_over = True
+            self.finish_tape()
+            return
+        dt = frame[0]
+        self.capture.begin_tick()
+        self.profiler.begin_frame()
+        self.stats.begin_frame()
+        # Дрожание вызовов Clock относительно заказанного интервала (1 / ограничение FPS)
+        self.tracer.counter('clock', dt_ms=dt * 1000,
+                            jitter_ms=(dt - self.update_event.timeout) * 1000)
+        if self.overlay_state is not None:
+            self.draw_overlay()
+
+        # Накопитель: симуляция идёт ровными шагами SIM_DT, сколько бы
+        # времени ни прошло между кадрами
+        self.accumulator += min(dt, MAX_FRAME_TIME)
+        while self.accumulator >= SIM_DT:
+            self.accumulator -= SIM_DT
+            self.tape.step(self.inputs)
+            sim.step(SIM_DT, self.inputs)
+            self.inputs.shots = 0
+            if sim.game_over:
+                self.accumulator = 0.0
+                # Рекорд сразу в памяти (экран Game Over), файл пишет фоновый поток
+                self.scores.submit(sim.score)
+                self.high_score = self.scores.get()
+                self.finish_tape()
+                break
+
+        # Отрисовка между двумя последними состояниями симуляции
+        self.draw_game(self.accumulator / SIM_DT)
+        self.stats.end_frame()
+        self.profiler.end_frame()
+        if self.wave_changed:
+            self.log_wave_stats()
+        self.debug_overlay.update(Clock.get_boottime())
+        self.capture.end_tick()
+
+    # --- Графика сущностей симуляции (создание при спавне, снятие при деспавне) ---
+
+    def attach_gfx(self, entity):
+        """Sim.on_spawn: постоянная графика строится один раз на объект пула"""
+        if isinstance(entity, Enemy):
+            self.place_enemy(entity)
+        elif isinstance(entity, Bonus):
+            self.place_bonus(entity)
+        elif isinstance(entity, Laser):
+            self.place_laser(entity)
+
+    def detach_gfx(self, entity):
+        """Sim.on_despawn: графика уходит из слоя вместе с объектом в пул"""
+        if entity.gfx is not None:
+            entity.gfx.remove()
+
+    def place_enemy(self, enemy):
+        if enemy.gfx is None:
+            enemy.gfx = self.build_enemy_gfx(enemy)
+        else:
+            gfx = enemy.gfx
+            gfx.bar_health = enemy.max_health
+            gfx.bar_colors[0].a = gfx.bar_colors[1].a = 0
+            gfx.move_to(enemy.x, enemy.y)
+            gfx.attach()
+
+    def place_bonus(self, bonus):
+        if bonus.gfx is None:
+            bonus.gfx = self.build_bonus_gfx(bonus)
+        else:
+            bonus.gfx.rotate.angle = -bonus.rotation
+            bonus.gfx.move_to(bonus.x, bonus.y)
+            bonus.gfx.attach()
+
+    def place_laser(self, laser):
+        if laser.gfx is None:
+            laser.gfx = self.build_laser_gfx(laser)
+        else:
+            laser.gfx.move_to(laser.x, laser.y)
+            laser.gfx.attach()
+
+    # --- Построение постоянной графики ---
+
+    def build_player_gfx(self):
+        gfx = EntityGraphics(self.layer_player)
+        g = gfx.body
+        # Игрок (реалистичный самолет)
+        g.add(Color(0, 1, 1))
+        self.draw_realistic_airplane(g, 0, 0)
+
+        # Щит (двойное свечение), видимость через Color.a
+        gfx.shield_colors = [Color(0, 1, 1, 0), Color(0, 1, 1, 0)]
+        g.add(gfx.shield_colors[0])
+        g.add(Ellipse(pos=(-25, -25), size=(90, 90)))
+        g.add(gfx.shield_colors[1])
+        g.add(Ellipse(pos=(-30, -30), size=(100, 100)))
+        return gfx
+
+    def build_laser_gfx(self, laser):
+        """Лазеры (яркие с подсветкой)"""
+        gfx = EntityGraphics(self.layer_lasers)
+        g = gfx.body
+        width = laser.width
+        g.add(Color(0, 1, 1))
+        g.add(Ellipse(pos=(-width/2, 0), size=(width, 15)))
+        g.add(Color(0.5, 1, 1, 0.5))
+        g.add(Ellipse(pos=(-width - 2, 0), size=(width + 4, 15)))
+        gfx.move_to(laser.x, laser.y)
+        return gfx
+
+    def build_enemy_gfx(self, enemy):
+        """Враги с улучшенной графикой"""
+        gfx = EntityGraphics(self.layer_enemies)
+        g = gfx.body
+        w, h = enemy.width, enemy.height
+        if enemy.type == EnemyType.NORMAL:
+            g.add(Color(1, 0.2, 0.2))
+            self.draw_enemy_ship(g, 0, 0, w, h, enemy.angle)
+        elif enemy.type == EnemyType.FAST:
+            g.add(Color(1, 0.4, 0.4))
+            self.draw_fast_enemy(g, 0, 0, w, h, enemy.angle)
+        elif enemy.type == EnemyType.TANK:
+            g.add(Color(0.6, 0, 0))
+            self.draw_tank_enemy(g, 0, 0, w, h)
+        elif enemy.type == EnemyType.MINI:
+            g.add(Color(1, 0.6, 0))
+            self.draw_mini_enemy(g, 0, 0, w, h, enemy.angle)
+        elif enemy.type == EnemyType.BOSS:
+            g.add(Color(0.9, 0, 0))
+            self.draw_boss_enemy(g, 0, 0, w, h, enemy.angle)
+
+        # Красивая полоса здоровья (скрыта, пока враг цел)
+        gfx.bar_colors = [Color(0, 1, 0, 0), Color(1, 0, 0, 0)]
+        gfx.bar = Rectangle(pos=(0, -8), size=(w, 3))
+        g.add(gfx.bar_colors[0])
+        g.add(gfx.bar)
+        g.add(gfx.bar_colors[1])
+        g.add(Rectangle(pos=(0, -8), size=(w, 3)))
+        gfx.bar_health = enemy.max_health
+        gfx.move_to(enemy.x, enemy.y)
+        return gfx
+
+    def build_bonus_gfx(self, bonus):
+        """Бонусы (вращающиеся звёзды)"""
+        gfx = EntityGraphics(self.layer_bonuses)
+        g = gfx.body
+        if bonus.bonus_type == 'health':
+            g.add(Color(1, 0, 0))
+        elif bonus.bonus_type == 'shield':
+            g.add(Color(0, 1, 1))
+        else:
+            g.add(Color(1, 1, 0))
+        g.add(Translate(10, 10))
+        # draw_star вращает по часовой стрелке, Rotate — против
+        gfx.rotate = Rotate(angle=-bonus.rotation, axis=(0, 0, 1), origin=(0, 0))
+        g.add(gfx.rotate)
+        self.draw_star(g, 0, 0, 8, 0)
+        gfx.move_to(bonus.x, bonus.y)
+        return gfx
+
+    def build_hud(self):
+        """Верхняя панель информации (статичная часть)"""
+        g = self.layer_hud
+        g.add(Color(0, 0, 0, 0.6))
+        g.add(Rectangle(pos=(0, 750), size=(600, 50)))
+        g.add(Color(0.2, 1, 0.8))
+        g.add(Line(points=[0, 750, 600, 750], width=2))
+
+        # Кнопка паузы (правый верхний угол, см. on_touch_down)
+        g.add(Rectangle(pos=(566, 762), size=(6, 24)))
+        g.add(Rectangle(pos=(580, 762), size=(6, 24)))
+
+        # Здоровье (сердечки) — перестраиваются только при изменении
+        self.hud_hearts = InstructionGroup()
+        g.add(self.hud_hearts)
+
+        # Текстовые поля кэшируются по отдельности: обычно не меняется ни одно.
+        # Score и combo меняются почти каждый килл — они рисуются из атласа глифов
+        g.add(Color(1, 1, 1))
+        hud_color = (0.2, 1, 0.8, 1)
+        atlas = get_atlas(11, hud_color, bold=True)
+        self.hud_fields = [
+            AtlasText(g, (120, 762), atlas),
+            CachedLabel(g, (120, 762), 11, color=hud_color, bold=True),
+            CachedLabel(g, (120, 762), 11, color=hud_color, bold=True),
+            AtlasText(g, (120, 762), atlas),
+        ]
+
+    # --- Обновление постоянной графики на месте ---
+
+    def draw_game(self, alpha=1.0):
+        """Обновление игрового поля: только позиции и прозрачность.
+
+        alpha — доля шага симуляции, прошедшая после последнего step():
+        позиции интерполируются между предыдущим и текущим состоянием.
+        """
+        sim = self.sim
+        self.star_batch.update(sim.stars)
+
+        for laser in sim.lasers:
+            laser.gfx.move_to(laser.x, laser.py + (laser.y - laser.py) * alpha)
+
+        for enemy in sim.enemies:
+            gfx = enemy.gfx
+            gfx.move_to(enemy.x, enemy.py + (enemy.y - enemy.py) * alpha)
+            if enemy.health != gfx.bar_health:
+                gfx.bar_health = enemy.health
+                bar_w = enemy.width * (enemy.health / enemy.max_health)
+                gfx.bar.pos = ((enemy.width - bar_w) / 2, -8)
+                gfx.bar.size = (bar_w, 3)
+                gfx.bar_colors[0].a = 1
+                gfx.bar_colors[1].a = 0.3
+
+        for bonus in sim.bonuses:
+            bonus.gfx.move_to(bonus.x, bonus.py + (bonus.y - bonus.py) * alpha)
+            bonus.gfx.rotate.angle = -bonus.rotation
+
+        # Массивы и частицы движутся равномерно: интерполяция — сдвиг назад
+        # по скорости на недостающую часть шага
+        lag = (alpha - 1.0) * SIM_DT
+        if sim.arrays is not None:
+            self.array_batch.set_vertices(sim.arrays.rect_vertices(ARRAY_PALETTE, lag=lag))
+
+        # Частицы взрыва
+        self.particle_batch.update(sim.particles, lag)
+
+        player = sim.player
+        self.player_gfx.move_to(player.px + (player.x - player.px) * alpha,
+                                player.py + (player.y - player.py) * alpha)
+        shield_colors = self.player_gfx.shield_colors
+        if player.has_shield:
+            shield_colors[0].a, shield_colors[1].a = 0.2, 0.15
+        else:
+            shield_colors[0].a, shield_colors[1].a = 0, 0
+
+        self.profiler.mark('draw')
+
+        # Рисование текстовой информации
+        self.draw_top_ui()
+        self.profiler.mark('hud')
+
+    def draw_top_ui(self):
+        """Обновление текстовой информации сверху"""
+        sim = self.sim
+        # Здоровье (сердечки)
+        if sim.player.health != self.hud_health:
+            self.hud_health = sim.player.health
+            self.hud_hearts.clear()
+            self.hud_hearts.add(Color(1, 0, 0))
+            for i in range(sim.player.health):
+                x_pos = 15 + i * 20
+                self.hud_hearts.add(Ellipse(pos=(x_pos, 762), size=(12, 12)))
+
+        # Текстовая информация: score, high score, wave, combo
+        texts = (f"Score: {sim.score}", f"High: {self.high_score}",
+                 f"Wave: {sim.wave}", f"Combo: {sim.combo}x")
+        changed = False
+        for field, text in zip(self.hud_fields, texts):
+            changed = field.set_text(text) or changed
+
+        # Поля идут друг за другом — сдвигаем только если изменилась ширина
+        if changed:
+            x = 120
+            for field in self.hud_fields:
+                field.set_x(x)
+                x += field.width + 8
+
+    def draw_overlay(self):
+        """Оверлей паузы / Game Over: строится один раз при смене состояния"""
+        state = 'game_over' if self.sim.game_over else 'paused' if self.paused else None
+        if state == self.overlay_state:
+            return
+        self.overlay_state = state
+        self.layer_overlay.clear()
+        if self.sim.game_over:
+            self.draw_game_over(self.layer_overlay)
+        elif self.paused:
+            self.draw_pause_menu(self.layer_overlay)
+
+    def add_label(self, g, text, pos, font_size, color=(1, 1, 1, 1), bold=False):
+        """Текст из общего кэша текстур (без повторной растеризации)"""
+        texture = label_cache.get(text, font_size, color, bold)
+        if texture:
+            g.add(Rectangle(texture=texture, size=texture.size, pos=pos))
+
+    def draw_pause_menu(self, g):
+        """Отрисовка меню паузы"""
+        g.add(Color(0, 0, 0, 0.7))
+        g.add(Rectangle(size=self.size))
+
+        g.add(Color(0, 1, 1))
+        self.add_label(g, '⏸ PAUSED', (150, 380), font_size=32, bold=True)
+
+    def draw_game_over(self, g):
+        """Отрисовка экрана Game Over с кнопками"""
+        # Тёмный фон (полупрозрачный)
+        g.add(Color(0, 0, 0, 0.85))
+        g.add(Rectangle(size=self.size))
+
+        # Заголовок "GAME OVER"
+        g.add(Color(1, 0.1, 0.1))
+        self.add_label(g, 'GAME OVER', (100, 550), font_size=48, bold=True)
+
+        # Информация: Score
+        g.add(Color(1, 1, 0))
+        self.add_label(g, f'📊 Score: {self.sim.score}', (120, 480), font_size=28, bold=True)
+
+        # Информация: Wave
+        g.add(Color(0.2, 1, 0.8))
+        self.add_label(g, f'🌊 Wave Reached: {self.sim.wave}', (110, 420), font_size=26, bold=True)
+
+        # Информация: High Score
+        g.add(Color(1, 0.6, 0))
+        self.add_label(g, f'🏆 High Score: {self.high_score}', (130, 360), font_size=22)
+
+        # КНОПКА "Заново" (левая)
+        g.add(Color(0, 0.6, 0.6))  # Цвет кнопки
+        g.add(Rectangle(pos=(50, 150), size=(220, 70)))  # Кнопка
+        g.add(Color(0, 1, 1))  # Контур
+        g.add(Line(points=[50, 150, 270, 150, 270, 220, 50, 220, 50, 150], width=3))
+
+        # Текст на кнопке "Заново" (по центру)
+        g.add(Color(0, 1, 1))
+        self.add_label(g, '▶ Заново', (80, 175), font_size=20, bold=True, color=(0, 1, 1, 1))
+
+        # КНОПКА "Выйти" (правая)
+        g.add(Color(0.6, 0.2, 0.2))  # Цвет кнопки
+        g.add(Rectangle(pos=(320, 150), size=(220, 70)))  # Кнопка
+        g.add(Color(1, 0.3, 0.3))  # Контур
+        g.add(Line(points=[320, 150, 540, 150, 540, 220, 320, 220, 320, 150], width=3))
+
+        # Текст на кнопке "Выйти" (по центру)
+        g.add(Color(1, 0.3, 0.3))
+        self.add_label(g, '✕ Меню', (350, 175), font_size=20, bold=True, color=(1, 0.3, 0.3, 1))
+
+    def draw_realistic_airplane(self, g, x, y):
+        """Отрисовка реалистичного самолета"""
+        cx, cy = x + 20, y + 20
+
+        # Носовая часть
+        points_nose = [(cx, cy - 18), (cx - 5, cy - 15), (cx + 5, cy - 15)]
+        g.add(Triangle(points=(points_nose[0][0], points_nose[0][1],
+                               points_nose[1][0], points_nose[1][1],
+                               points_nose[2][0], points_nose[2][1])))
+
+        # Основной корпус
+        g.add(Triangle(points=(cx - 5, cy - 15, cx - 8, cy, cx - 6, cy + 8)))
+        g.add(Triangle(points=(cx + 5, cy - 15, cx + 8, cy, cx + 6, cy + 8)))
+        g.add(Triangle(points=(cx - 6, cy + 8, cx + 6, cy + 8, cx, cy + 12)))
+
+        # Контур самолета
+        g.add(Color(0, 1.5, 1.5))
+        g.add(Line(points=[cx, cy - 18, cx - 8, cy, cx - 6, cy + 8, cx, cy + 12, cx + 6, cy + 8, cx + 8, cy, cx, cy - 18], width=1.5))
+
+        # Огни кабины
+        g.add(Color(0, 1, 1, 0.8))
+        g.add(Ellipse(pos=(cx - 3, cy - 10), size=(6, 6)))
+
+        # Выхлопы (пламя двигателя)
+        g.add(Color(1, 0.6, 0, 0.6))
+        g.add(Triangle(points=(cx - 4, cy + 12, cx - 2, cy + 16, cx - 6, cy + 14)))
+        g.add(Triangle(points=(cx + 4, cy + 12, cx + 2, cy + 16, cx + 6, cy + 14)))
+
+    def draw_enemy_ship(self, g, x, y, w, h, angle):
+        """Отрисовка вражеского корабля"""
+        cx, cy = x + w/2, y + h/2
+
+        # Основной корпус
+        points = [
+            (cx, cy - h/2 + 2),
+            (cx - w/2 + 2, cy + h/3),
+            (cx + w/2 - 2, cy + h/3),
+            (cx, cy + h/2 - 2),
+        ]
+
+        g.add(Triangle(points=(points[0][0], points[0][1],
+                               points[1][0], points[1][1],
+                               points[2][0], points[2][1])))
+        g.add(Triangle(points=(points[1][0], points[1][1],
+                               points[2][0], points[2][1],
+                               points[3][0], points[3][1])))
+
+        # Контур
+        g.add(Color(1, 0.4, 0.4))
+        g.add(Line(points=[p[0] for p in points] + [points[0][0]] +
+                          [p[1] for p in points] + [points[0][1]], width=1))
+
+    def draw_fast_enemy(self, g, x, y, w, h, angle):
+        """Быстрый враг"""
+        cx, cy = x + w/2, y + h/2
+        g.add(Triangle(points=(cx, cy - h/2, cx - w/2, cy + h/2, cx + w/2, cy + h/2)))
+
+    def draw_tank_enemy(self, g, x, y, w, h):
+        """Танк"""
+        g.add(Rectangle(pos=(x, y), size=(w, h)))
+        cx, cy = x + w/2, y + h/2
+        g.add(Color(0.8, 0, 0))
+        g.add(Ellipse(pos=(cx - 8, cy - 8), size=(16, 16)))
+
+    def draw_mini_enemy(self, g, x, y, w, h, angle):
+        """Мини враг"""
+        g.add(Ellipse(pos=(x, y), size=(w, h)))
+
+    def draw_boss_enemy(self, g, x, y, w, h, angle):
+        """Босс"""
+        cx, cy = x + w/2, y + h/2
+
+        # Основная форма
+        g.add(Triangle(points=(cx, cy - h/2, cx - w/2, cy + h/2, cx + w/2, cy + h/2)))
+
+        # Контур боса
+        g.add(Color(0.9, 0, 0))
+        g.add(Line(points=[cx, cy - h/2, cx - w/2, cy + h/2, cx + w/2, cy + h/2, cx, cy - h/2], width=2))
+
+        # Глаз
+        g.add(Ellipse(pos=(cx - 4, cy - 10), size=(8, 8)))
+
+    def draw_star(self, g, x, y, size, rotation):
+        """Рисование вращающейся звезды"""
+        points = []
+        for i in range(10):
+            angle = (rotation + i * 36) * pi / 180
+            if i % 2 == 0:
+                r = size
+            else:
+                r = size / 2
+            px = x + r * sin(angle)
+            py = y + r * cos(angle)
+            points.extend([px, py])
+
+        points.extend([points[0], points[1]])
+        g.add(Line(points=points, width=1.5))
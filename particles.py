@@ -0,0 +1,153 @@
+"""
+Neon Space Defender - пул частиц
+Кольцевой буфер фиксированной ёмкости: позиции, скорости, время жизни и
+индекс цвета лежат в заранее выделенных массивах, при переполнении
+перезаписываются самые старые частицы. Память постоянна при любом числе
+взрывов, мусора для GC нет. С NumPy обновление векторное, без него —
+один цикл по окну живых частиц.
+"""
+
+from array import array
+from math import cos, sin, pi
+import random
+
+from soa import load_numpy
+
+# Цвета взрыва (индекс цвета хранится в пуле)
+EXPLOSION_COLORS = [(1, 0.4, 0), (1, 0.6, 0), (1, 0.8, 0), (1, 1, 0)]
+
+MAX_PARTICLES = 2048
+
+
+class ParticlePool:
+    """Частицы в кольцевом буфере.
+
+    Живые частицы занимают окно из live слотов, заканчивающееся перед head;
+    время жизни у всех одинаковое, поэтому умирают они с хвоста окна.
+    """
+    def __init__(self, capacity=MAX_PARTICLES, colors=EXPLOSION_COLORS, use_numpy=True, rng=random):
+        self.capacity = capacity
+        self.colors = colors
+        self.rng = rng
+        np = load_numpy() if use_numpy else None
+        self.numpy = np is not None
+        if self.numpy:
+            def floats():
+                return np.zeros(capacity)
+            self.color = np.zeros(capacity, dtype=np.int8)
+        else:
+            def floats():
+                return array('d', bytes(8 * capacity))
+            self.color = array('b', bytes(capacity))
+        self.x, self.y = floats(), floats()
+        self.vx, self.vy = floats(), floats()
+        self.life, self.max_life = floats(), floats()
+        self.size = floats()
+
+        self.head = 0
+        self.live = 0
+        self.spawned = 0
+        self.overwritten = 0
+
+    def __len__(self):
+        return self.live
+
+    def clear(self):
+        self.head = 0
+        self.live = 0
+        if self.numpy:
+            self.life[:] = 0
+        else:
+            self.life[:] = array('d', bytes(8 * self.capacity))
+
+    def emit(self, x, y, vx, vy, color_index, size, life_time=0.5):
+        """Запись частицы в слот head; при полном буфере — поверх самой старой"""
+        i = self.head
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.color[i] = color_index
+        self.size[i] = size
+        self.life[i] = life_time
+        self.max_life[i] = life_time
+        self.head = (i + 1) % self.capacity
+        if self.live < self.capacity:
+            self.live += 1
+        else:
+            self.overwritten += 1
+        self.spawned += 1
+
+    def burst(self, x, y, count=8, speed_min=200, speed_max=400, life_time=0.5):
+        """Взрыв: count частиц во все стороны"""
+        n_colors = len(self.colors)
+        rng = self.rng
+        for _ in range(count):
+            angle = rng.random() * 2 * pi
+            speed = rng.uniform(speed_min, speed_max)
+            color_index = rng.randrange(n_colors)
+            size = rng.randint(2, 6)
+            self.emit(x, y, cos(angle) * speed, sin(angle) * speed, color_index, size, life_time)
+
+    def window(self):
+        """Диапазоны индексов окна живых частиц (от старых к новым)"""
+        start = self.head - self.live
+        if start >= 0:
+            return (range(start, self.head),)
+        return (range(start + self.capacity, self.capacity), range(0, self.head))
+
+    def update(self, dt):
+        """Одно пакетное обновление всех частиц за кадр"""
+        if not self.live:
+            return
+        if self.numpy:
+            self.x += self.vx * dt
+            self.y += self.vy * dt
+            self.life -= dt
+        else:
+            x, y, vx, vy, life = self.x, self.y, self.vx, self.vy, self.life
+            for indices in self.window():
+                for i in indices:
+                    x[i] += vx[i] * dt
+                    y[i] += vy[i] * dt
+                    life[i] -= dt
+
+        # Умершие частицы отрезаются с хвоста окна
+        life = self.life
+        tail = (self.head - self.live) % self.capacity
+        while self.live and life[tail] <= 0:
+            tail = (tail + 1) % self.capacity
+            self.live -= 1
+
+    def alive(self):
+        """Индексы живых частиц (для отрисовки без NumPy)"""
+        life = self.life
+        for indices in self.window():
+            for i in indices:
+                if life[i] > 0:
+                    yield i
+
+    def quad_vertices(self, lag=0.0):
+        """Вершины (x, y, r, g, b, a) квадратов живых частиц — векторно (NumPy).
+
+        lag — сдвиг по времени (движение равномерное, позиция x + vx * lag).
+        """
+        np = load_numpy()
+        idx = np.concatenate([np.arange(r.start, r.stop) for r in self.window()])
+        idx = idx[self.life[idx] > 0]
+        half = self.size[idx] / 2
+        x0 = self.x[idx] + self.vx[idx] * lag - half
+        y0 = self.y[idx] + self.vy[idx] * lag - half
+        x1 = x0 + self.size[idx]
+        y1 = y0 + self.size[idx]
+        rgba = np.empty((len(idx), 4))
+        rgba[:, :3] = np.asarray(self.colors, dtype='f8')[self.color[idx]]
+        rgba[:, 3] = self.life[idx] / self.max_life[idx]
+
+        v = np.empty((len(idx), 4, 6))
+        v[:, 0, 0], v[:, 0, 1] = x0, y0
+        v[:, 1, 0], v[:, 1, 1] = x1, y0
+        v[:, 2, 0], v[:, 2, 1] = x1, y1
+        v[:, 3, 0], v[:, 3, 1] = x0, y1
+        v[:, :, 2:] = rgba[:, None, :]
+        return v.ravel().tolist()
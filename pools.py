@@ -0,0 +1,66 @@
+"""
+Neon Space Defender - пулы объектов
+Враги, бонусы и лазеры не создаются заново на каждый спавн: при деспавне
+объект уходит в свободный список (free list), при спавне берётся оттуда
+и переинициализируется методом reset(). Объект может сохранять дорогие
+части (например, постоянную графику) между использованиями.
+"""
+
+
+class ObjectPool:
+    """Свободный список объектов одного вида со счётчиками попаданий"""
+    def __init__(self, factory, max_free=256):
+        self.factory = factory
+        self.max_free = max_free
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def acquire(self, *args):
+        """Объект из пула (hit) или новый (miss); аргументы — как у reset()"""
+        if self.free:
+            self.hits += 1
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+        self.misses += 1
+        return self.factory(*args)
+
+    def release(self, obj):
+        if len(self.free) < self.max_free:
+            self.free.append(obj)
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'dropped': self.dropped, 'free': len(self.free)}
+
+
+class KeyedPool:
+    """Отдельный свободный список на каждый ключ (тип врага, вид бонуса...),
+    чтобы переиспользованный объект сохранял подходящую графику"""
+    def __init__(self, factory, max_free=256):
+        self.factory = factory
+        self.max_free = max_free
+        self.pools = {}
+
+    def pool(self, key):
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = ObjectPool(self.factory, self.max_free)
+        return pool
+
+    def acquire(self, key, *args):
+        return self.pool(key).acquire(*args)
+
+    def release(self, key, obj):
+        self.pool(key).release(obj)
+
+    def stats(self):
+        total = {'hits': 0, 'misses': 0, 'dropped': 0, 'free': 0}
+        for pool in self.pools.values():
+            for name, value in pool.stats().items():
+                total[name] += value
+        return total
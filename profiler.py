@@ -0,0 +1,126 @@
+"""
+Neon Space Defender - тайминги фаз кадра
+Время каждой фазы кадра (ввод, спавн, лазеры, враги, бонусы, частицы,
+отрисовка, HUD) пишется в кольцевой буфер фиксированного размера: память
+постоянна, старые кадры перезаписываются. Запись стоит пары вызовов
+perf_counter на фазу, поэтому включена всегда; по запросу буфер
+выгружается в CSV, а оверлей (debughud.py) рисует график.
+"""
+
+import time
+from array import array
+
+PHASES = ('input', 'spawn', 'lasers', 'enemies', 'bonuses', 'particles', 'draw', 'hud')
+
+# Кадров в буфере (10 секунд при 60 FPS)
+HISTORY = 600
+
+
+class FrameProfiler:
+    """Кольцевой буфер строк: [интервал кадра, фаза 1, фаза 2, ...] в мс.
+
+    begin_frame() открывает строку, mark(phase) добавляет к фазе время с
+    прошлой отметки (несколько шагов симуляции за кадр суммируются),
+    end_frame() закрывает строку.
+    """
+    def __init__(self, capacity=HISTORY, phases=PHASES):
+        self.capacity = capacity
+        self.phases = phases
+        self.columns = ('frame_ms',) + tuple(phases)
+        self.width = len(self.columns)
+        self.index = {phase: i + 1 for i, phase in enumerate(phases)}
+        self.data = array('d', bytes(8 * capacity * self.width))
+        self.head = 0
+        self.count = 0
+        self.row = 0
+        self.frame_start = None
+        self.last = 0.0
+        self.clock = time.perf_counter
+
+    def __len__(self):
+        return self.count
+
+    def begin_frame(self):
+        now = self.clock()
+        row = self.row = self.head * self.width
+        data = self.data
+        for i in range(row, row + self.width):
+            data[i] = 0.0
+        # Интервал от начала прошлого кадра — то, что видит игрок
+        if self.frame_start is not None:
+            data[row] = (now - self.frame_start) * 1000
+        self.frame_start = now
+        self.last = now
+
+    def mark(self, phase):
+        now = self.clock()
+        self.data[self.row + self.index[phase]] += (now - self.last) * 1000
+        self.last = now
+
+    def skip(self):
+        """Сброс отметки: время до следующего mark() никуда не пишется"""
+        self.last = self.clock()
+
+    def end_frame(self):
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def idle(self):
+        """Кадр без симуляции (пауза): следующий интервал не учитывает простой"""
+        self.frame_start = None
+
+    def rows(self, last=None):
+        """Строки от старых к новым (last — только последние N)"""
+        count = self.count if last is None else min(last, self.count)
+        width, data = self.width, self.data
+        start = (self.head - count) % self.capacity
+        for n in range(count):
+            row = ((start + n) % self.capacity) * width
+            yield data[row:row + width]
+
+    def averages(self, last=60):
+        """Средние по столбцам за последние кадры: {столбец: мс}"""
+        totals = [0.0] * self.width
+        n = 0
+        for row in self.rows(last):
+            n += 1
+            for i, value in enumerate(row):
+                totals[i] += value
+        return {name: (totals[i] / n if n else 0.0) for i, name in enumerate(self.columns)}
+
+    def dump_csv(self, path):
+        """Выгрузка всего буфера в CSV; возвращает число строк"""
+        n = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('frame,' + ','.join(self.columns) + '\n')
+            for row in self.rows():
+                f.write(f"{n}," + ','.join(f"{value:.3f}" for value in row) + '\n')
+                n += 1
+        return n
+
+
+class NullProfiler:
+    """Профайлер-заглушка: симуляция без фронтенда (тесты, бенчмарки)"""
+    def begin_frame(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def skip(self):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def idle(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def dump_name(prefix='frames'):
+    """Имя файла выгрузки с отметкой времени (рядом с highscore.json)"""
+    return time.strftime(f'{prefix}-%Y%m%d-%H%M%S.csv')
@@ -0,0 +1,339 @@
+"""
+Neon Space Defender - запись ввода и детерминированный повтор
+Одна игра — один файл: seed генератора, dt каждого кадра и ввод на
+каждом шаге симуляции (касание и выстрелы в game.py, нажатые клавиши в
+survivor.py). Повтор подставляет всё это вместо реального ввода и часов,
+поэтому игра проходит бит в бит так же — медленную сессию с устройства
+можно гонять как повторяемую нагрузку для профилирования.
+
+Включение:
+    NEON_RECORD=1 python main.py          # record-<время>.nsdr на каждую игру
+    NEON_REPLAY=rec.nsdr python main.py   # повтор с отрисовкой (и survivor.py)
+    python replay.py rec.nsdr             # повтор без окна на максимальной скорости
+    python replay.py rec.nsdr --render    # то же, что NEON_REPLAY
+
+Формат: заголовок (MAGIC, версия, фронтенд, флаги, seed, шаг симуляции),
+при FLAG_STRESS — параметры стресс-режима (длина и строка NEON_STRESS),
+дальше поток записей, сжатый zlib. Записи кодируются разностно: шаг без
+изменений ввода — один байт.
+"""
+
+import os
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+MAGIC = b'NSDR'
+VERSION = 2  # 2: параметры стресс-режима в заголовке
+HEADER = struct.Struct('<4sBBBqd')  # magic, версия, фронтенд, флаги, seed, шаг
+STRESS_SPEC = struct.Struct('<H')   # длина строки StressConfig.spec() (UTF-8)
+FRONTENDS = ('kivy', 'pygame')
+FLAG_ARRAYS = 1
+FLAG_STRESS = 2
+
+ENV_RECORD = 'NEON_RECORD'
+ENV_REPLAY = 'NEON_REPLAY'
+
+# Записи: младшие 4 бита — тип, старшие — флаги полей
+REC_FRAME = 0x01   # '<d' dt кадра (+ B событий при FRAME_EVENTS)
+REC_STEP = 0x02    # ввод шага симуляции
+REC_CHECK = 0x03   # '<qq' тики и счёт в конце игры
+FRAME_EVENTS = 0x10
+STEP_TOUCH = 0x10       # касание изменилось: '<dd' x, y ...
+STEP_NO_TOUCH = 0x20    # ... или касания больше нет
+STEP_SHOTS = 0x40       # B выстрелов
+STEP_KEYS = 0x80        # B маска клавиш изменилась
+
+F64 = struct.Struct('<d')
+TOUCH = struct.Struct('<dd')
+CHECK = struct.Struct('<qq')
+
+# Размер несжатого буфера перед передачей в zlib
+CHUNK = 64 * 1024
+
+
+class NullTape:
+    """Ни записи, ни повтора: ввод и время проходят как есть"""
+    enabled = False
+    seed = None
+
+    def frame(self, dt, events=0):
+        return dt, events
+
+    def step(self, inputs=None, keys=0):
+        return keys
+
+    def finish(self, ticks, score):
+        return True
+
+    def close(self):
+        pass
+
+
+NULL_TAPE = NullTape()
+
+
+class Recorder:
+    """Запись одной игры; seed выбирается здесь и отдаётся симуляции"""
+    enabled = True
+
+    def __init__(self, path, frontend, step_dt, arrays=False, seed=None, stress=None):
+        self.path = path
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(8), 'little') >> 1
+        flags = (FLAG_ARRAYS if arrays else 0) | (FLAG_STRESS if stress is not None else 0)
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, FRONTENDS.index(frontend),
+                                    flags, self.seed, step_dt))
+        if stress is not None:
+            spec = stress.spec().encode('utf-8')
+            self.file.write(STRESS_SPEC.pack(len(spec)) + spec)
+        self.zip = zlib.compressobj(9)
+        self.buffer = bytearray()
+        self.touch = (None, None)
+        self.keys = 0
+
+    def frame(self, dt, events=0):
+        if events:
+            self.buffer += bytes((REC_FRAME | FRAME_EVENTS,)) + F64.pack(dt) + bytes((min(events, 255),))
+        else:
+            self.buffer += bytes((REC_FRAME,)) + F64.pack(dt)
+        return dt, events
+
+    def step(self, inputs=None, keys=0):
+        tag = REC_STEP
+        tail = b''
+        if inputs is not None:
+            touch = (inputs.touch_x, inputs.touch_y)
+            if touch != self.touch:
+                self.touch = touch
+                if touch[0] is None:
+                    tag |= STEP_TOUCH | STEP_NO_TOUCH
+                else:
+                    tag |= STEP_TOUCH
+                    tail = TOUCH.pack(*touch)
+            if inputs.shots:
+                tag |= STEP_SHOTS
+                tail += bytes((min(inputs.shots, 255),))
+        if keys != self.keys:
+            self.keys = keys
+            tag |= STEP_KEYS
+            tail += bytes((keys,))
+        buffer = self.buffer
+        buffer.append(tag)
+        if tail:
+            buffer += tail
+        if len(buffer) >= CHUNK:
+            self.drain()
+        return keys
+
+    def finish(self, ticks, score):
+        self.buffer.append(REC_CHECK)
+        self.buffer += CHECK.pack(ticks, score)
+        return True
+
+    def drain(self):
+        self.file.write(self.zip.compress(bytes(self.buffer)))
+        self.buffer.clear()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.drain()
+        self.file.write(self.zip.flush())
+        self.file.close()
+
+
+class Player:
+    """Повтор записи: frame() отдаёт записанный dt, step() — записанный ввод"""
+    enabled = True
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            raw = f.read()
+        magic, version, frontend, flags, seed, step_dt = HEADER.unpack_from(raw)
+        # Версия 1 — то же без FLAG_STRESS
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError(f"{path}: не запись Neon Space Defender (версии {VERSION})")
+        self.frontend = FRONTENDS[frontend]
+        self.arrays = bool(flags & FLAG_ARRAYS)
+        self.seed = seed
+        self.step_dt = step_dt
+        self.stress = None  # stress.StressConfig, с которым шла игра
+        start = HEADER.size
+        if flags & FLAG_STRESS:
+            from stress import parse
+            size, = STRESS_SPEC.unpack_from(raw, start)
+            start += STRESS_SPEC.size
+            self.stress = parse(raw[start:start + size].decode('utf-8'))
+            start += size
+        # Оборванная запись (игра закрыта аварийно) читается до места обрыва
+        self.data = zlib.decompressobj().decompress(raw[start:])
+        self.pos = 0
+        self.touch = (None, None)
+        self.keys = 0
+        self.expected = None  # (тики, счёт) из записи CHECK
+
+    def _next(self, kind):
+        """Следующая запись типа kind (записи другого типа пропускаются)"""
+        data = self.data
+        while self.pos < len(data):
+            tag = data[self.pos]
+            self.pos += 1
+            rec = tag & 0x0F
+            if rec == REC_FRAME:
+                dt = F64.unpack_from(data, self.pos)[0]
+                self.pos += 8
+                events = 0
+                if tag & FRAME_EVENTS:
+                    events = data[self.pos]
+                    self.pos += 1
+                if kind == REC_FRAME:
+                    return dt, events
+            elif rec == REC_STEP:
+                shots = 0
+                if tag & STEP_TOUCH:
+                    if tag & STEP_NO_TOUCH:
+                        self.touch = (None, None)
+                    else:
+                        self.touch = TOUCH.unpack_from(data, self.pos)
+                        self.pos += 16
+                if tag & STEP_SHOTS:
+                    shots = data[self.pos]
+                    self.pos += 1
+                if tag & STEP_KEYS:
+                    self.keys = data[self.pos]
+                    self.pos += 1
+                if kind == REC_STEP:
+                    return shots
+            elif rec == REC_CHECK:
+                self.expected = CHECK.unpack_from(data, self.pos)
+                self.pos += 16
+            else:
+                raise ValueError(f"{self.path}: неизвестная запись {tag:#x} на {self.pos - 1}")
+        return None
+
+    def frame(self, dt=0.0, events=0):
+        """(dt, события) из записи; None — запись кончилась"""
+        return self._next(REC_FRAME)
+
+    def step(self, inputs=None, keys=0):
+        """Подставляет записанный ввод; возвращает маску клавиш или None в конце"""
+        shots = self._next(REC_STEP)
+        if shots is None:
+            return None
+        if inputs is not None:
+            inputs.touch_x, inputs.touch_y = self.touch
+            inputs.shots = shots
+        return self.keys
+
+    def finish(self, ticks, score):
+        """Совпал ли итог повтора с записанным (нет записи — не с чем сравнить)"""
+        if self.expected is None:
+            self._next(None)  # дочитать до конца: CHECK может быть последней записью
+        return self.expected is None or self.expected == (ticks, score)
+
+    def close(self):
+        pass
+
+
+def record_name():
+    """Имя файла записи (рядом с highscore.json); не затирает существующие"""
+    base = time.strftime('record-%Y%m%d-%H%M%S')
+    path, n = base + '.nsdr', 1
+    while os.path.exists(path):
+        n += 1
+        path = f'{base}-{n}.nsdr'
+    return path
+
+
+def stress_spec(stress):
+    """Строка NEON_STRESS для StressConfig (None — обычная игра)"""
+    return '0' if stress is None else stress.spec()
+
+
+def open_tape(frontend, step_dt, arrays=False, stress=None):
+    """Player по NEON_REPLAY, Recorder по NEON_RECORD, иначе NULL_TAPE.
+
+    Параметры игры (фронтенд, шаг, NumPy-мир, стресс-режим) пишутся в
+    заголовок записи; повтор с другими не начинается (ValueError) —
+    иначе расхождение всплыло бы только в конце, на сверке итога.
+    """
+    replay = os.environ.get(ENV_REPLAY)
+    if replay:
+        player = Player(replay)
+        if player.frontend != frontend:
+            raise ValueError(f"{replay}: запись сделана в {player.frontend}, а не в {frontend} "
+                             f"(python replay.py --render запустит нужный фронтенд)")
+        if player.step_dt != step_dt:
+            raise ValueError(f"{replay}: шаг симуляции записи {player.step_dt}, а сейчас {step_dt}")
+        if player.arrays != arrays:
+            raise ValueError(f"{replay}: запись сделана с NEON_ARRAYS={int(player.arrays)}, "
+                             f"а сейчас {int(arrays)} (python replay.py --render подставит нужный "
+                             f"сам; для NEON_ARRAYS=1 нужен NumPy)")
+        if stress_spec(player.stress) != stress_spec(stress):
+            raise ValueError(f"{replay}: запись сделана с NEON_STRESS={stress_spec(player.stress)}, "
+                             f"а сейчас {stress_spec(stress)} (python replay.py --render "
+                             f"подставит нужный сам)")
+        return player
+    record = os.environ.get(ENV_RECORD)
+    if record and record != '0':
+        return Recorder(record_name() if record == '1' else record, frontend, step_dt, arrays,
+                        stress=stress)
+    return NULL_TAPE
+
+
+# --- Повтор без окна ---
+
+def replay_kivy(player):
+    """Правила из simulation.py — без Kivy и без отрисовки"""
+    from simulation import Simulation, Inputs
+    sim = Simulation(arrays=player.arrays, stress=player.stress)
+    sim.reset(seed=player.seed)
+    inputs = Inputs()
+    while not sim.game_over and player.step(inputs) is not None:
+        sim.step(player.step_dt, inputs)
+    return sim.ticks, sim.score, sim.wave
+
+
+def replay_pygame(player):
+    """survivor.py с SDL dummy: тот же игровой цикл, без отрисовки и ожидания"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import survivor
+    return survivor.play_game(tape=player, render=False, stress=player.stress)
+
+
+def main(argv=None):
+    import argparse  # только для командной строки
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('path', help='файл записи (.nsdr)')
+    parser.add_argument('--render', action='store_true', help='повтор в окне фронтенда')
+    args = parser.parse_args(argv)
+
+    player = Player(args.path)
+    if args.render:
+        script = 'main.py' if player.frontend == 'kivy' else 'survivor.py'
+        root = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ, **{ENV_REPLAY: os.path.abspath(args.path),
+                                  'NEON_ARRAYS': '1' if player.arrays else '0',
+                                  'NEON_STRESS': stress_spec(player.stress)})
+        env.pop(ENV_RECORD, None)
+        return subprocess.call([sys.executable, os.path.join(root, script)], env=env)
+
+    start = time.perf_counter()
+    ticks, score, wave = (replay_kivy if player.frontend == 'kivy' else replay_pygame)(player)
+    elapsed = time.perf_counter() - start
+    print(f"{player.frontend}: {ticks} тиков за {elapsed:.2f} с "
+          f"({ticks / elapsed if elapsed else 0:.0f} тиков/с), счёт {score}, волна {wave}")
+    if player.finish(ticks, score):
+        print("итог совпадает с записью" if player.expected else "в записи нет итога (игра не закончена)")
+        return 0
+    print(f"РАСХОЖДЕНИЕ: записано {player.expected}, повтор ({ticks}, {score})")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
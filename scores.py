@@ -0,0 +1,102 @@
+"""
+Neon Space Defender - рекорд (highscore.json)
+Одно хранилище рекорда для обеих версий игры. Файл читается один раз,
+дальше значение живёт в памяти. Запись уходит в фоновый поток: игровой
+цикл никогда не ждёт диска. Поток пишет во временный файл рядом, делает
+fsync и переименовывает его поверх highscore.json (os.replace атомарна),
+так что падение посреди записи оставляет прежний рекорд, а не обрезанный
+файл. Рекорды, поставленные, пока поток занят, сливаются: на диск уходит
+только последний.
+"""
+
+import json
+import os
+import threading
+
+SCORE_FILE = "highscore.json"
+
+
+class ScoreStore:
+    """Рекорд в памяти и фоновая атомарная запись на диск"""
+    def __init__(self, path=SCORE_FILE, on_error=None):
+        self.path = path
+        self.on_error = on_error  # вызывается из потока записи: (OSError)
+        self.value = None         # рекорд; None — рекорда ещё нет
+        self.loaded = False
+        self.pending = None       # значение, ждущее записи
+        self.writing = False
+        self.writes = 0           # записей на диск (слитые не считаются)
+        self.changed = threading.Condition()
+        self.writer = None
+
+    def load(self):
+        """Чтение файла (один раз); битый или отсутствующий файл — рекорда нет"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                score = json.load(f).get("score", 0)
+        except (OSError, ValueError, AttributeError):
+            score = None
+        with self.changed:
+            if not self.loaded:
+                self.loaded = True
+                if self.value is None and isinstance(score, int):
+                    self.value = score
+
+    def get(self, default=0):
+        """Рекорд из памяти (default — если рекорда нет)"""
+        if not self.loaded:
+            self.load()
+        return default if self.value is None else self.value
+
+    def submit(self, score):
+        """Новый результат; True, если это рекорд (запись — в фоне)"""
+        if score <= self.get():
+            return False
+        with self.changed:
+            self.value = self.pending = score
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_loop, name='score-writer',
+                                               daemon=True)
+                self.writer.start()
+            self.changed.notify_all()
+        return True
+
+    def flush(self, timeout=1.0):
+        """Дождаться записи рекорда (выход, уход Android в фон); False — не успела"""
+        with self.changed:
+            return self.changed.wait_for(lambda: self.pending is None and not self.writing,
+                                         timeout)
+
+    # --- Поток записи ---
+
+    def write_loop(self):
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: self.pending is not None)
+                score, self.pending = self.pending, None
+                self.writing = True
+            try:
+                self.write(score)
+            except OSError as e:
+                if self.on_error is not None:
+                    self.on_error(e)
+            with self.changed:
+                self.writing = False
+                self.changed.notify_all()
+
+    def write(self, score):
+        """Временный файл + fsync + rename: на диске всегда целый файл"""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"score": score}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        # Само переименование переживёт сбой питания только после fsync каталога
+        if os.name == 'posix':
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self.writes += 1
@@ -0,0 +1,53 @@
+"""
+Neon Space Defender - экраны приложения
+Меню, настройки, справка и игра строятся по одному разу и переключаются
+через Screens; экран узнаёт о показе и уходе через ScreenHooks.
+"""
+
+
+class ScreenHooks:
+    """Экран, который живёт всё время работы приложения (см. Screens).
+
+    on_enter / on_leave вызываются при показе и уходе с экрана: в них экран
+    планирует и отменяет свои вызовы Clock.
+    """
+    def on_enter(self):
+        pass
+
+    def on_leave(self):
+        pass
+
+
+class Screens:
+    """Экраны приложения: каждый строится один раз, при первом показе.
+
+    show() снимает текущий экран (on_leave) и ставит новый (on_enter), так
+    что после любого числа переходов работают только вызовы Clock
+    видимого экрана.
+    """
+    def __init__(self, root, factories):
+        self.root = root
+        self.factories = factories  # имя -> функция, строящая экран
+        self.screens = {}
+        self.current = None
+
+    def built(self, name):
+        return name in self.screens
+
+    def get(self, name):
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = self.screens[name] = self.factories[name]()
+        return screen
+
+    def show(self, name):
+        screen = self.get(name)
+        if screen is self.current:
+            return screen
+        if self.current is not None:
+            self.current.on_leave()
+            self.root.remove_widget(self.current)
+        self.current = screen
+        self.root.add_widget(screen)
+        screen.on_enter()
+        return screen
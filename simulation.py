@@ -0,0 +1,580 @@
+"""
+Neon Space Defender - симуляция игры без окна
+Спавн, движение, коллизии, счёт, комбо и волны — чистый Python без Kivy:
+состояние меняется только через step(dt, inputs), случайность — через
+собственный генератор (seed), поэтому игру можно гонять тысячами тиков
+в тестах и бенчмарках на машине без GL. GameWidget лишь рисует состояние.
+"""
+
+import random
+from enum import Enum
+
+from containers import EntityList
+from particles import ParticlePool
+from pools import KeyedPool
+from profiler import NULL_PROFILER
+from tracing import NULL_TRACER
+from soa import ArrayWorld
+from spatial import SpatialHash
+
+# Фиксированный шаг симуляции: скорость игры не зависит от FPS отрисовки
+SIM_RATE = 60
+SIM_DT = 1.0 / SIM_RATE
+
+# Скорости, которые раньше задавались «за кадр» при 60 FPS
+PLAYER_TOUCH_SPEED = 480  # было 8 px за кадр
+STAR_SPEED = 30  # было 0.5 px за кадр
+
+
+class FireMode(Enum):
+    NORMAL = 1
+    SPREAD = 2
+    LASER = 3
+    DOUBLE = 4
+
+class EnemyType(Enum):
+    NORMAL = 1
+    FAST = 2
+    TANK = 3
+    MINI = 4
+    BOSS = 5
+
+class Laser:
+    """Лазер игрока (компактная запись вместо dict)"""
+    __slots__ = ('x', 'y', 'px', 'py', 'vx', 'vy', 'width', 'gfx')
+
+    def __init__(self, x, y, vx=0, vy=-600, width=4):
+        self.gfx = None
+        self.reset(x, y, vx, vy, width)
+
+    def reset(self, x, y, vx=0, vy=-600, width=4):
+        self.x = self.px = x
+        self.y = self.py = y
+        self.vx = vx
+        self.vy = vy
+        self.width = width
+
+class Player:
+    def __init__(self, x=300, y=700):
+        self.x = self.px = x
+        self.y = self.py = y
+        self.width = 40
+        self.height = 40
+        self.speed = 400
+        self.lasers = []
+        self.health = 3
+        self.max_health = 5
+        self.invincible_time = 0
+        self.fire_rate = 0.15
+        self.last_shot = 0
+        self.fire_mode = FireMode.NORMAL
+        self.has_shield = False
+        self.shield_time = 0
+        self.angle = 0
+        self.laser_pool = None  # KeyedPool по ширине лазера (если задан)
+
+    def move(self, touch_x, touch_y, dt):
+        """Плавное движение к точке касания"""
+        self.px, self.py = self.x, self.y
+        if touch_x is not None:
+            step = PLAYER_TOUCH_SPEED * dt
+            if touch_x < self.x - 5:
+                self.x = max(0, self.x - step)
+            elif touch_x > self.x + 5:
+                self.x = min(600 - self.width, self.x + step)
+
+            if touch_y < self.y - 5:
+                self.y = max(700 - 150, self.y - step)
+            elif touch_y > self.y + 5:
+                self.y = min(800 - self.height, self.y + step)
+
+    def shoot(self):
+        """Стрельба в зависимости от режима, возвращает новые лазеры"""
+        start = len(self.lasers)
+        if self.fire_mode == FireMode.NORMAL:
+            self.fire(self.x + 18, self.y, 0, -600)
+        elif self.fire_mode == FireMode.SPREAD:
+            for vx in [-100, -50, 0, 50, 100]:
+                self.fire(self.x + 18, self.y, vx, -600)
+        elif self.fire_mode == FireMode.LASER:
+            self.fire(self.x + 15, self.y, 0, -800, 12)
+        elif self.fire_mode == FireMode.DOUBLE:
+            self.fire(self.x + 8, self.y, 0, -600)
+            self.fire(self.x + 28, self.y, 0, -600)
+        return self.lasers[start:]
+
+    def fire(self, x, y, vx, vy, width=4):
+        if self.laser_pool is not None:
+            laser = self.laser_pool.acquire(width, x, y, vx, vy, width)
+        else:
+            laser = Laser(x, y, vx, vy, width)
+        self.lasers.append(laser)
+
+    def take_damage(self):
+        if self.has_shield:
+            self.has_shield = False
+            return
+        self.health -= 1
+
+    def update(self, dt):
+        self.invincible_time = max(0, self.invincible_time - dt)
+        self.shield_time = max(0, self.shield_time - dt)
+        if self.shield_time <= 0:
+            self.has_shield = False
+
+class Enemy:
+    __slots__ = ('type', 'wave', 'x', 'y', 'px', 'py', 'angle', 'gfx', 'width', 'height',
+                 'speed', 'health', 'max_health', 'score_value')
+
+    def __init__(self, enemy_type=EnemyType.NORMAL, wave=1, rng=random):
+        self.gfx = None
+        self.reset(enemy_type, wave, rng)
+
+    def reset(self, enemy_type=EnemyType.NORMAL, wave=1, rng=random):
+        """(Пере)инициализация — в том числе при выдаче из пула"""
+        self.type = enemy_type
+        self.wave = wave
+        self.x = rng.randint(0, 570)
+        self.y = -50
+        self.angle = 0
+
+        if enemy_type == EnemyType.NORMAL:
+            self.width, self.height = 35, 30
+            self.speed = 100 + wave * 30
+            self.health = 1
+            self.max_health = 1
+            self.score_value = 10 + wave * 3
+        elif enemy_type == EnemyType.FAST:
+            self.width, self.height = 28, 25
+            self.speed = 200 + wave * 50
+            self.health = 1
+            self.max_health = 1
+            self.score_value = 15 + wave * 5
+        elif enemy_type == EnemyType.TANK:
+            self.width, self.height = 55, 45
+            self.speed = 50 + wave * 10
+            self.health = 3 + wave // 2
+            self.max_health = self.health
+            self.score_value = 30 + wave * 10
+        elif enemy_type == EnemyType.MINI:
+            self.width, self.height = 18, 18
+            self.speed = 150 + wave * 40
+            self.health = 1
+            self.max_health = 1
+            self.score_value = 5 + wave * 2
+        elif enemy_type == EnemyType.BOSS:
+            self.x = 260
+            self.y = 100
+            self.width, self.height = 90, 70
+            self.speed = 30
+            self.health = 10 + wave * 5
+            self.max_health = self.health
+            self.score_value = 500 + wave * 100
+        self.px, self.py = self.x, self.y
+
+    def update(self, dt):
+        self.py = self.y
+        self.y += self.speed * dt
+        self.angle = (self.angle + 30 * dt) % 360
+
+    def take_damage(self):
+        self.health -= 1
+        return self.health <= 0
+
+class Bonus:
+    __slots__ = ('x', 'y', 'py', 'width', 'height', 'bonus_type', 'speed', 'rotation', 'gfx')
+
+    def __init__(self, x, y, bonus_type):
+        self.gfx = None
+        self.reset(x, y, bonus_type)
+
+    def reset(self, x, y, bonus_type):
+        self.x = x
+        self.y = self.py = y
+        self.width = 20
+        self.height = 20
+        self.bonus_type = bonus_type
+        self.speed = 150
+        self.rotation = 0
+
+    def update(self, dt):
+        self.py = self.y
+        self.y += self.speed * dt
+        self.rotation = (self.rotation + 180 * dt) % 360
+
+
+class Inputs:
+    """Ввод за шаг: точка касания (или None) и число выстрелов"""
+    __slots__ = ('touch_x', 'touch_y', 'shots')
+
+    def __init__(self, touch_x=None, touch_y=None, shots=0):
+        self.touch_x = touch_x
+        self.touch_y = touch_y
+        self.shots = shots
+
+
+class Simulation:
+    """Всё состояние и все правила игры; шаг — step(dt, inputs).
+
+    on_spawn / on_despawn (если заданы) вызываются при появлении и удалении
+    врага, бонуса или лазера — через них отрисовка ведёт свою графику.
+    stress — stress.StressConfig (None — обычные правила).
+    """
+    def __init__(self, seed=None, arrays=False, stress=None):
+        self.use_arrays = arrays
+        self.stress = stress
+        self.fire_lock = FireMode[stress.fire_mode] if stress is not None and stress.fire_mode else None
+        self.rng = random.Random(seed)
+        self.on_spawn = None
+        self.on_despawn = None
+        self.on_wave = None  # вызывается с номером новой волны
+        self.profiler = NULL_PROFILER  # тайминги фаз (FrameProfiler во фронтенде)
+        self.tracer = NULL_TRACER  # события спавна, волн и босса (tracing.Tracer)
+
+        if stress is not None and stress.max_particles is not None:
+            self.particles = ParticlePool(capacity=stress.max_particles, rng=self.rng)
+        else:
+            self.particles = ParticlePool(rng=self.rng)
+
+        # Пулы: объекты (вместе с их графикой) переживают деспавн и рестарт
+        self.enemy_pool = KeyedPool(Enemy)
+        self.bonus_pool = KeyedPool(Bonus)
+        self.laser_pool = KeyedPool(Laser)
+        self.lasers = EntityList(on_remove=self.release_laser)
+        self.enemies = EntityList(on_remove=self.release_enemy)
+        self.bonuses = EntityList(on_remove=self.release_bonus)
+
+        self.laser_grid = SpatialHash()
+        self.enemy_grid = SpatialHash()
+        self.bonus_grid = SpatialHash()
+        self.reset()
+
+    def reset(self, seed=None):
+        """Новая игра; seed задаёт генератор заново (иначе он продолжается)"""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.release_entities()
+
+        self.player = Player()
+        self.player.lasers = self.lasers
+        self.player.laser_pool = self.laser_pool
+        self.particles.clear()
+        rng = self.rng
+        self.stars = [[rng.randint(0, 600), rng.randint(0, 800)] for _ in range(100)]
+
+        self.ticks = 0
+        self.score = 0
+        self.wave = 1
+        self.level = 1
+        self.enemies_killed = 0
+        self.spawn_timer = 0
+        self.spawn_delay = 0.8
+        self.game_over = False
+        self.combo = 0
+        self.combo_timer = 0
+        self.arrays = ArrayWorld() if self.use_arrays else None
+
+    def step(self, dt, inputs):
+        """Один шаг симуляции (dt — обычно SIM_DT)"""
+        self.ticks += 1
+        mark = self.profiler.mark
+
+        # Движущиеся звёзды (параллакс)
+        for star in self.stars:
+            star[1] += STAR_SPEED * dt
+            if star[1] > 800:
+                star[1] = -10
+
+        # Выстрелы, накопленные с прошлого шага
+        if self.fire_lock is not None:
+            self.player.fire_mode = self.fire_lock
+        for _ in range(inputs.shots):
+            self.shoot()
+
+        # Движение игрока
+        self.player.move(inputs.touch_x, inputs.touch_y, dt)
+        self.player.update(dt)
+        mark('input')
+
+        # Спавн врагов
+        self.spawn_timer += dt
+        spawn_delay = self.spawn_delay
+        if self.stress is not None:
+            spawn_delay /= self.stress.spawn
+        if self.spawn_timer > spawn_delay:
+            if self.stress is None:
+                count = 1
+                self.spawn_timer = 0
+            else:
+                # Задержка может быть короче шага — несколько врагов за тик
+                count = int(self.spawn_timer / spawn_delay)
+                self.spawn_timer -= count * spawn_delay
+            weights = [50, 20, 15, 12] if self.wave < 5 else [30, 30, 20, 20]
+            for _ in range(count):
+                enemy_type = self.rng.choices(
+                    [EnemyType.NORMAL, EnemyType.FAST, EnemyType.TANK, EnemyType.MINI],
+                    weights=weights
+                )[0]
+                self.spawn_enemy(enemy_type)
+
+            if self.wave % 10 == 0:
+                if self.arrays is not None:
+                    boss_count = self.arrays.count_kind(EnemyType.BOSS.value)
+                else:
+                    boss_count = len([e for e in self.enemies if e.type == EnemyType.BOSS])
+                if boss_count == 0:
+                    self.spawn_enemy(EnemyType.BOSS)
+                    self.tracer.instant('boss', wave=self.wave)
+        mark('spawn')
+
+        # Лазеры и враги: объектный вариант или массивы NumPy (стресс-режим)
+        if self.arrays is not None:
+            self.arrays.step(self, dt)
+            mark('enemies')
+        else:
+            self.update_combat(dt)
+        self.update_bonuses(dt)
+        mark('bonuses')
+
+        # Обновление частиц (одним пакетом)
+        self.particles.update(dt)
+        mark('particles')
+
+        # Отложенное удаление: каждый список сжимается один раз за тик
+        self.lasers.compact()
+        self.enemies.compact()
+        self.bonuses.compact()
+
+        # Обновление комбо
+        if self.combo_timer > 0:
+            self.combo_timer -= dt
+        else:
+            self.combo = 0
+
+        # Волны
+        if self.enemies_killed >= 5 + self.wave * 2:
+            self.wave += 1
+            self.enemies_killed = 0
+            self.spawn_delay = max(0.2, self.spawn_delay - 0.05)
+            self.tracer.instant('wave', wave=self.wave)
+            if self.on_wave is not None:
+                self.on_wave(self.wave)
+
+        if self.wave >= 10:
+            self.level = 3
+        elif self.wave >= 5:
+            self.level = 2
+        # Сжатие списков и деспавн — в фазу врагов и коллизий
+        mark('enemies')
+
+    def shoot(self):
+        if self.stress is not None and not self.stress.laser_room(self.laser_count()):
+            return
+        new_lasers = self.player.shoot()
+        if self.arrays is not None:
+            for laser in new_lasers:
+                self.arrays.add_laser(laser)
+                self.laser_pool.release(laser.width, laser)
+            self.lasers.clear()
+        elif self.on_spawn is not None:
+            for laser in new_lasers:
+                self.on_spawn(laser)
+
+    def end_game(self):
+        if self.stress is not None and self.stress.immortal:
+            self.player.health = self.player.max_health
+            return
+        self.game_over = True
+
+    def laser_count(self):
+        if self.arrays is not None:
+            return len(self.arrays.lasers)
+        return len(self.lasers)
+
+    def update_combat(self, dt):
+        """Лазеры, враги и их коллизии (объектный вариант)"""
+        player = self.player
+
+        # Обновление лазеров
+        lasers = self.lasers
+        for laser in lasers:
+            laser.py = laser.y
+            laser.y += laser.vy * dt
+            if laser.y < 0:
+                lasers.kill(laser)
+
+        # Broadphase: сетка лазеров, проверяются только соседние ячейки
+        laser_grid = self.laser_grid
+        laser_grid.clear()
+        for laser in lasers.alive():
+            laser_grid.insert(laser, laser.x, laser.y, 4, 15)
+        self.profiler.mark('lasers')
+
+        # Движение врагов (не зависит от коллизий, поэтому отдельным проходом)
+        enemy_grid = self.enemy_grid
+        enemy_grid.clear()
+        for enemy in self.enemies:
+            enemy.update(dt)
+            enemy_grid.insert(enemy, enemy.x, enemy.y, enemy.width, enemy.height)
+
+        near_player = {id(e) for e in enemy_grid.query(player.x, player.y, player.width, player.height)}
+
+        # Обновление врагов (удаление отложено до конца тика)
+        for enemy in self.enemies:
+            if enemy.y > 800:
+                self.remove_enemy(enemy)
+                self.score = max(0, self.score - 5)
+                self.combo = 0
+                continue
+
+            # Столкновение с игроком
+            if id(enemy) in near_player and self.check_collision(
+                player.x, player.y, player.width, player.height,
+                enemy.x, enemy.y, enemy.width, enemy.height
+            ):
+                self.create_explosion(enemy.x + enemy.width/2, enemy.y + enemy.height/2)
+                player.take_damage()
+                if player.health <= 0:
+                    self.end_game()
+                self.remove_enemy(enemy)
+                continue
+
+            # Проверка попаданий
+            for laser in laser_grid.query(enemy.x, enemy.y, enemy.width, enemy.height):
+                if self.check_collision(
+                    laser.x, laser.y, 4, 15,
+                    enemy.x, enemy.y, enemy.width, enemy.height
+                ):
+                    hit_score = enemy.score_value + (self.combo * 2)
+                    if enemy.take_damage():
+                        self.remove_enemy(enemy)
+                        self.score += hit_score
+                        self.enemies_killed += 1
+                        self.combo += 1
+                        self.combo_timer = 2
+
+                        self.create_explosion(enemy.x + enemy.width/2, enemy.y + enemy.height/2)
+
+                        self.drop_bonus(enemy.x, enemy.y)
+
+                    laser_grid.remove(laser)
+                    lasers.kill(laser)
+                    break
+        self.profiler.mark('enemies')
+
+    def update_bonuses(self, dt):
+        """Обновление бонусов и их подбор игроком"""
+        player = self.player
+        bonus_grid = self.bonus_grid
+        bonus_grid.clear()
+        for bonus in self.bonuses:
+            bonus.update(dt)
+            bonus_grid.insert(bonus, bonus.x, bonus.y, bonus.width, bonus.height)
+        near_player = {id(b) for b in bonus_grid.query(player.x, player.y, player.width, player.height)}
+
+        for bonus in self.bonuses:
+            if bonus.y > 800:
+                self.remove_bonus(bonus)
+                continue
+
+            if id(bonus) in near_player and self.check_collision(
+                player.x, player.y, player.width, player.height,
+                bonus.x, bonus.y, bonus.width, bonus.height
+            ):
+                if bonus.bonus_type == 'health':
+                    player.health = min(player.health + 1, player.max_health)
+                elif bonus.bonus_type == 'shield':
+                    player.has_shield = True
+                    player.shield_time = 5
+                elif bonus.bonus_type == 'fire_mode':
+                    modes = [FireMode.NORMAL, FireMode.SPREAD, FireMode.LASER, FireMode.DOUBLE]
+                    player.fire_mode = self.rng.choice(modes)
+
+                self.remove_bonus(bonus)
+
+    # --- Спавн / деспавн ---
+
+    def spawn_enemy(self, enemy_type):
+        enemy = self.enemy_pool.acquire(enemy_type, enemy_type, self.wave, self.rng)
+        self.tracer.instant('spawn', type=enemy_type.name)
+        if self.arrays is not None:
+            # Статы скопированы в массивы — сам объект сразу возвращается в пул
+            self.arrays.add_enemy(enemy)
+            self.enemy_pool.release(enemy_type, enemy)
+            return enemy
+        self.enemies.append(enemy)
+        if self.on_spawn is not None:
+            self.on_spawn(enemy)
+        return enemy
+
+    def drop_bonus(self, x, y):
+        """Шанс выпадения бонуса из уничтоженного врага"""
+        if self.rng.random() < 0.2:
+            bonus_type = self.rng.choice(['health', 'shield', 'fire_mode'])
+            self.spawn_bonus(x, y, bonus_type)
+
+    def remove_enemy(self, enemy):
+        self.enemies.kill(enemy)
+
+    def release_enemy(self, enemy):
+        if self.on_despawn is not None:
+            self.on_despawn(enemy)
+        self.enemy_pool.release(enemy.type, enemy)
+
+    def spawn_bonus(self, x, y, bonus_type):
+        bonus = self.bonus_pool.acquire(bonus_type, x, y, bonus_type)
+        self.bonuses.append(bonus)
+        if self.on_spawn is not None:
+            self.on_spawn(bonus)
+        return bonus
+
+    def remove_bonus(self, bonus):
+        self.bonuses.kill(bonus)
+
+    def release_bonus(self, bonus):
+        if self.on_despawn is not None:
+            self.on_despawn(bonus)
+        self.bonus_pool.release(bonus.bonus_type, bonus)
+
+    def remove_laser(self, laser):
+        self.lasers.kill(laser)
+
+    def release_laser(self, laser):
+        if self.on_despawn is not None:
+            self.on_despawn(laser)
+        self.laser_pool.release(laser.width, laser)
+
+    def release_entities(self):
+        """Все враги, бонусы и лазеры — обратно в пулы (при перезапуске)"""
+        for entities in (self.enemies, self.bonuses, self.lasers):
+            entities.compact()
+            for entity in entities:
+                entities.on_remove(entity)
+            entities.clear()
+
+    def stats(self):
+        """Живые сущности: враги по типам, лазеры, бонусы, частицы"""
+        if self.arrays is not None:
+            enemies = {t.name: self.arrays.count_kind(t.value) for t in EnemyType}
+            lasers = len(self.arrays.lasers)
+        else:
+            enemies = dict.fromkeys((t.name for t in EnemyType), 0)
+            for enemy in self.enemies.alive():
+                enemies[enemy.type.name] += 1
+            lasers = sum(1 for _ in self.lasers.alive())
+        return {'enemies': enemies, 'lasers': lasers, 'bonuses': len(self.bonuses),
+                'particles': len(self.particles)}
+
+    def pool_stats(self):
+        """Счётчики попаданий/промахов пулов объектов"""
+        return {'enemies': self.enemy_pool.stats(),
+                'bonuses': self.bonus_pool.stats(),
+                'lasers': self.laser_pool.stats()}
+
+    def create_explosion(self, x, y):
+        """Создание взрыва (частицы из пула)"""
+        self.particles.burst(x, y, 8)
+
+    def check_collision(self, x1, y1, w1, h1, x2, y2, w2, h2):
+        return (x1 < x2 + w2 and x1 + w1 > x2 and
+                y1 < y2 + h2 and y1 + h1 > y2)
@@ -0,0 +1,211 @@
+"""
+Neon Space Defender - хранилище сущностей struct-of-arrays (NumPy)
+Позиции, скорости, размеры, здоровье и типы лежат в непрерывных массивах:
+движение всех объектов — одна векторная операция, отсечение за экраном —
+булева маска, пересечения лазеров с врагами — одна матрица (broadcast).
+
+Режим опциональный (для стресс-сценариев с тысячами объектов): NumPy
+нет в сборке для Android, без него AVAILABLE = False. Сам NumPy
+импортируется при первом использовании (load_numpy): импорт стоит сотни
+миллисекунд, и холодному старту до меню он не нужен.
+"""
+
+from importlib.util import find_spec
+
+AVAILABLE = find_spec('numpy') is not None
+np = None
+
+
+def load_numpy():
+    """Модуль numpy (импортируется при первом вызове) или None, если его нет"""
+    global np
+    if np is None and AVAILABLE:
+        import numpy
+        np = numpy
+    return np
+
+
+class EntityStore:
+    """Набор сущностей одного вида в виде массивов одинаковой длины"""
+    FIELDS = {
+        'x': 'f8', 'y': 'f8', 'vx': 'f8', 'vy': 'f8', 'w': 'f8', 'h': 'f8',
+        'health': 'i4', 'max_health': 'i4', 'score_value': 'i4', 'kind': 'i4',
+    }
+
+    def __init__(self, capacity=256):
+        load_numpy()
+        self.count = 0
+        self.capacity = capacity
+        self.arrays = {name: np.zeros(capacity, dtype=dtype)
+                       for name, dtype in self.FIELDS.items()}
+
+    def __len__(self):
+        return self.count
+
+    def __getattr__(self, name):
+        # store.x -> живая часть массива x (view, без копирования)
+        arrays = self.__dict__.get('arrays')
+        if arrays is not None and name in arrays:
+            return arrays[name][:self.count]
+        raise AttributeError(name)
+
+    def add(self, **values):
+        if self.count == self.capacity:
+            self.capacity *= 2
+            for name, arr in self.arrays.items():
+                grown = np.zeros(self.capacity, dtype=arr.dtype)
+                grown[:self.count] = arr[:self.count]
+                self.arrays[name] = grown
+        i = self.count
+        for name, value in values.items():
+            self.arrays[name][i] = value
+        self.count += 1
+        return i
+
+    def clear(self):
+        self.count = 0
+
+    def integrate(self, dt):
+        """Движение всех объектов одной векторной операцией"""
+        n = self.count
+        arrays = self.arrays
+        arrays['x'][:n] += arrays['vx'][:n] * dt
+        arrays['y'][:n] += arrays['vy'][:n] * dt
+
+    def keep(self, mask):
+        """Компактизация: остаются только объекты с mask=True (порядок сохраняется)"""
+        n = self.count
+        kept = int(mask.sum())
+        if kept == n:
+            return
+        for arr in self.arrays.values():
+            arr[:kept] = arr[:n][mask]
+        self.count = kept
+
+
+def overlap_matrix(a, b, a_w=None, a_h=None):
+    """Матрица пересечений AABB: [i, j] — объект a[i] пересекает b[j]"""
+    ax = a.x[:, None]
+    ay = a.y[:, None]
+    aw = a.w[:, None] if a_w is None else a_w
+    ah = a.h[:, None] if a_h is None else a_h
+    return ((ax < b.x + b.w) & (ax + aw > b.x) &
+            (ay < b.y + b.h) & (ay + ah > b.y))
+
+
+class ArrayWorld:
+    """Лазеры и враги в массивах с теми же правилами, что Simulation.step.
+
+    Враги создаются из обычного Enemy (его статы копируются в массивы),
+    события обрабатываются в порядке списка врагов, поэтому счёт, комбо
+    и вызовы random совпадают с объектным вариантом.
+    """
+    def __init__(self, capacity=256):
+        self.lasers = EntityStore(capacity)
+        self.enemies = EntityStore(capacity)
+
+    def clear(self):
+        self.lasers.clear()
+        self.enemies.clear()
+
+    def add_laser(self, laser):
+        self.lasers.add(x=laser.x, y=laser.y, vx=0, vy=laser.vy, w=laser.width, h=15)
+
+    def add_enemy(self, enemy):
+        self.enemies.add(x=enemy.x, y=enemy.y, vx=0, vy=enemy.speed,
+                         w=enemy.width, h=enemy.height, health=enemy.health,
+                         max_health=enemy.max_health, score_value=enemy.score_value,
+                         kind=enemy.type.value)
+
+    def count_kind(self, kind):
+        return int((self.enemies.kind == kind).sum())
+
+    def step(self, game, dt):
+        """Один тик: движение, отсечение, коллизии; правила игры — через game (Simulation)"""
+        lasers = self.lasers
+        enemies = self.enemies
+        player = game.player
+
+        # Лазеры: движение только по y (как в объектном варианте) и отсечение
+        lasers.y[:] += lasers.vy * dt
+        lasers.keep(lasers.y >= 0)
+        enemies.integrate(dt)
+
+        n = enemies.count
+        if n == 0:
+            return
+
+        escaped = enemies.y > 800
+        px, py, pw, ph = player.x, player.y, player.width, player.height
+        touches_player = ((px < enemies.x + enemies.w) & (px + pw > enemies.x) &
+                          (py < enemies.y + enemies.h) & (py + ph > enemies.y))
+        # Хитбокс лазера 4x15 независимо от ширины луча
+        hits = overlap_matrix(lasers, enemies, a_w=4, a_h=15)
+        hit_any = hits.any(axis=0) if lasers.count else np.zeros(n, dtype=bool)
+
+        alive = np.ones(n, dtype=bool)
+        used = np.zeros(lasers.count, dtype=bool)
+        x, y, w, h = enemies.x, enemies.y, enemies.w, enemies.h
+        health, score_value = enemies.health, enemies.score_value
+
+        # Событий мало — их разбираем по порядку, как в списке врагов
+        for i in np.flatnonzero(escaped | touches_player | hit_any):
+            if escaped[i]:
+                alive[i] = False
+                game.score = max(0, game.score - 5)
+                game.combo = 0
+                continue
+
+            cx, cy = x[i] + w[i] / 2, y[i] + h[i] / 2
+            if touches_player[i]:
+                game.create_explosion(cx, cy)
+                player.take_damage()
+                if player.health <= 0:
+                    game.end_game()
+                alive[i] = False
+                continue
+
+            candidates = np.flatnonzero(hits[:, i] & ~used)
+            if not len(candidates):
+                continue
+            hit_score = int(score_value[i]) + game.combo * 2
+            health[i] -= 1
+            if health[i] <= 0:
+                alive[i] = False
+                game.score += hit_score
+                game.enemies_killed += 1
+                game.combo += 1
+                game.combo_timer = 2
+                game.create_explosion(cx, cy)
+                game.drop_bonus(float(x[i]), float(y[i]))
+            used[candidates[0]] = True
+
+        enemies.keep(alive)
+        if used.any():
+            lasers.keep(~used)
+
+    def rect_vertices(self, palette, laser_color=(0, 1, 1, 1), lag=0.0):
+        """Вершины (x, y, r, g, b, a) квадратов врагов и лазеров для QuadBatch.
+
+        lag — сдвиг по времени для интерполяции (движение только по y).
+        """
+        enemies, lasers = self.enemies, self.lasers
+        rgba = np.asarray(palette, dtype='f8')[enemies.kind]
+        parts = [_rects(enemies.x, enemies.y + enemies.vy * lag, enemies.w, enemies.h, rgba),
+                 _rects(lasers.x - lasers.w / 2, lasers.y + lasers.vy * lag, lasers.w, lasers.h,
+                        np.tile(np.array(laser_color, dtype='f8'), (lasers.count, 1)))]
+        return np.concatenate(parts).ravel().tolist()
+
+
+def _rects(x, y, w, h, rgba):
+    v = np.empty((len(x), 4, 6))
+    v[:, 0, 0] = x
+    v[:, 0, 1] = y
+    v[:, 1, 0] = x + w
+    v[:, 1, 1] = y
+    v[:, 2, 0] = x + w
+    v[:, 2, 1] = y + h
+    v[:, 3, 0] = x
+    v[:, 3, 1] = y + h
+    v[:, :, 2:] = rgba[:, None, :]
+    return v
@@ -0,0 +1,76 @@
+"""
+Neon Space Defender - пространственный хэш (broadphase коллизий)
+Равномерная сетка над полем 600x800: объект попадает во все ячейки,
+которые перекрывает его AABB, а запрос возвращает кандидатов только
+из ячеек, перекрытых областью запроса. Точная проверка — check_collision.
+"""
+
+# Размер ячейки: больше самого частого объекта (враг ~35x30), меньше поля
+CELL_SIZE = 64
+
+# Ключ ячейки — одно целое число вместо кортежа (cx, cy)
+_ROW = 1 << 16
+
+
+class SpatialHash:
+    """Сетка для проверки только соседних объектов вместо всех пар"""
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entries = {}
+        self.order = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.order = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _keys(self, x, y, w, h):
+        cs = self.cell_size
+        cx0, cx1 = int(x // cs), int((x + w) // cs)
+        cy0, cy1 = int(y // cs), int((y + h) // cs)
+        return [cy * _ROW + cx for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]
+
+    def insert(self, item, x, y, w, h):
+        """Добавление объекта; порядок вставки сохраняется в запросах"""
+        keys = self._keys(x, y, w, h)
+        entry = (self.order, item)
+        self.order += 1
+        cells = self.cells
+        for key in keys:
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [entry]
+            else:
+                bucket.append(entry)
+        self.entries[id(item)] = (entry, keys)
+
+    def remove(self, item):
+        """Убирает объект (например, лазер, уже попавший во врага)"""
+        found = self.entries.pop(id(item), None)
+        if found is None:
+            return
+        entry, keys = found
+        for key in keys:
+            self.cells[key].remove(entry)
+
+    def query(self, x, y, w, h):
+        """Кандидаты на пересечение с областью, в порядке вставки"""
+        cells = self.cells
+        found = None
+        for key in self._keys(x, y, w, h):
+            bucket = cells.get(key)
+            if not bucket:
+                continue
+            if found is None:
+                found = dict(bucket)
+            else:
+                found.update(bucket)
+        if not found:
+            return []
+        if len(found) == 1:
+            return list(found.values())
+        return [found[order] for order in sorted(found)]
@@ -0,0 +1,78 @@
+"""
+Neon Space Defender - статистика памяти во время игры
+Прирост выделенных блоков за кадр (sys.getallocatedblocks до и после
+кадра) пишется в кольцевой буфер, а на границе волн снимается отчёт:
+всего блоков и — если включён tracemalloc (NEON_TRACEMALLOC=1) — прирост
+памяти по файлам с прошлой волны. Так на слабом Android-устройстве видно,
+какая подсистема растёт, до того как ОС убьёт процесс.
+"""
+
+import os
+import sys
+import tracemalloc
+from array import array
+
+from profiler import HISTORY
+
+ENV_TRACEMALLOC = 'NEON_TRACEMALLOC'
+
+# Файлов в отчёте tracemalloc на волну
+TOP_FILES = 5
+
+
+class RuntimeStats:
+    """Прирост блоков за кадр и отчёты по волнам"""
+    def __init__(self, capacity=HISTORY, trace=None):
+        self.capacity = capacity
+        self.deltas = array('q', bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+        self.frame_blocks = 0
+        if trace is None:
+            trace = os.environ.get(ENV_TRACEMALLOC) == '1'
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.trace = trace
+        self.last_snapshot = None
+        self.last_blocks = sys.getallocatedblocks()
+
+    def begin_frame(self):
+        self.frame_blocks = sys.getallocatedblocks()
+
+    def end_frame(self):
+        self.deltas[self.head] = sys.getallocatedblocks() - self.frame_blocks
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def alloc_average(self, last=60):
+        """Средний прирост блоков за кадр по последним кадрам"""
+        n = min(last, self.count)
+        if not n:
+            return 0.0
+        total = 0
+        for i in range(1, n + 1):
+            total += self.deltas[(self.head - i) % self.capacity]
+        return total / n
+
+    def traced_kb(self):
+        """Память под объектами Python по tracemalloc (None — выключен)"""
+        if not self.trace:
+            return None
+        return tracemalloc.get_traced_memory()[0] // 1024
+
+    def wave_report(self):
+        """Отчёт на границе волн: блоки (и прирост), tracemalloc по файлам"""
+        blocks = sys.getallocatedblocks()
+        report = {'alloc_blocks': blocks, 'alloc_blocks_delta': blocks - self.last_blocks}
+        self.last_blocks = blocks
+        if self.trace:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),))
+            report['traced_kb'] = self.traced_kb()
+            if self.last_snapshot is not None:
+                report['growth_kb'] = {
+                    os.path.basename(stat.traceback[0].filename): round(stat.size_diff / 1024, 1)
+                    for stat in snapshot.compare_to(self.last_snapshot, 'filename')[:TOP_FILES]}
+            self.last_snapshot = snapshot
+        return report
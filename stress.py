@@ -0,0 +1,97 @@
+"""
+Neon Space Defender - стресс-режим
+Обычная игра с другими ручками нагрузки: спавн врагов чаще в N раз,
+потолки на число лазеров и частиц, закреплённый режим стрельбы (бонусы
+его не меняют) и, для бенчмарков, бессмертный корабль. Используют его
+Simulation (simulation.py) и survivor.py; кривую «число сущностей — время кадра»
+снимает benchmarks/bench_stress.py.
+
+Включение:
+    NEON_STRESS="spawn=8,lasers=300,particles=1000,fire=SPREAD" python main.py
+    NEON_STRESS="spawn=4,immortal=1" python survivor.py
+
+Режим меняет правила игры, поэтому запись ввода (NEON_RECORD) хранит его
+параметры (StressConfig.spec()) и повторяется с ними же.
+"""
+
+import os
+
+ENV_STRESS = 'NEON_STRESS'
+
+FIRE_MODES = ('NORMAL', 'SPREAD', 'LASER', 'DOUBLE')
+
+
+class StressConfig:
+    """Параметры стресс-режима; None — ограничения нет"""
+    __slots__ = ('spawn', 'max_lasers', 'max_particles', 'fire_mode', 'immortal', 'entities')
+
+    def __init__(self, spawn=1.0, max_lasers=None, max_particles=None, fire_mode=None,
+                 immortal=False):
+        if spawn <= 0:
+            raise ValueError(f"множитель спавна должен быть больше нуля: {spawn}")
+        if fire_mode is not None and fire_mode not in FIRE_MODES:
+            raise ValueError(f"неизвестный режим стрельбы {fire_mode!r} (есть {', '.join(FIRE_MODES)})")
+        self.spawn = spawn                  # множитель частоты спавна
+        self.max_lasers = max_lasers        # лазеров на экране
+        self.max_particles = max_particles  # ёмкость пула частиц
+        self.fire_mode = fire_mode          # имя FireMode
+        self.immortal = immortal            # проигрыш не наступает
+        self.entities = 0                   # живых сущностей на последнем кадре (пишет фронтенд)
+
+    def __repr__(self):
+        return (f"StressConfig(spawn={self.spawn}, max_lasers={self.max_lasers}, "
+                f"max_particles={self.max_particles}, fire_mode={self.fire_mode}, "
+                f"immortal={self.immortal})")
+
+    def spec(self):
+        """Строка в формате NEON_STRESS: parse(config.spec()) даёт те же параметры"""
+        items = [f"spawn={self.spawn!r}"]
+        if self.max_lasers is not None:
+            items.append(f"lasers={self.max_lasers}")
+        if self.max_particles is not None:
+            items.append(f"particles={self.max_particles}")
+        if self.fire_mode is not None:
+            items.append(f"fire={self.fire_mode}")
+        if self.immortal:
+            items.append("immortal=1")
+        return ','.join(items)
+
+    def laser_room(self, count):
+        """Можно ли выпустить ещё лазеры при count живых"""
+        return self.max_lasers is None or count < self.max_lasers
+
+
+def parse(text):
+    """StressConfig из строки вида "spawn=8,lasers=300,particles=1000,fire=SPREAD,immortal=1" """
+    config = StressConfig()
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        key, _, value = item.partition('=')
+        key, value = key.strip(), value.strip()
+        if key == 'spawn':
+            config.spawn = float(value)
+            if config.spawn <= 0:
+                raise ValueError(f"{ENV_STRESS}: множитель спавна должен быть больше нуля")
+        elif key == 'lasers':
+            config.max_lasers = int(value)
+        elif key == 'particles':
+            config.max_particles = int(value)
+        elif key == 'fire':
+            config.fire_mode = value.upper()
+            if config.fire_mode not in FIRE_MODES:
+                raise ValueError(f"{ENV_STRESS}: неизвестный режим стрельбы {value!r}")
+        elif key == 'immortal':
+            config.immortal = value not in ('', '0')
+        else:
+            raise ValueError(f"{ENV_STRESS}: неизвестный параметр {key!r}")
+    return config
+
+
+def stress_from_env():
+    """StressConfig по NEON_STRESS или None (обычная игра)"""
+    value = os.environ.get(ENV_STRESS)
+    if not value or value == '0':
+        return None
+    return parse('' if value == '1' else value)
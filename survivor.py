@@ -1,15 +1,29 @@
 import pygame
 import random
 import sys
-import json
 import os
 from enum import Enum
 from dataclasses import dataclass
 
+from capture import ProfileCapture, env_ticks
+from containers import EntityList
+from profiler import FrameProfiler, NULL_PROFILER, PHASES, dump_name
+from replay import NULL_TAPE, ENV_REPLAY, open_tape
+from scores import ScoreStore
+from stress import stress_from_env
+
 # ============= НАСТРОЙКИ =============
 WIDTH, HEIGHT = 600, 800
 FPS = 60
 
+# Фиксированный шаг симуляции: все скорости и таймеры (invincible_time и
+# т.п.) считаются в шагах по SIM_STEP_MS, а не в кадрах отрисовки
+SIM_RATE = 60
+SIM_STEP_MS = 1000 / SIM_RATE
+MAX_FRAME_MS = 250  # после подвисания не догоняем больше 15 шагов
+LASER_SPEED = 12  # px за шаг
+STAR_SPEED = 2  # px за шаг
+
 # Цвета
 COLOR_BG = (10, 10, 20)
 COLOR_SHIP = (0, 255, 255)
@@ -42,6 +56,8 @@ pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Neon Space Defender")
 clock = pygame.time.Clock()
+# Рекорд: читается один раз, пишется в фоне (временный файл + rename)
+scores = ScoreStore(on_error=lambda e: print(f"Рекорд не записан: {e}"))
 
 # Безопасный шрифт
 try:
@@ -65,13 +81,51 @@ except Exception as e:
     title_font = pygame.font.Font(None, 48)
     small_font = pygame.font.Font(None, 18)
 
+# --- АТЛАС ГЛИФОВ ДЛЯ HUD ---
+
+HUD_CHARSET = "0123456789 :SCOREWAVHP"
+
+class GlyphAtlas:
+    """Символы растеризуются один раз в одну поверхность,
+    строка собирается blit'ами прямоугольников из неё"""
+    def __init__(self, font, color, charset=HUD_CHARSET):
+        glyphs = [(ch, font.render(ch, True, color)) for ch in dict.fromkeys(charset)]
+        height = max(g.get_height() for _, g in glyphs)
+        self.surface = pygame.Surface((sum(g.get_width() for _, g in glyphs), height), pygame.SRCALPHA)
+        self.rects = {}
+        x = 0
+        for ch, g in glyphs:
+            # MAX копирует глиф как есть, без повторного умножения на альфу
+            self.surface.blit(g, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            self.rects[ch] = pygame.Rect(x, 0, g.get_width(), height)
+            x += g.get_width()
+
+    def draw(self, surf, text, pos):
+        x, y = pos
+        blits = []
+        for ch in text:
+            rect = self.rects.get(ch)
+            if rect is None:
+                continue
+            blits.append((self.surface, (x, y), rect))
+            x += rect.width
+        surf.blits(blits, doreturn=False)
+
+hud_atlases = {color: GlyphAtlas(game_font, color)
+               for color in (COLOR_TEXT, COLOR_BONUS, COLOR_HEALTH, COLOR_ENEMY)}
+
+# Режим стрельбы меняется только по клавише или бонусу: надпись на каждый режим готова заранее
+fire_mode_texts = {mode: small_font.render(f"Mode: {mode.name}", True, COLOR_LASER)
+                   for mode in FireMode}
+
 # --- КЛАССЫ ОБЪЕКТОВ ---
 
 class Player:
     def __init__(self):
         self.rect = pygame.Rect(WIDTH//2, HEIGHT - 70, 40, 40)
+        self.prev_x = self.rect.x
         self.speed = 7
-        self.lasers = []
+        self.lasers = EntityList()
         self.last_shot = 0
         self.health = 3  # Жизни
         self.max_health = 5
@@ -84,13 +138,14 @@ class Player:
         self.dual_gun_time = 0
 
     def move(self, keys):
+        self.prev_x = self.rect.x
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
             if self.rect.left > 0: self.rect.x -= self.speed
         if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
             if self.rect.right < WIDTH: self.rect.x += self.speed
 
-    def shoot(self):
-        now = pygame.time.get_ticks()
+    def shoot(self, now):
+        """now — время симуляции в мс"""
         if now - self.last_shot > self.fire_rate:
             if self.fire_mode == FireMode.NORMAL:
                 self.lasers.append(pygame.Rect(self.rect.centerx - 2, self.rect.top, 4, 15))
@@ -110,19 +165,20 @@ class Player:
     def take_damage(self):
         if self.invincible_time <= 0:
             self.health -= 1
-            self.invincible_time = 120  # 2 секунды неуязвимости
+            self.invincible_time = 120  # 2 секунды неуязвимости (шаги симуляции)
 
     def update(self):
         if self.invincible_time > 0:
             self.invincible_time -= 1
 
-    def draw(self, surf):
+    def draw(self, surf, alpha=1.0):
         # Мигание при неуязвимости
         if self.invincible_time > 0 and (self.invincible_time // 10) % 2 == 0:
             return
         
-        # Рисуем самолёт
-        cx, cy = self.rect.centerx, self.rect.centery
+        # Рисуем самолёт (x интерполируется между шагами симуляции)
+        cx = round(self.prev_x + (self.rect.x - self.prev_x) * alpha) + self.rect.width // 2
+        cy = self.rect.centery
         w, h = 20, 30
         
         # Корпус самолёта
@@ -151,19 +207,22 @@ class Player:
 class Enemy:
     def __init__(self, wave=1):
         self.rect = pygame.Rect(random.randint(0, WIDTH-40), -50, 40, 30)
+        self.prev_y = self.rect.y
         self.speed = random.uniform(2 + wave*0.5, 5 + wave*0.5)
         self.health = 1 + (wave // 3)
 
     def update(self):
+        self.prev_y = self.rect.y
         self.rect.y += self.speed
 
     def take_damage(self):
         self.health -= 1
 
-    def draw(self, surf):
-        # Рисуем звездолёт врага
-        cx, cy = self.rect.centerx, self.rect.centery
-        w, h = self.rect.width // 2, self.rect.height // 2
+    def draw(self, surf, alpha=1.0):
+        # Рисуем звездолёт врага (y интерполируется между шагами симуляции)
+        rect = self.rect.move(0, round((self.prev_y - self.rect.y) * (1 - alpha)))
+        cx, cy = rect.centerx, rect.centery
+        w, h = rect.width // 2, rect.height // 2
         
         # Основной корпус (звёзда)
         points = [
@@ -185,9 +244,9 @@ class Enemy:
         
         # Здоровье врага
         if self.health > 1:
-            health_bar_w = self.rect.width * (self.health / (1 + (self.health)))
-            pygame.draw.rect(surf, COLOR_HEALTH, (self.rect.x, self.rect.y - 7, health_bar_w, 3))
-            pygame.draw.rect(surf, (255, 255, 255), (self.rect.x, self.rect.y - 7, self.rect.width, 3), 1)
+            health_bar_w = rect.width * (self.health / (1 + (self.health)))
+            pygame.draw.rect(surf, COLOR_HEALTH, (rect.x, rect.y - 7, health_bar_w, 3))
+            pygame.draw.rect(surf, (255, 255, 255), (rect.x, rect.y - 7, rect.width, 3), 1)
 
 class Bonus:
     def __init__(self, x, y, bonus_type):
@@ -198,33 +257,144 @@ class Bonus:
     def update(self):
         self.rect.y += self.speed
 
-    def draw(self, surf):
-        pygame.draw.rect(surf, COLOR_BONUS, self.rect)
+    def draw(self, surf, alpha=1.0):
+        rect = self.rect.move(0, round(-self.speed * (1 - alpha)))
+        pygame.draw.rect(surf, COLOR_BONUS, rect)
         if self.bonus_type == 'health':
-            pygame.draw.line(surf, (255, 255, 255), (self.rect.centerx - 5, self.rect.centerx), (self.rect.centerx + 5, self.rect.centerx), 2)
-            pygame.draw.line(surf, (255, 255, 255), (self.rect.centerx, self.rect.centery - 5), (self.rect.centerx, self.rect.centery + 5), 2)
+            pygame.draw.line(surf, (255, 255, 255), (rect.centerx - 5, rect.centerx), (rect.centerx + 5, rect.centerx), 2)
+            pygame.draw.line(surf, (255, 255, 255), (rect.centerx, rect.centery - 5), (rect.centerx, rect.centery + 5), 2)
         elif self.bonus_type == 'firerate':
-            pygame.draw.polygon(surf, (255, 255, 255), [(self.rect.centerx, self.rect.centery - 8), (self.rect.centerx + 8, self.rect.centery + 4), (self.rect.centerx - 8, self.rect.centery + 4)])
+            pygame.draw.polygon(surf, (255, 255, 255), [(rect.centerx, rect.centery - 8), (rect.centerx + 8, rect.centery + 4), (rect.centerx - 8, rect.centery + 4)])
 
 
-# --- СЛУЖЕБНЫЕ ФУНКЦИИ ---
+# --- HUD ---
+
+def draw_hud(surf, player, score, wave):
+    # UI (Счет, жизни, волна) — из атласа глифов, без растеризации шрифта
+    hud_atlases[COLOR_TEXT].draw(surf, f"SCORE: {score}", (20, 20))
+    hud_atlases[COLOR_BONUS].draw(surf, f"WAVE: {wave}", (WIDTH - 200, 20))
+    hud_atlases[COLOR_HEALTH if player.health > 1 else COLOR_ENEMY].draw(
+        surf, f"HP: {player.health}", (WIDTH - 200, 60))
+    
+    # Текущий режим стрельбы
+    surf.blit(fire_mode_texts[player.fire_mode], (20, 60))
+
+
+def draw_frame(surf, stars, player, enemies, bonuses, score, wave, alpha, profiler=NULL_PROFILER):
+    """Кадр игры без оверлея и flip (его же рисует benchmarks/bench_render.py).
+
+    alpha — доля шага симуляции для интерполяции позиций; фазы 'draw' и 'hud'
+    отмечаются в profiler.
+    """
+    surf.fill(COLOR_BG)
+    for star in stars:
+        pygame.draw.circle(surf, COLOR_STAR, star, 1)
+
+    laser_lag = round(LASER_SPEED * (1 - alpha))
+    for l in player.lasers:
+        pygame.draw.rect(surf, COLOR_LASER, l.move(0, laser_lag))
+
+    for e in enemies:
+        e.draw(surf, alpha)
+
+    for b in bonuses:
+        b.draw(surf, alpha)
+
+    player.draw(surf, alpha)
+    profiler.mark('draw')
+
+    draw_hud(surf, player, score, wave)
+    profiler.mark('hud')
+
+
+# --- ОТЛАДКА: ТАЙМИНГИ ФАЗ (F3 — оверлей, F4 — CSV) ---
+
+class ProfilerOverlay:
+    """График времени кадра и средние по фазам; текст обновляется 4 раза в секунду"""
+    RECT = pygame.Rect(WIDTH - 230, 100, 220, 260)
+    GRAPH_H = 80
+    GRAPH_MAX_MS = 45.0
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.visible = False
+        self.next_refresh = 0
+        self.text = []
+        # Полупрозрачная подложка одна на всё время: кадр её только копирует
+        self.panel = pygame.Surface(self.RECT.size, pygame.SRCALPHA)
+        self.panel.fill((0, 0, 0, 170))
 
-def load_high_score():
-    if os.path.exists("highscore.json"):
-        try:
-            with open("highscore.json", "r") as f:
-                data = json.load(f)
-                return data.get("score", 0)
-        except:
-            return 0
-    return 0
-
-def save_high_score(score):
+    def draw(self, surf, now):
+        if not self.visible:
+            return
+        rect = self.RECT
+        surf.blit(self.panel, rect.topleft)
+
+        # График: низ графика — 0 мс, линии — 60 и 30 FPS
+        base = rect.top + 10 + self.GRAPH_H
+        scale = self.GRAPH_H / self.GRAPH_MAX_MS
+        for ms, color in ((1000 / 60, (50, 200, 50)), (1000 / 30, (220, 70, 50))):
+            y = base - ms * scale
+            pygame.draw.line(surf, color, (rect.left + 5, y), (rect.right - 5, y))
+        rows = list(self.profiler.rows(120))
+        if len(rows) > 1:
+            step = (rect.width - 10) / 120
+            points = [(rect.left + 5 + i * step, base - min(row[0], self.GRAPH_MAX_MS) * scale)
+                      for i, row in enumerate(rows)]
+            pygame.draw.lines(surf, (255, 255, 80), False, points)
+
+        if now >= self.next_refresh:
+            self.next_refresh = now + 250
+            avg = self.profiler.averages()
+            frame = avg['frame_ms']
+            lines = [f"frame {frame:5.1f} ms  {1000 / frame if frame else 0:3.0f} fps"]
+            lines += [f"{phase:<10}{avg[phase]:6.2f} ms" for phase in PHASES]
+            self.text = [small_font.render(line, True, COLOR_TEXT) for line in lines]
+        for i, text in enumerate(self.text):
+            surf.blit(text, (rect.left + 8, base + 6 + i * 16))
+
+
+def dump_frame_times(profiler):
+    """Буфер таймингов — в CSV рядом с highscore.json"""
+    path = dump_name('frames')
     try:
-        with open("highscore.json", "w") as f:
-            json.dump({"score": score}, f)
-    except:
-        pass
+        print(f"{profiler.dump_csv(path)} кадров записано в {path}")
+    except OSError as e:
+        print(f"Не удалось записать {path}: {e}")
+
+
+def start_profile_capture(capture):
+    if capture.arm():
+        print(f"cProfile на {capture.remaining} тиков")
+
+
+# --- ЗАПИСЬ ВВОДА ---
+
+# Клавиши управления — биты маски в записи (replay.py)
+KEY_BITS = {key: 1 << i for i, key in enumerate(
+    (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_a, pygame.K_d, pygame.K_SPACE))}
+
+
+def key_mask(pressed):
+    mask = 0
+    for key, bit in KEY_BITS.items():
+        if pressed[key]:
+            mask |= bit
+    return mask
+
+
+class KeyMask:
+    """Состояние клавиш из маски: keys[pygame.K_LEFT], как у get_pressed()"""
+    __slots__ = ('mask',)
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & KEY_BITS.get(key, 0))
+
+
+# --- СЛУЖЕБНЫЕ ФУНКЦИИ ---
 
 def show_menu(high_score):
     """Главное меню"""
@@ -279,14 +449,10 @@ def show_menu(high_score):
     
     return True
 
-def show_game_over(score, high_score):
+def show_game_over(score):
     """Экран конца игры"""
-    if score > high_score:
-        high_score = score
-        save_high_score(high_score)
-        new_record = True
-    else:
-        new_record = False
+    new_record = scores.submit(score)
+    high_score = scores.get()
     
     waiting = True
     while waiting:
@@ -325,74 +491,127 @@ def show_game_over(score, high_score):
 
 # --- ГЛАВНЫЙ ЦИКЛ ---
 
-def main():
-    high_score = load_high_score()
+def play_game(profiler=NULL_PROFILER, overlay=None, capture=None, tape=NULL_TAPE, render=True,
+              stress=None):
+    """Одна игра до проигрыша; возвращает (тики, счёт, волна).
+
+    tape — запись или повтор ввода (replay.py); render=False — повтор без
+    отрисовки и без ожидания часов (время кадров берётся из записи).
+    stress — stress.StressConfig (частиц в survivor нет, max_particles не действует).
+    """
+    if capture is None:
+        capture = ProfileCapture()
+    if tape.seed is not None:
+        random.seed(tape.seed)  # враги, звёзды и бонусы — из модуля random
+
+    player = Player()
+    fire_lock = FireMode[stress.fire_mode] if stress is not None and stress.fire_mode else None
+    enemies = EntityList()
+    bonuses = EntityList()
+    stars = [[random.randint(0, WIDTH), random.randint(0, HEIGHT)] for _ in range(50)]
     
-    while True:
-        # Показываем меню
-        if not show_menu(high_score):
+    score = 0
+    wave = 1
+    enemies_killed_in_wave = 0
+    spawn_timer = 0
+    bonus_chance = 0.3
+    running = True
+    accumulator = 0.0
+    sim_time = 0.0
+    ticks = 0
+    profiler.idle()
+
+    while running:
+        frame_ms = clock.tick(FPS) if render else 0
+        profiler.begin_frame()
+        capture.begin_tick()
+
+        # События (раз за кадр)
+        fire_switches = 0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                tape.close()
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                fire_switches += 1
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and overlay is not None:
+                overlay.visible = not overlay.visible
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                dump_frame_times(profiler)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                start_profile_capture(capture)
+
+        # Время кадра и смены режима стрельбы идут через запись (при повторе — из неё)
+        frame = tape.frame(frame_ms, fire_switches)
+        if frame is None:
+            capture.end_tick()
             break
-        
-        # Игровой цикл
-        player = Player()
-        enemies = []
-        bonuses = []
-        stars = [[random.randint(0, WIDTH), random.randint(0, HEIGHT)] for _ in range(50)]
-        
-        score = 0
-        wave = 1
-        enemies_killed_in_wave = 0
-        spawn_timer = 0
-        bonus_chance = 0.3
-        running = True
-
-        while running:
-            dt = clock.tick(FPS)
-            screen.fill(COLOR_BG)
-
-            # 1. Звёездное небо (фон)
+        frame_ms, fire_switches = frame
+        fire_modes = [FireMode.NORMAL, FireMode.SPREAD, FireMode.LASER, FireMode.DOUBLE]
+        for _ in range(fire_switches if fire_lock is None else 0):
+            current_idx = fire_modes.index(player.fire_mode)
+            player.fire_mode = fire_modes[(current_idx + 1) % len(fire_modes)]
+        # Время кадра копится и расходуется ровными шагами симуляции
+        accumulator += min(frame_ms, MAX_FRAME_MS)
+        profiler.mark('input')
+
+        while running and accumulator >= SIM_STEP_MS:
+            mask = tape.step(keys=key_mask(pygame.key.get_pressed()))
+            if mask is None:
+                running = False
+                break
+            accumulator -= SIM_STEP_MS
+            sim_time += SIM_STEP_MS
+            ticks += 1
+
+            # 1. Звёздное небо (фон)
             for star in stars:
-                star[1] += 2
+                star[1] += STAR_SPEED
                 if star[1] > HEIGHT: 
                     star[1] = 0
                     star[0] = random.randint(0, WIDTH)
-                pygame.draw.circle(screen, COLOR_STAR, star, 1)
-
-            # 2. События
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                    fire_modes = [FireMode.NORMAL, FireMode.SPREAD, FireMode.LASER, FireMode.DOUBLE]
-                    current_idx = fire_modes.index(player.fire_mode)
-                    player.fire_mode = fire_modes[(current_idx + 1) % len(fire_modes)]
-
-            # 3. Управление
-            keys = pygame.key.get_pressed()
+
+            # 2. Управление
+            keys = KeyMask(mask)
             player.move(keys)
-            if keys[pygame.K_SPACE]:
-                player.shoot()
+            if fire_lock is not None:
+                player.fire_mode = fire_lock
+            if keys[pygame.K_SPACE] and (stress is None or stress.laser_room(len(player.lasers))):
+                player.shoot(sim_time)
             player.update()
+            profiler.mark('input')
 
-            # 4. Спавн врагов (волны становятся сложнее)
-            spawn_timer += dt
+            # 3. Спавн врагов (волны становятся сложнее)
+            spawn_timer += SIM_STEP_MS
             spawn_delay = max(300, 800 - wave * 50)  # Чем выше волна, тем быстрее
+            if stress is not None:
+                spawn_delay /= stress.spawn
             if spawn_timer > spawn_delay:
-                enemies.append(Enemy(wave))
-                spawn_timer = 0
-
-            # 5. Обновление лазеров
-            for l in player.lasers[:]:
-                l.y -= 12
+                if stress is None:
+                    enemies.append(Enemy(wave))
+                    spawn_timer = 0
+                else:
+                    # Задержка может быть короче шага — несколько врагов за шаг
+                    count = int(spawn_timer / spawn_delay)
+                    for _ in range(count):
+                        enemies.append(Enemy(wave))
+                    spawn_timer -= count * spawn_delay
+            profiler.mark('spawn')
+
+            # 4. Обновление лазеров
+            # Удаление отложенное: kill() помечает, compact() в конце шага
+            for l in player.lasers:
+                l.y -= LASER_SPEED
                 if l.bottom < 0:
-                    player.lasers.remove(l)
+                    player.lasers.kill(l)
+            profiler.mark('lasers')
 
-            # 6. Обновление врагов и коллизии
-            for e in enemies[:]:
+            # 5. Обновление врагов и коллизии
+            for e in enemies:
                 e.update()
                 if e.rect.top > HEIGHT:
-                    enemies.remove(e)
+                    enemies.kill(e)
                     score = max(0, score - 5)
                     continue
 
@@ -400,89 +619,115 @@ def main():
                 if e.rect.colliderect(player.rect):
                     player.take_damage()
                     if player.health <= 0:
-                        running = False
-                    if e in enemies:
-                        enemies.remove(e)
-                        enemies_killed_in_wave += 1
+                        if stress is not None and stress.immortal:
+                            player.health = player.max_health
+                        else:
+                            running = False
+                    enemies.kill(e)
+                    enemies_killed_in_wave += 1
                     continue
 
                 # Проверка попадания лазером
-                for l in player.lasers[:]:
+                for l in player.lasers.alive():
                     if e.rect.colliderect(l):
                         e.take_damage()
-                        if l in player.lasers:
-                            player.lasers.remove(l)
-                        
+                        player.lasers.kill(l)
+                    
                         if e.health <= 0:
-                            if e in enemies:
-                                enemies.remove(e)
+                            enemies.kill(e)
                             score += 10 + wave * 5  # Больше очков на высоких волнах
                             enemies_killed_in_wave += 1
-                            
+                        
                             # Спавн бонуса
                             if random.random() < bonus_chance:
                                 bonus_type = random.choice(['health', 'firerate'])
                                 bonuses.append(Bonus(e.rect.centerx, e.rect.centery, bonus_type))
                         break
+            profiler.mark('enemies')
 
-            # 7. Обновление бонусов
-            for b in bonuses[:]:
+            # 6. Обновление бонусов
+            for b in bonuses:
                 b.update()
                 if b.rect.top > HEIGHT:
-                    bonuses.remove(b)
+                    bonuses.kill(b)
                     continue
-                
+            
                 if b.rect.colliderect(player.rect):
                     if b.bonus_type == 'health' and player.health < 5:
                         player.health += 1
                     elif b.bonus_type == 'firerate':
                         player.fire_rate = max(100, player.fire_rate - 30)
-                    bonuses.remove(b)
+                    bonuses.kill(b)
+            profiler.mark('bonuses')
 
-            # 8. Проверка волны
+            player.lasers.compact()
+            enemies.compact()
+            bonuses.compact()
+
+            # 7. Проверка волны
             if enemies_killed_in_wave >= 5 + wave * 2:
                 wave += 1
                 enemies_killed_in_wave = 0
                 bonus_chance += 0.05
+            # Сжатие списков — в фазу врагов и коллизий
+            profiler.mark('enemies')
 
-            # 9. Отрисовка
-            for l in player.lasers:
-                pygame.draw.rect(screen, COLOR_LASER, l)
-            
-            for e in enemies:
-                e.draw(screen)
-            
-            for b in bonuses:
-                b.draw(screen)
-            
-            player.draw(screen)
+        if stress is not None:
+            stress.entities = len(enemies) + len(player.lasers) + len(bonuses)
 
-            # UI (Счет, жизни, волна)
-            score_text = game_font.render(f"SCORE: {score}", True, COLOR_TEXT)
-            wave_text = game_font.render(f"WAVE: {wave}", True, COLOR_BONUS)
-            health_text = game_font.render(f"HP: {player.health}", True, COLOR_HEALTH if player.health > 1 else COLOR_ENEMY)
-            
-            # Текущий режим стрельбы
-            fire_mode_names = {FireMode.NORMAL: "NORMAL", FireMode.SPREAD: "SPREAD", 
-                              FireMode.LASER: "LASER", FireMode.DOUBLE: "DOUBLE"}
-            fire_text = small_font.render(f"Mode: {fire_mode_names[player.fire_mode]}", True, COLOR_LASER)
-            
-            screen.blit(score_text, (20, 20))
-            screen.blit(wave_text, (WIDTH - 200, 20))
-            screen.blit(health_text, (WIDTH - 200, 60))
-            screen.blit(fire_text, (20, 60))
+        if not render:
+            profiler.end_frame()
+            capture.end_tick()
+            continue
+
+        # 8. Отрисовка (доля шага — для интерполяции позиций)
+        draw_frame(screen, stars, player, enemies, bonuses, score, wave,
+                   accumulator / SIM_STEP_MS, profiler)
+        if overlay is not None:
+            overlay.draw(screen, pygame.time.get_ticks())
+
+        pygame.display.flip()
+        profiler.mark('draw')
+        profiler.end_frame()
+        capture.end_tick()
+
+    profiler.idle()
+    if not tape.finish(ticks, score):
+        print(f"Повтор: итог ({ticks}, {score}) не совпал с записью {tape.expected}")
+    return ticks, score, wave
 
-            pygame.display.flip()
+
+def main():
+    high_score = scores.get()
+    stress = stress_from_env()  # NEON_STRESS
+    profiler = FrameProfiler()
+    overlay = ProfilerOverlay(profiler)
+    # cProfile на N тиков: F5 или NEON_PROFILE_TICKS
+    capture = ProfileCapture(on_saved=lambda *paths: print("Профиль записан:", *paths))
+    if env_ticks():
+        capture.arm()
+    # Повтор записи (NEON_REPLAY) — сразу в игру, без меню
+    replaying = bool(os.environ.get(ENV_REPLAY))
+    
+    while True:
+        # Показываем меню
+        if not replaying and not show_menu(high_score):
+            break
+        
+        # Игровой цикл (каждая игра — отдельная запись при NEON_RECORD)
+        tape = open_tape('pygame', SIM_STEP_MS, stress=stress)
+        _, score, _ = play_game(profiler, overlay, capture, tape, stress=stress)
+        tape.close()
 
         # Показываем экран конца игры
-        continue_game, high_score = show_game_over(score, high_score)
+        continue_game, high_score = show_game_over(score)
         if not continue_game:
             break
 
+    scores.flush()
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
     main()
-
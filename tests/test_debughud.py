@@ -0,0 +1,36 @@
+"""Отладочный оверлей: каждая строка собирается из глифов атласа без пропусков"""
+
+import pytest
+
+pytest.importorskip('kivy')
+from kivy.core.window import Window  # noqa: F401  (GL-контекст для текстур)
+from kivy.graphics import InstructionGroup
+
+from debughud import DebugOverlay
+from profiler import PHASES, FrameProfiler
+
+
+def stats():
+    # Те же форматы, что у GameWidget.stats_lines
+    return ["enemy 12: 4/3/2/2/1", "laser 7 bonus 1 part 230",
+            "canvas 117 instr", "alloc +32 blk/f 185k 412kb"]
+
+
+def test_overlay_text_uses_only_atlas_glyphs():
+    profiler = FrameProfiler()
+    for _ in range(3):
+        profiler.begin_frame()
+        for phase in PHASES:
+            profiler.mark(phase)
+        profiler.end_frame()
+    overlay = DebugOverlay(InstructionGroup(), profiler, stats)
+    overlay.toggle()
+    overlay.update(1.0)
+
+    for line in overlay.lines:
+        glyphs = line.atlas.glyphs
+        assert line.text
+        missing = {ch for ch in line.text if ch != ' ' and ch not in glyphs}
+        assert not missing, f"{line.text!r}: нет в атласе {missing}"
+        assert line.width == sum(glyphs[ch][0] for ch in line.text)
+        assert len(line.vertices) == 16 * len(line.text)
@@ -0,0 +1,69 @@
+"""Запись и повтор: заголовок хранит стресс-режим, повтор без окна сходится с игрой"""
+
+import pytest
+
+import replay
+from autopilot import Autopilot
+from simulation import SIM_DT, Inputs, Simulation
+from stress import parse
+
+STRESS = "spawn=6.0,lasers=40,particles=200,fire=SPREAD,immortal=1"
+
+
+def record_game(path, stress, ticks=600):
+    """Игра автопилота через Recorder, как в GameWidget: ввод шага пишется до sim.step"""
+    recorder = replay.Recorder(str(path), 'kivy', SIM_DT, stress=stress, seed=1234)
+    sim = Simulation(stress=stress)
+    sim.reset(seed=recorder.seed)
+    pilot, inputs = Autopilot(), Inputs()
+    while sim.ticks < ticks and not sim.game_over:
+        pilot.drive(sim, inputs)
+        recorder.step(inputs)
+        sim.step(SIM_DT, inputs)
+        inputs.shots = 0
+    recorder.finish(sim.ticks, sim.score)
+    recorder.close()
+    return sim
+
+
+def test_stress_round_trip(tmp_path):
+    path = tmp_path / 'stress.nsdr'
+    sim = record_game(path, parse(STRESS))
+
+    player = replay.Player(str(path))
+    assert player.stress.spec() == STRESS
+    ticks, score, _ = replay.replay_kivy(player)
+    assert (ticks, score) == (sim.ticks, sim.score)
+    assert player.finish(ticks, score)
+
+
+def test_stress_changes_the_game(tmp_path):
+    # Без стресс-режима тот же ввод даёт другую игру: заголовок действительно нужен
+    path = tmp_path / 'stress.nsdr'
+    sim = record_game(path, parse(STRESS))
+    player = replay.Player(str(path))
+    player.stress = None
+    assert replay.replay_kivy(player)[1] != sim.score
+
+
+def test_replay_with_other_stress_is_refused(tmp_path, monkeypatch):
+    path = tmp_path / 'stress.nsdr'
+    record_game(path, parse(STRESS), ticks=10)
+    monkeypatch.setenv(replay.ENV_REPLAY, str(path))
+    with pytest.raises(ValueError, match='NEON_STRESS'):
+        replay.open_tape('kivy', SIM_DT, stress=None)
+    assert replay.open_tape('kivy', SIM_DT, stress=parse(STRESS)).stress.spec() == STRESS
+
+
+@pytest.mark.parametrize('frontend, step_dt, arrays', [
+    ('pygame', SIM_DT, False),
+    ('kivy', SIM_DT / 2, False),
+    ('kivy', SIM_DT, True),
+])
+def test_replay_with_other_settings_is_refused(tmp_path, monkeypatch, frontend, step_dt, arrays):
+    path = tmp_path / 'plain.nsdr'
+    record_game(path, None, ticks=10)
+    monkeypatch.setenv(replay.ENV_REPLAY, str(path))
+    with pytest.raises(ValueError, match='plain.nsdr'):
+        replay.open_tape(frontend, step_dt, arrays)
+    assert replay.open_tape('kivy', SIM_DT).enabled
@@ -0,0 +1,32 @@
+"""Атлас глифов: символ из атласа совпадает с тем же символом, отрисованным отдельно"""
+
+import pytest
+
+pytest.importorskip('kivy')
+from kivy.core.window import Window  # noqa: F401  (GL-контекст для текстур)
+from kivy.core.text import Label as CoreLabel
+
+from textcache import GLYPH_PAD, GlyphAtlas
+
+
+def crop(pixels, width, x, w, h):
+    """Столбцы x..x+w строк 0..h из RGBA-байтов текстуры шириной width"""
+    return b''.join(pixels[(row * width + x) * 4:(row * width + x + w) * 4] for row in range(h))
+
+
+@pytest.mark.parametrize('ch', ['e', ':', 'W', '0'])
+def test_atlas_glyph_matches_single_glyph(ch):
+    atlas = GlyphAtlas("Score: Wave 0123", font_size=11)
+    label = CoreLabel(text=ch, font_size=11)
+    label.refresh()
+    single = label.texture
+
+    w, h, tex_coords = atlas.glyphs[ch]
+    assert (w, h) == tuple(single.size)
+    x = round(tex_coords[0] * atlas.texture.width)
+    pixels = atlas.texture.pixels
+    assert crop(pixels, atlas.texture.width, x, w, h) == bytes(single.pixels)
+
+    # Зазор справа прозрачен: соседний символ в квадрат не попадает
+    gap = crop(pixels, atlas.texture.width, x + w, GLYPH_PAD, h)
+    assert not any(gap[3::4])
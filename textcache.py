@@ -0,0 +1,186 @@
+"""
+Neon Space Defender - кэш текстур текста
+Растеризация шрифта — самая дорогая операция кадра, поэтому текстуры
+переиспользуются, а перерисовываются только при смене текста/размера/цвета
+"""
+
+from collections import OrderedDict
+
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Mesh, Rectangle
+from kivy.graphics.texture import Texture
+
+
+class LabelCache:
+    """LRU-кэш текстур CoreLabel с ограниченным размером"""
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.textures = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, font_size, color=(1, 1, 1, 1), bold=False):
+        key = (text, font_size, tuple(color), bold)
+        texture = self.textures.get(key)
+        if texture is not None:
+            self.textures.move_to_end(key)
+            self.hits += 1
+            return texture
+
+        self.misses += 1
+        try:
+            label = CoreLabel(text=text, font_size=font_size, color=color, bold=bold)
+            label.refresh()
+            texture = label.texture
+        except Exception:
+            return None
+        if texture is None:
+            return None
+
+        self.textures[key] = texture
+        if len(self.textures) > self.max_size:
+            self.textures.popitem(last=False)
+        return texture
+
+    def clear(self):
+        self.textures.clear()
+
+
+# Общий кэш: текстуры переживают пересоздание виджетов
+label_cache = LabelCache()
+
+
+class CachedLabel:
+    """Постоянный Rectangle с текстом, текстура меняется только при смене текста"""
+    def __init__(self, group, pos, font_size, color=(1, 1, 1, 1), bold=False, cache=None):
+        self.cache = cache or label_cache
+        self.font_size = font_size
+        self.color = color
+        self.bold = bold
+        self.text = None
+        self.rect = Rectangle(pos=pos, size=(0, 0))
+        group.add(self.rect)
+
+    @property
+    def width(self):
+        return self.rect.size[0]
+
+    def set_text(self, text):
+        """Возвращает True, если текстура (и ширина) поменялась"""
+        if text == self.text:
+            return False
+        texture = self.cache.get(text, self.font_size, self.color, self.bold)
+        if texture is None:
+            return False
+        self.text = text
+        self.rect.texture = texture
+        self.rect.size = texture.size
+        return True
+
+    def set_x(self, x):
+        if self.rect.pos[0] != x:
+            self.rect.pos = (x, self.rect.pos[1])
+
+
+# Символы HUD: цифры и фиксированные подписи полей
+HUD_CHARSET = "0123456789 :x+-ScoreHighWavCmb"
+
+# Прозрачный зазор между символами в атласе, пикселей
+GLYPH_PAD = 2
+
+
+class GlyphAtlas:
+    """Все символы набора растеризуются один раз в одну текстуру.
+
+    Каждый символ рисуется своим CoreLabel и копируется в атлас с зазором
+    GLYPH_PAD: у строки целиком символы выносных элементов залезают на
+    соседей, и вырезанный по ширине префикса квадрат цеплял их края.
+    Строка из этих символов рисуется текстурированными квадратами
+    (см. AtlasText) — смена числа стоит пары записей в вершины.
+    """
+    def __init__(self, charset=HUD_CHARSET, font_size=11, color=(1, 1, 1, 1), bold=False):
+        self.charset = ''.join(dict.fromkeys(charset))
+        textures = {}
+        for ch in self.charset:
+            label = CoreLabel(text=ch, font_size=font_size, color=color, bold=bold)
+            label.refresh()
+            if label.texture is not None and label.texture.width > 1:
+                textures[ch] = label.texture
+        self.height = max(t.height for t in textures.values())
+        width = sum(t.width + GLYPH_PAD for t in textures.values())
+
+        # Атлас перевёрнут, как текстуры CoreLabel: pixels копируются как есть
+        self.texture = Texture.create(size=(width, self.height), colorfmt='rgba')
+        self.texture.flip_vertical()
+        self.texture.blit_buffer(bytes(width * self.height * 4), colorfmt='rgba')
+        self.glyphs = {}
+        x = 0
+        for ch, texture in textures.items():
+            self.texture.blit_buffer(texture.pixels, size=texture.size, colorfmt='rgba', pos=(x, 0))
+            region = self.texture.get_region(x, 0, texture.width, texture.height)
+            self.glyphs[ch] = (texture.width, texture.height, tuple(region.tex_coords))
+            x += texture.width + GLYPH_PAD
+        self.space_width = self.glyphs[' '][0] if ' ' in self.glyphs else font_size // 3
+
+
+_atlases = {}
+
+
+def get_atlas(font_size=11, color=(1, 1, 1, 1), bold=False, charset=HUD_CHARSET):
+    """Атласы создаются лениво и живут всё время работы приложения"""
+    key = (font_size, tuple(color), bold, charset)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(charset, font_size, color, bold)
+    return atlas
+
+
+class AtlasText:
+    """Строка из квадратов атласа в одном Mesh; интерфейс как у CachedLabel"""
+    def __init__(self, group, pos, atlas):
+        self.atlas = atlas
+        self.pos = pos
+        self.text = None
+        self.width = 0
+        self.vertices = []
+        self.indices = []
+        self.mesh = Mesh(fmt=[(b'vPosition', 2, 'float'), (b'vTexCoords0', 2, 'float')],
+                         mode='triangles', texture=atlas.texture)
+        group.add(self.mesh)
+
+    def set_text(self, text):
+        if text == self.text:
+            return False
+        self.text = text
+        self.write_vertices()
+        return True
+
+    def set_x(self, x):
+        if self.pos[0] != x:
+            self.pos = (x, self.pos[1])
+            if self.text is not None:
+                self.write_vertices()
+
+    def write_vertices(self):
+        glyphs = self.atlas.glyphs
+        x, y = self.pos
+        buf = self.vertices
+        n = 0
+        for ch in self.text:
+            glyph = glyphs.get(ch)
+            if glyph is None:
+                x += self.atlas.space_width
+                continue
+            w, h, (u0, v0, u1, v1, u2, v2, u3, v3) = glyph
+            quad = (x, y, u0, v0, x + w, y, u1, v1, x + w, y + h, u2, v2, x, y + h, u3, v3)
+            buf[n * 16:n * 16 + 16] = quad
+            n += 1
+            x += w
+        del buf[n * 16:]
+        self.width = x - self.pos[0]
+
+        if len(self.indices) != n * 6:
+            self.indices = [i for q in range(n)
+                            for i in (q * 4, q * 4 + 1, q * 4 + 2, q * 4 + 2, q * 4 + 3, q * 4)]
+            self.mesh.indices = self.indices
+        self.mesh.vertices = buf
@@ -0,0 +1,184 @@
+"""
+Neon Space Defender - трассировка кадров в формате Chrome trace-event
+Временная шкала вместо средних: фазы GameWidget.update, дрожание вызовов
+Clock, спавн, волны, босс и сборки мусора (gc.callbacks). Файл открывается
+в Perfetto (ui.perfetto.dev) и chrome://tracing.
+
+Включается переменной окружения NEON_TRACE (1 — trace-<время>.json рядом
+с highscore.json, иначе — путь к файлу). В игровом потоке событие — один
+кортеж в списке; пачки уходят в фоновый поток, который переводит их в
+JSON и пишет в файл, поэтому трассировка почти не искажает время кадра.
+"""
+
+import gc
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from profiler import FrameProfiler
+
+ENV_TRACE = 'NEON_TRACE'
+
+# Событий в пачке перед передачей потоку записи
+FLUSH_EVENTS = 4096
+
+# Дорожки (tid) в просмотрщике
+TRACK_UPDATE = 1
+TRACK_GC = 2
+TRACK_NAMES = {TRACK_UPDATE: 'update', TRACK_GC: 'gc'}
+
+
+class Tracer:
+    """Потоковая запись событий: JSON-массив, дописываемый пачками.
+
+    Время хранится как perf_counter (с) и переводится в мкс от старта
+    трассы уже в потоке записи.
+    """
+    enabled = True
+
+    def __init__(self, path):
+        self.path = path
+        self.clock = time.perf_counter
+        self.start = self.clock()
+        self.pid = os.getpid()
+        self.buffer = []          # только игровой поток
+        self.gc_events = deque()  # из любого потока (on_gc), разбирает flush
+        self.batches = queue.Queue()
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('[\n')
+        self.first = True
+        self.writer = threading.Thread(target=self.write_loop, name='trace-writer', daemon=True)
+        self.writer.start()
+
+        self.push(('M', 'process_name', None, 0, 0, 0, {'name': 'Neon Space Defender'}))
+        for tid, name in TRACK_NAMES.items():
+            self.push(('M', 'thread_name', None, 0, 0, tid, {'name': name}))
+        gc.callbacks.append(self.on_gc)
+
+    # --- Игровой поток ---
+
+    def push(self, event):
+        buffer = self.buffer
+        buffer.append(event)
+        if len(buffer) >= FLUSH_EVENTS:
+            self.flush()
+
+    def span(self, name, begin, end, cat='frame'):
+        """Законченный отрезок [begin, end] (perf_counter, с)"""
+        self.push(('X', name, cat, begin, end - begin, TRACK_UPDATE, None))
+
+    def instant(self, name, cat='sim', **args):
+        self.push(('i', name, cat, self.clock(), 0, TRACK_UPDATE, args))
+
+    def counter(self, name, **values):
+        self.push(('C', name, 'clock', self.clock(), 0, TRACK_UPDATE, values))
+
+    def on_gc(self, phase, info):
+        # Сборка может начаться в любом потоке, в том числе в потоке записи:
+        # событие идёт в deque (append атомарен), а не в buffer игрового потока
+        if phase == 'start':
+            self.gc_events.append(('B', f"gc gen{info['generation']}", 'gc', self.clock(), 0,
+                                   TRACK_GC, None))
+        else:
+            self.gc_events.append(('E', f"gc gen{info['generation']}", 'gc', self.clock(), 0,
+                                   TRACK_GC, {'collected': info['collected'],
+                                              'uncollectable': info['uncollectable']}))
+
+    def flush(self):
+        buffer, gc_events = self.buffer, self.gc_events
+        while gc_events:
+            buffer.append(gc_events.popleft())
+        batch, self.buffer = buffer, []
+        if batch:
+            self.batches.put(batch)
+
+    def close(self):
+        """Остановка: дописать буфер и закрыть массив"""
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        self.flush()
+        self.batches.put(None)
+        self.writer.join()
+        self.file.write('\n]\n')
+        self.file.close()
+
+    # --- Поток записи ---
+
+    def encode(self, event):
+        ph, name, cat, ts, dur, tid, args = event
+        record = {'ph': ph, 'name': name, 'pid': self.pid, 'tid': tid}
+        if ph != 'M':
+            record['cat'] = cat
+            record['ts'] = round((ts - self.start) * 1e6, 1)
+        if ph == 'X':
+            record['dur'] = round(dur * 1e6, 1)
+        elif ph == 'i':
+            # Волны и босс — на всю высоту шкалы, остальное — на дорожке update
+            record['s'] = 'g' if name in ('wave', 'boss') else 't'
+        if args:
+            record['args'] = args
+        return json.dumps(record, separators=(',', ':'))
+
+    def write_loop(self):
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                break
+            text = ',\n'.join(self.encode(event) for event in batch)
+            if not self.first:
+                text = ',\n' + text
+            self.first = False
+            self.file.write(text)
+            self.file.flush()
+
+
+class NullTracer:
+    """Трассировка выключена: все вызовы пустые"""
+    enabled = False
+
+    def span(self, name, begin, end, cat='frame'):
+        pass
+
+    def instant(self, name, cat='sim', **args):
+        pass
+
+    def counter(self, name, **values):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class TracingProfiler(FrameProfiler):
+    """FrameProfiler, который дублирует каждую фазу и кадр отрезком трассы"""
+    def __init__(self, tracer, **kwargs):
+        super().__init__(**kwargs)
+        self.tracer = tracer
+
+    def mark(self, phase):
+        begin = self.last
+        super().mark(phase)
+        self.tracer.span(phase, begin, self.last)
+
+    def end_frame(self):
+        if self.frame_start is not None:
+            self.tracer.span('update', self.frame_start, self.clock())
+        super().end_frame()
+
+
+def tracer_from_env():
+    """Tracer по NEON_TRACE или NULL_TRACER"""
+    value = os.environ.get(ENV_TRACE)
+    if not value or value == '0':
+        return NULL_TRACER
+    path = time.strftime('trace-%Y%m%d-%H%M%S.json') if value == '1' else value
+    return Tracer(path)